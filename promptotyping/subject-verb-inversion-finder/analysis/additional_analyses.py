@@ -1,24 +1,104 @@
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy import stats
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import PCA
-from wordcloud import WordCloud
+from data_loading import ensure_frame, drop_unused_categories
+from term_matrix import term_matrix, grouped_term_frequencies, wordcloud_frequencies
+from resampling import resample_crosstab, resampling_record, print_resampling
+from rendering import add_figure
 
-def perform_statistical_analysis(file_path):
+def draw_heatmap(table, title, xlabel, ylabel, figsize=(12, 8), rotate_xticks=False):
+    """
+    Draw an annotated percentage heatmap of a cross-tabulation
+    """
+    plt.figure(figsize=figsize)
+    sns.heatmap(table, annot=True, cmap='YlGnBu', fmt='.1f')
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    if rotate_xticks:
+        plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+
+def draw_wordcloud(frequencies, func):
+    """
+    Draw a word cloud of the fronted elements of one discourse function
+    """
+    from wordcloud import WordCloud
+    
+    # Generate word cloud
+    wordcloud = WordCloud(width=800, height=400, background_color='white', 
+                         max_words=100, contour_width=3, contour_color='steelblue')
+    wordcloud.generate_from_frequencies(frequencies)
+    
+    plt.figure(figsize=(10, 6))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis('off')
+    plt.title(f'Common Words in Fronted Elements: {func}')
+    plt.tight_layout()
+
+def draw_top_verbs(top_verbs):
+    """
+    Draw one bar chart of the top verbs per discourse function
+    """
+    # Create a figure with subplots
+    fig, axes = plt.subplots(len(top_verbs), 1, figsize=(10, 3*len(top_verbs)))
+    if len(top_verbs) == 1:
+        axes = [axes]
+    
+    for i, (func, verbs) in enumerate(top_verbs.items()):
+        verbs.plot(kind='barh', ax=axes[i], color=sns.color_palette('viridis', 3))
+        axes[i].set_title(f'Top 3 Verbs: {func}')
+        axes[i].set_xlabel('Count')
+    
+    plt.tight_layout()
+
+def draw_function_bars(values, title, ylabel):
+    """
+    Draw a bar plot of one value per discourse function
+    """
+    plt.figure(figsize=(12, 6))
+    sns.barplot(x=values.index.astype(str), y=values.values, palette='viridis')
+    plt.title(title)
+    plt.xlabel('Discourse Function')
+    plt.ylabel(ylabel)
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+
+def queue_wordclouds(df, figures, output_dir):
+    """
+    Queue a word cloud of the fronted elements of each discourse function
+    (with wordcloud's own stop words left out, as WordCloud.generate does)
+    """
+    from wordcloud import STOPWORDS
+    
+    # Term counts of the fronted elements of each discourse function, from the shared term matrix
+    matrix, terms = term_matrix(df, 'Fronted Element')
+    functions, function_counts = grouped_term_frequencies(matrix, df['Discourse Function'])
+    texts_per_function = df.groupby('Discourse Function', observed=True)['Fronted Element'].count()
+    
+    for i, func in enumerate(functions):
+        if func == 'Unknown':
+            continue
+        
+        if texts_per_function.get(func, 0) < 5:  # Skip if too few examples
+            continue
+        
+        frequencies = wordcloud_frequencies(function_counts[i], terms, max_words=100, stop_words=STOPWORDS)
+        if not frequencies:
+            continue
+        
+        # Queue the word cloud
+        add_figure(figures, draw_wordcloud, f'{output_dir}/wordcloud_{func.replace(" ", "_")}.png', frequencies=frequencies, func=func)
+        
+        print(f"  - Generated word cloud for {func}")
+
+def perform_statistical_analysis(data, figures=None, output_dir='.'):
     """
     Perform a more in-depth statistical analysis of the inversion patterns
     """
-    # Load the data
-    df = pd.read_csv(file_path)
-    print(f"Loaded {len(df)} rows of data")
+    from scipy import stats
     
-    # Fill missing values for analysis
-    for col in ['Fronted Element Type', 'Locative', 'Discourse Function', 'Information Structure']:
-        if col in df.columns:
-            df[col] = df[col].fillna('Unknown')
+    df = ensure_frame(data)
     
     # 1. Chi-square test for independence between locative status and discourse function
     print("\n1. Chi-square Test: Locative Status vs. Discourse Function")
@@ -28,58 +108,36 @@ def perform_statistical_analysis(file_path):
     print(f"p-value: {p:.4f}")
     print(f"Degrees of freedom: {dof}")
     print("Interpretation: " + ("Significant association" if p < 0.05 else "No significant association"))
+    locative_resampling = resample_crosstab(contingency_table)
+    print_resampling(locative_resampling)
     
     # 2. Relationship between fronted element type and information structure
     print("\n2. Fronted Element Type vs. Information Structure")
+    type_info_counts = pd.crosstab(df['Fronted Element Type'], df['Information Structure'])
     type_info_table = pd.crosstab(df['Fronted Element Type'], df['Information Structure'], 
                                  normalize='index') * 100
     print(type_info_table)
+    type_info_resampling = resample_crosstab(type_info_counts)
+    print_resampling(type_info_resampling)
     
     # Create a heatmap visualization
-    plt.figure(figsize=(12, 8))
-    sns.heatmap(type_info_table, annot=True, cmap='YlGnBu', fmt='.1f')
-    plt.title('Relationship: Fronted Element Types and Information Structure (%)')
-    plt.xlabel('Information Structure')
-    plt.ylabel('Fronted Element Type')
-    plt.tight_layout()
-    plt.savefig('element_type_vs_info_structure.png', dpi=300)
-    plt.close()
+    add_figure(figures, draw_heatmap, f'{output_dir}/element_type_vs_info_structure.png', table=type_info_table,
+               title='Relationship: Fronted Element Types and Information Structure (%)',
+               xlabel='Information Structure', ylabel='Fronted Element Type')
     
     # 3. Word clouds for fronted elements by discourse function
     print("\n3. Generating word clouds for fronted elements by discourse function")
     discourse_functions = df['Discourse Function'].unique()
     
-    for func in discourse_functions:
-        if pd.isna(func) or func == 'Unknown':
-            continue
-            
-        # Get all fronted elements for this discourse function
-        texts = df[df['Discourse Function'] == func]['Fronted Element'].dropna().astype(str)
-        if len(texts) < 5:  # Skip if too few examples
-            continue
-            
-        # Join all texts
-        text = ' '.join(texts)
-        
-        # Generate word cloud
-        wordcloud = WordCloud(width=800, height=400, background_color='white', 
-                             max_words=100, contour_width=3, contour_color='steelblue')
-        wordcloud.generate(text)
-        
-        # Save the word cloud
-        plt.figure(figsize=(10, 6))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
-        plt.title(f'Common Words in Fronted Elements: {func}')
-        plt.tight_layout()
-        plt.savefig(f'wordcloud_{func.replace(" ", "_")}.png', dpi=300)
-        plt.close()
-        
-        print(f"  - Generated word cloud for {func}")
+    # The word clouds are optional: if the term matrix cannot be built, only they are skipped
+    try:
+        queue_wordclouds(df, figures, output_dir)
+    except Exception as e:
+        print(f"  Could not generate the word clouds: {str(e)}")
     
     # 4. Analyze verb patterns by discourse function
     print("\n4. Analyzing verb patterns by discourse function")
-    verb_by_function = df.groupby('Discourse Function')['Verb'].apply(lambda x: x.value_counts().head(5))
+    verb_by_function = df.groupby('Discourse Function', observed=True)['Verb'].apply(lambda x: x.value_counts().head(5))
     print(verb_by_function)
     
     # Visualize the top 3 verbs for each discourse function
@@ -93,84 +151,54 @@ def perform_statistical_analysis(file_path):
             top_verbs[func] = verb_counts.head(3)
     
     if top_verbs:
-        # Create a figure with subplots
-        fig, axes = plt.subplots(len(top_verbs), 1, figsize=(10, 3*len(top_verbs)))
-        if len(top_verbs) == 1:
-            axes = [axes]
-            
-        for i, (func, verbs) in enumerate(top_verbs.items()):
-            verbs.plot(kind='barh', ax=axes[i], color=sns.color_palette('viridis', 3))
-            axes[i].set_title(f'Top 3 Verbs: {func}')
-            axes[i].set_xlabel('Count')
-            
-        plt.tight_layout()
-        plt.savefig('top_verbs_by_function.png', dpi=300)
-        plt.close()
+        add_figure(figures, draw_top_verbs, f'{output_dir}/top_verbs_by_function.png', top_verbs=top_verbs)
         print("  - Generated visualization of top verbs by discourse function")
     
     # 5. Information complexity analysis
     print("\n5. Information complexity analysis")
     
-    # Function to count words
-    def count_words(text):
-        if pd.isna(text):
-            return 0
-        return len(str(text).split())
-    
-    # Create columns for word counts
-    df['Fronted_Word_Count'] = df['Fronted Element'].apply(count_words)
-    df['Subject_Word_Count'] = df['Subject'].apply(count_words)
-    
-    # Analyze by discourse function
-    word_counts = df.groupby('Discourse Function')[['Fronted_Word_Count', 'Subject_Word_Count']].agg(['mean', 'median'])
+    # Analyze word counts (computed when loading) by discourse function
+    word_counts = df.groupby('Discourse Function', observed=True)[['Fronted_Word_Count', 'Subject_Word_Count']].agg(['mean', 'median'])
     print(word_counts)
     
     # Visualize the complexity ratio (Subject words / Fronted words) by discourse function
     df['Complexity_Ratio'] = df['Subject_Word_Count'] / df['Fronted_Word_Count'].replace(0, 1)
-    ratio_by_function = df.groupby('Discourse Function')['Complexity_Ratio'].median().sort_values(ascending=False)
+    ratio_by_function = df.groupby('Discourse Function', observed=True)['Complexity_Ratio'].median().sort_values(ascending=False)
     
-    plt.figure(figsize=(12, 6))
-    sns.barplot(x=ratio_by_function.index, y=ratio_by_function.values, palette='viridis')
-    plt.title('Median Ratio of Subject Words to Fronted Element Words by Discourse Function')
-    plt.xlabel('Discourse Function')
-    plt.ylabel('Median Ratio (Subject Words / Fronted Words)')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.savefig('complexity_ratio_by_function.png', dpi=300)
-    plt.close()
+    add_figure(figures, draw_function_bars, f'{output_dir}/complexity_ratio_by_function.png', values=ratio_by_function,
+               title='Median Ratio of Subject Words to Fronted Element Words by Discourse Function',
+               ylabel='Median Ratio (Subject Words / Fronted Words)')
     print("  - Generated complexity ratio analysis")
     
     return {
         'chi_square_result': {'chi2': chi2, 'p_value': p, 'dof': dof},
         'word_counts': word_counts.to_dict(),
-        'ratio_by_function': ratio_by_function.to_dict()
+        'ratio_by_function': ratio_by_function.to_dict(),
+        'resampling': {
+            'locative_by_function': resampling_record(locative_resampling),
+            'element_type_by_info_structure': resampling_record(type_info_resampling),
+        }
     }
 
-def analyze_subject_characteristics(file_path):
+def draw_definite_subjects(definite_pct):
+    """
+    Draw the percentage of definite subjects per discourse function
+    """
+    plt.figure(figsize=(12, 6))
+    definite_pct.sort_values(ascending=False).plot(kind='bar', color='skyblue')
+    plt.title('Percentage of Subjects with Definite Determiners by Discourse Function')
+    plt.xlabel('Discourse Function')
+    plt.ylabel('Percentage')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+
+def analyze_subject_characteristics(data, figures=None, output_dir='.'):
     """
     Analyze the characteristics of subjects in inversions
     """
-    # Load the data
-    df = pd.read_csv(file_path)
-    
-    # Function to determine if a subject is definite (starts with 'the', 'this', etc.)
-    def is_definite(text):
-        if pd.isna(text):
-            return np.nan
-        text = str(text).lower().strip()
-        definite_markers = ['the ', 'this ', 'that ', 'these ', 'those ', 'my ', 'your ', 'our ', 'their ']
-        return any(text.startswith(marker) for marker in definite_markers)
-    
-    # Function to check if subject contains a number
-    def contains_number(text):
-        if pd.isna(text):
-            return np.nan
-        text = str(text)
-        return any(char.isdigit() for char in text)
-    
-    # Add columns for subject characteristics
-    df['Subject_Definite'] = df['Subject'].apply(is_definite)
-    df['Subject_Contains_Number'] = df['Subject'].apply(contains_number)
+    df = ensure_frame(data)
+    
+    # Subject_Definite and Subject_Contains_Number are computed once in features.py
     
     # Calculate percentages
     definite_pct = df['Subject_Definite'].mean() * 100
@@ -181,20 +209,13 @@ def analyze_subject_characteristics(file_path):
     print(f"Percentage of subjects containing numbers: {number_pct:.1f}%")
     
     # Analyze by discourse function
-    subject_char_by_function = df.groupby('Discourse Function')[['Subject_Definite', 'Subject_Contains_Number']].mean() * 100
+    subject_char_by_function = df.groupby('Discourse Function', observed=True)[['Subject_Definite', 'Subject_Contains_Number']].mean() * 100
     print("\nSubject characteristics by discourse function (%):")
     print(subject_char_by_function)
     
     # Visualize
-    plt.figure(figsize=(12, 6))
-    subject_char_by_function['Subject_Definite'].sort_values(ascending=False).plot(kind='bar', color='skyblue')
-    plt.title('Percentage of Subjects with Definite Determiners by Discourse Function')
-    plt.xlabel('Discourse Function')
-    plt.ylabel('Percentage')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.savefig('definite_subjects_by_function.png', dpi=300)
-    plt.close()
+    add_figure(figures, draw_definite_subjects, f'{output_dir}/definite_subjects_by_function.png',
+               definite_pct=subject_char_by_function['Subject_Definite'])
     
     return {
         'overall_definite_pct': definite_pct,
@@ -202,81 +223,92 @@ def analyze_subject_characteristics(file_path):
         'by_function': subject_char_by_function.to_dict()
     }
 
-def conduct_corpus_comparison(file_path):
+def draw_locative_by_source(locative_by_source):
+    """
+    Draw stacked bars of locative percentages per source
+    """
+    plt.figure(figsize=(10, 6))
+    locative_by_source.plot(kind='bar', stacked=True, colormap='viridis')
+    plt.title('Proportion of Locative vs. Non-locative Inversions by Source')
+    plt.xlabel('Source')
+    plt.ylabel('Percentage')
+    plt.xticks(rotation=45, ha='right')
+    plt.legend(title='Locative')
+    plt.tight_layout()
+
+def conduct_corpus_comparison(data, figures=None, output_dir='.'):
     """
     Compare inversion characteristics across different source files/corpus sections
     """
-    # Load the data
-    df = pd.read_csv(file_path)
+    df = ensure_frame(data)
     
     # Get the top source files (by frequency)
     top_sources = df['File'].value_counts().head(5).index.tolist()
     
     # Filter the dataframe to include only the top sources
-    df_top = df[df['File'].isin(top_sources)]
+    df_top = drop_unused_categories(df[df['File'].isin(top_sources)])
     
     print("\nCorpus Comparison Analysis:")
     print(f"Analyzing top {len(top_sources)} sources")
     
+    # P-values and confidence intervals of the per-source percentages
+    resampling = {}
+    
     # Compare fronted element types across sources
     element_type_by_source = pd.crosstab(df_top['File'], df_top['Fronted Element Type'], normalize='index') * 100
     print("\nFronted element types by source (%):")
     print(element_type_by_source)
+    resampling['element_type_by_source'] = resample_crosstab(pd.crosstab(df_top['File'], df_top['Fronted Element Type']))
+    print_resampling(resampling['element_type_by_source'])
     
     # Compare discourse functions across sources
     discourse_by_source = pd.crosstab(df_top['File'], df_top['Discourse Function'], normalize='index') * 100
     print("\nDiscourse functions by source (%):")
     print(discourse_by_source)
+    resampling['discourse_by_source'] = resample_crosstab(pd.crosstab(df_top['File'], df_top['Discourse Function']))
+    print_resampling(resampling['discourse_by_source'])
     
     # Visualize the differences
-    plt.figure(figsize=(14, 8))
-    sns.heatmap(discourse_by_source, annot=True, cmap='YlGnBu', fmt='.1f')
-    plt.title('Discourse Functions by Source (%)')
-    plt.ylabel('Source')
-    plt.xlabel('Discourse Function')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.savefig('discourse_by_source.png', dpi=300)
-    plt.close()
+    add_figure(figures, draw_heatmap, f'{output_dir}/discourse_by_source.png', table=discourse_by_source,
+               title='Discourse Functions by Source (%)', xlabel='Discourse Function', ylabel='Source',
+               figsize=(14, 8), rotate_xticks=True)
     
     # Compare locative vs. non-locative across sources
     locative_by_source = pd.crosstab(df_top['File'], df_top['Locative'], normalize='index') * 100
     print("\nLocative vs. non-locative by source (%):")
     print(locative_by_source)
+    resampling['locative_by_source'] = resample_crosstab(pd.crosstab(df_top['File'], df_top['Locative']))
+    print_resampling(resampling['locative_by_source'])
     
     # Visualize
-    plt.figure(figsize=(10, 6))
-    locative_by_source.plot(kind='bar', stacked=True, colormap='viridis')
-    plt.title('Proportion of Locative vs. Non-locative Inversions by Source')
-    plt.xlabel('Source')
-    plt.ylabel('Percentage')
-    plt.xticks(rotation=45, ha='right')
-    plt.legend(title='Locative')
-    plt.tight_layout()
-    plt.savefig('locative_by_source.png', dpi=300)
-    plt.close()
+    add_figure(figures, draw_locative_by_source, f'{output_dir}/locative_by_source.png', locative_by_source=locative_by_source)
     
     return {
         'element_type_by_source': element_type_by_source.to_dict(),
         'discourse_by_source': discourse_by_source.to_dict(),
-        'locative_by_source': locative_by_source.to_dict()
+        'locative_by_source': locative_by_source.to_dict(),
+        'resampling': {name: resampling_record(result) for name, result in resampling.items()}
     }
 
-def run_all_analyses(file_path):
+def run_all_analyses(data, figures=None, output_dir='.'):
     """
     Run all advanced analyses
+    (data is the shared inversion DataFrame or a CSV path; with a figures
+    list the plots are queued for rendering instead of drawn right away)
     """
     print("Beginning advanced statistical analyses...")
     
     try:
+        df = ensure_frame(data)
+        
         # Run the statistical analysis
-        stats_results = perform_statistical_analysis(file_path)
+        stats_results = perform_statistical_analysis(df, figures, output_dir)
         
         # Analyze subject characteristics
-        subject_results = analyze_subject_characteristics(file_path)
+        subject_results = analyze_subject_characteristics(df, figures, output_dir)
         
         # Conduct corpus comparison
-        corpus_results = conduct_corpus_comparison(file_path)
+        corpus_results = conduct_corpus_comparison(df, figures, output_dir)
         
         print("\nAll analyses completed successfully!")
         
@@ -0,0 +1,457 @@
+import numpy as np
+import pandas as pd
+from data_loading import fill_unknown
+from features import compute_features
+from resampling import resample_crosstab, resampling_record, print_resampling
+
+# Rows read per chunk
+CHUNK_SIZE = 100000
+
+# Relative accuracy of the quantile sketches: estimated quantiles are within 1% of a true value
+SKETCH_ACCURACY = 0.01
+
+# Columns read from the input; text columns are only needed for the derived features
+CHUNK_COLUMNS = ['File', 'Fronted Element Type', 'Locative', 'Discourse Function',
+                 'Information Structure', 'Verb', 'Fronted Element', 'Subject']
+
+# Columns whose value counts are accumulated
+VALUE_COUNT_COLUMNS = ['Fronted Element Type', 'Locative', 'Discourse Function',
+                       'Information Structure', 'File']
+
+# Column pairs whose cross-tabulations are accumulated (as counts)
+CROSSTAB_PAIRS = [('Locative', 'Discourse Function'),
+                  ('Fronted Element Type', 'Information Structure'),
+                  ('Discourse Function', 'Verb'),
+                  ('File', 'Fronted Element Type'),
+                  ('File', 'Discourse Function'),
+                  ('File', 'Locative')]
+
+# Columns averaged exactly (from sums and counts), integer columns whose medians
+# are exact (from value counts) and columns whose medians are estimated with
+# sketches, all per discourse function
+MEAN_COLUMNS = ['Fronted_Word_Count', 'Subject_Word_Count', 'Subject_Definite', 'Subject_Contains_Number']
+HISTOGRAM_COLUMNS = ['Fronted_Word_Count', 'Subject_Word_Count']
+SKETCH_COLUMNS = ['Complexity_Ratio']
+
+def read_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Yield the input in DataFrames of at most chunk_size rows
+    
+    CSV files are streamed with pandas; .parquet files (which need pyarrow)
+    are read batch by batch. Only CHUNK_COLUMNS are read; missing ones are
+    added as empty columns.
+    """
+    if file_path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        
+        parquet_file = pq.ParquetFile(file_path)
+        columns = [col for col in CHUNK_COLUMNS if col in parquet_file.schema_arrow.names]
+        chunks = (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns))
+    else:
+        available = pd.read_csv(file_path, nrows=0).columns
+        columns = [col for col in CHUNK_COLUMNS if col in available]
+        chunks = pd.read_csv(file_path, usecols=columns, dtype=str, chunksize=chunk_size)
+    
+    for chunk in chunks:
+        for col in CHUNK_COLUMNS:
+            if col not in chunk.columns:
+                chunk[col] = pd.Series(np.nan, index=chunk.index, dtype=object)
+        yield chunk
+
+def accumulate(total, counts):
+    """
+    Add the counts of one chunk to a running total (None before the first chunk)
+    """
+    if total is None:
+        return counts
+    return total.add(counts, fill_value=0)
+
+def new_sketch(relative_accuracy=SKETCH_ACCURACY):
+    """
+    Return an empty grouped quantile sketch
+    
+    Like DDSketch, values are counted in logarithmic buckets, so any quantile
+    is estimated within the relative accuracy, the memory needed only grows
+    with the log of the value range, and sketches of chunks merge exactly.
+    Positive and negative values have separate bucket counts per group.
+    """
+    return {
+        'gamma': (1 + relative_accuracy) / (1 - relative_accuracy),
+        'positive': None,
+        'negative': None,
+        'zeros': None,
+    }
+
+def add_to_sketch(sketch, groups, values):
+    """
+    Count the values of one chunk into the sketch, by group
+    (rows with a missing group or value are ignored)
+    """
+    groups = pd.Series(groups).reset_index(drop=True)
+    values = pd.Series(values, dtype=float).reset_index(drop=True)
+    log_gamma = np.log(sketch['gamma'])
+    
+    for store, mask, magnitude in (('positive', values > 0, values), ('negative', values < 0, -values)):
+        keys = np.ceil(np.log(magnitude[mask].to_numpy()) / log_gamma).astype(np.int64)
+        counts = pd.DataFrame({'group': groups[mask].to_numpy(), 'key': keys}).value_counts()
+        sketch[store] = accumulate(sketch[store], counts)
+    sketch['zeros'] = accumulate(sketch['zeros'], groups[values == 0].value_counts())
+
+def sketch_groups(sketch):
+    """
+    Return the groups with at least one value in the sketch
+    """
+    groups = set()
+    for store in ('positive', 'negative'):
+        if sketch[store] is not None:
+            groups.update(sketch[store].index.get_level_values('group'))
+    if sketch['zeros'] is not None:
+        groups.update(sketch['zeros'][sketch['zeros'] > 0].index)
+    return sorted(groups)
+
+def sketch_quantiles(sketch, q=0.5):
+    """
+    Estimate the q-quantile of every group from the bucket centres
+    """
+    gamma = sketch['gamma']
+    quantiles = {}
+    for group in sketch_groups(sketch):
+        parts = []
+        for store, sign in (('negative', -1), ('positive', 1)):
+            if sketch[store] is None or group not in sketch[store].index.get_level_values('group'):
+                continue
+            buckets = sketch[store].xs(group, level='group').sort_index()
+            # The centre of bucket k, which holds the values in (gamma^(k-1), gamma^k]
+            bucket_values = sign * 2 * gamma ** buckets.index.to_numpy(dtype=float) / (gamma + 1)
+            parts.append(pd.Series(buckets.to_numpy(), index=bucket_values))
+        zeros = sketch['zeros'].get(group, 0) if sketch['zeros'] is not None else 0
+        parts.append(pd.Series([zeros], index=[0.0]))
+        
+        quantiles[group] = counted_quantile(pd.concat(parts), q)
+    return pd.Series(quantiles, dtype=float)
+
+def counted_quantile(counts, q=0.5):
+    """
+    Return the q-quantile of values given as a Series of counts indexed by value,
+    interpolating between the two nearest ranks like pandas' quantile and median
+    """
+    counts = counts[counts > 0].sort_index()
+    cumulative = counts.to_numpy().cumsum()
+    rank = q * (cumulative[-1] - 1)
+    lower = counts.index[np.searchsorted(cumulative, np.floor(rank), side='right')]
+    upper = counts.index[np.searchsorted(cumulative, np.ceil(rank), side='right')]
+    return lower + (upper - lower) * (rank - np.floor(rank))
+
+def histogram_quantiles(histogram, q=0.5):
+    """
+    Return the exact q-quantile of every group from (group, value) counts
+    """
+    if histogram is None:
+        return pd.Series(dtype=float)
+    return pd.Series({group: counted_quantile(histogram.xs(group, level=0).astype(float), q)
+                      for group in histogram.index.get_level_values(0).unique().sort_values()}, dtype=float)
+
+def aggregate_inversions(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Stream the input once and accumulate everything the chunked analyses need
+    
+    Memory only grows with the number of distinct values (files, verbs,
+    categories) and sketch buckets, not with the number of rows. Missing
+    categories become 'Unknown' and the word counts and subject features are
+    computed per chunk, as when loading the whole file.
+    """
+    aggregates = {
+        'source': file_path,
+        'rows': 0,
+        'chunks': 0,
+        'value_counts': {col: None for col in VALUE_COUNT_COLUMNS},
+        # Values in order of first appearance, like Series.unique()
+        'first_seen': {col: {} for col in VALUE_COUNT_COLUMNS},
+        'crosstabs': {pair: None for pair in CROSSTAB_PAIRS},
+        # (Discourse Function, Verb) pairs in order of first appearance, to break ties like value_counts
+        'first_seen_verbs': {},
+        'sums': None,
+        'counts': None,
+        'histograms': {col: None for col in HISTOGRAM_COLUMNS},
+        'sketches': {col: new_sketch() for col in SKETCH_COLUMNS},
+    }
+    
+    for chunk in read_chunks(file_path, chunk_size):
+        fill_unknown(chunk)
+        features = compute_features(chunk)
+        chunk = chunk.join(features)
+        chunk['Complexity_Ratio'] = chunk['Subject_Word_Count'] / chunk['Fronted_Word_Count'].replace(0, 1)
+        
+        aggregates['rows'] += len(chunk)
+        aggregates['chunks'] += 1
+        
+        for col in VALUE_COUNT_COLUMNS:
+            aggregates['value_counts'][col] = accumulate(aggregates['value_counts'][col], chunk[col].value_counts())
+            aggregates['first_seen'][col].update(dict.fromkeys(chunk[col].dropna().unique()))
+        
+        for pair in CROSSTAB_PAIRS:
+            counts = chunk.groupby(list(pair)).size()
+            aggregates['crosstabs'][pair] = accumulate(aggregates['crosstabs'][pair], counts)
+        verbs = chunk[['Discourse Function', 'Verb']].dropna()
+        aggregates['first_seen_verbs'].update(dict.fromkeys(zip(verbs['Discourse Function'], verbs['Verb'])))
+        
+        by_function = chunk.groupby('Discourse Function')[MEAN_COLUMNS]
+        aggregates['sums'] = accumulate(aggregates['sums'], by_function.sum().astype(float))
+        aggregates['counts'] = accumulate(aggregates['counts'], by_function.count())
+        
+        for col in HISTOGRAM_COLUMNS:
+            counts = chunk.groupby(['Discourse Function', col]).size()
+            aggregates['histograms'][col] = accumulate(aggregates['histograms'][col], counts)
+        for col in SKETCH_COLUMNS:
+            add_to_sketch(aggregates['sketches'][col], chunk['Discourse Function'], chunk[col])
+    
+    print(f"Aggregated {aggregates['rows']} rows in {aggregates['chunks']} chunks from {file_path}")
+    return aggregates
+
+def value_counts(aggregates, col):
+    """
+    Return the accumulated value counts of a column, most frequent first
+    """
+    counts = aggregates['value_counts'][col]
+    if counts is None:
+        return pd.Series(dtype=int, name='count')
+    counts = counts.astype(int).sort_values(ascending=False, kind='stable')
+    counts.index.name = col
+    return counts.rename('count')
+
+def crosstab(aggregates, index, columns, normalize=False):
+    """
+    Return the accumulated cross-tabulation of two columns, like pd.crosstab
+    (with normalize=True, as row fractions)
+    """
+    counts = aggregates['crosstabs'][(index, columns)]
+    if counts is None:
+        return pd.DataFrame()
+    table = counts.unstack(fill_value=0).astype(int)
+    table.index.name, table.columns.name = index, columns
+    if normalize:
+        return table.div(table.sum(axis=1), axis=0)
+    return table
+
+def group_means(aggregates):
+    """
+    Return the exact means of MEAN_COLUMNS per discourse function
+    """
+    return aggregates['sums'] / aggregates['counts']
+
+def group_medians(aggregates, col):
+    """
+    Return the medians of a column per discourse function
+    (exact for HISTOGRAM_COLUMNS, sketch estimates otherwise)
+    """
+    if col in aggregates['histograms']:
+        medians = histogram_quantiles(aggregates['histograms'][col], 0.5)
+    else:
+        medians = sketch_quantiles(aggregates['sketches'][col], 0.5)
+    medians.index.name = 'Discourse Function'
+    return medians
+
+def sorted_verb_counts(aggregates):
+    """
+    Return the (Discourse Function, Verb) counts, most frequent first and ties
+    in order of first appearance, as value_counts orders them
+    """
+    counts = aggregates['crosstabs'][('Discourse Function', 'Verb')]
+    if counts is None:
+        return pd.Series(dtype=int)
+    first_seen = {pair: i for i, pair in enumerate(aggregates['first_seen_verbs'])}
+    order = np.lexsort((np.array([first_seen[pair] for pair in counts.index]), -counts.to_numpy()))
+    return counts.astype(int).iloc[order]
+
+def summary_report(aggregates):
+    """
+    Return the counts of the summary report
+    """
+    return {
+        'total_inversions': aggregates['rows'],
+        'fronted_element_types': value_counts(aggregates, 'Fronted Element Type').to_dict(),
+        'locative_counts': value_counts(aggregates, 'Locative').to_dict(),
+        'discourse_functions': value_counts(aggregates, 'Discourse Function').to_dict(),
+        'information_structure': value_counts(aggregates, 'Information Structure').to_dict(),
+    }
+
+def perform_chunked_statistical_analysis(aggregates, figures=None, output_dir='.'):
+    """
+    Chunked counterpart of perform_statistical_analysis
+    
+    Word clouds need the fronted element texts and are not drawn; the
+    complexity ratio medians are sketch estimates.
+    """
+    from scipy import stats
+    from additional_analyses import draw_heatmap, draw_top_verbs, draw_function_bars
+    from rendering import add_figure
+    
+    # 1. Chi-square test for independence between locative status and discourse function
+    print("\n1. Chi-square Test: Locative Status vs. Discourse Function")
+    contingency_table = crosstab(aggregates, 'Locative', 'Discourse Function')
+    chi2, p, dof, expected = stats.chi2_contingency(contingency_table)
+    print(f"Chi-square value: {chi2:.2f}")
+    print(f"p-value: {p:.4f}")
+    print(f"Degrees of freedom: {dof}")
+    print("Interpretation: " + ("Significant association" if p < 0.05 else "No significant association"))
+    locative_resampling = resample_crosstab(contingency_table)
+    print_resampling(locative_resampling)
+    
+    # 2. Relationship between fronted element type and information structure
+    print("\n2. Fronted Element Type vs. Information Structure")
+    type_info_table = crosstab(aggregates, 'Fronted Element Type', 'Information Structure', normalize=True) * 100
+    print(type_info_table)
+    type_info_resampling = resample_crosstab(crosstab(aggregates, 'Fronted Element Type', 'Information Structure'))
+    print_resampling(type_info_resampling)
+    
+    add_figure(figures, draw_heatmap, f'{output_dir}/element_type_vs_info_structure.png', table=type_info_table,
+               title='Relationship: Fronted Element Types and Information Structure (%)',
+               xlabel='Information Structure', ylabel='Fronted Element Type')
+    
+    # 3. Verb patterns by discourse function
+    print("\n3. Analyzing verb patterns by discourse function")
+    verb_counts = sorted_verb_counts(aggregates)
+    verb_by_function = verb_counts.groupby(level='Discourse Function', sort=True).head(5).sort_index(level=0, sort_remaining=False)
+    print(verb_by_function)
+    
+    top_verbs = {}
+    for func in aggregates['first_seen']['Discourse Function']:
+        if func == 'Unknown' or func not in verb_counts.index.get_level_values(0):
+            continue
+        
+        counts = verb_counts.xs(func, level='Discourse Function').rename('count')
+        if len(counts) >= 3:
+            top_verbs[func] = counts.head(3)
+    
+    if top_verbs:
+        add_figure(figures, draw_top_verbs, f'{output_dir}/top_verbs_by_function.png', top_verbs=top_verbs)
+        print("  - Generated visualization of top verbs by discourse function")
+    
+    # 4. Information complexity analysis
+    print("\n4. Information complexity analysis")
+    means = group_means(aggregates)
+    word_counts = pd.concat({(col, stat): values
+                             for col in ['Fronted_Word_Count', 'Subject_Word_Count']
+                             for stat, values in (('mean', means[col]), ('median', group_medians(aggregates, col)))},
+                            axis=1)
+    print(word_counts)
+    
+    ratio_by_function = group_medians(aggregates, 'Complexity_Ratio').sort_values(ascending=False)
+    add_figure(figures, draw_function_bars, f'{output_dir}/complexity_ratio_by_function.png', values=ratio_by_function,
+               title='Median Ratio of Subject Words to Fronted Element Words by Discourse Function',
+               ylabel='Median Ratio (Subject Words / Fronted Words)')
+    print("  - Generated complexity ratio analysis")
+    
+    return {
+        'chi_square_result': {'chi2': chi2, 'p_value': p, 'dof': dof},
+        'word_counts': word_counts.to_dict(),
+        'ratio_by_function': ratio_by_function.to_dict(),
+        'resampling': {
+            'locative_by_function': resampling_record(locative_resampling),
+            'element_type_by_info_structure': resampling_record(type_info_resampling),
+        }
+    }
+
+def analyze_chunked_subject_characteristics(aggregates, figures=None, output_dir='.'):
+    """
+    Chunked counterpart of analyze_subject_characteristics
+    """
+    from additional_analyses import draw_definite_subjects
+    from rendering import add_figure
+    
+    sums, counts = aggregates['sums'], aggregates['counts']
+    definite_pct = sums['Subject_Definite'].sum() / counts['Subject_Definite'].sum() * 100
+    number_pct = sums['Subject_Contains_Number'].sum() / counts['Subject_Contains_Number'].sum() * 100
+    
+    print("\nSubject Characteristics Analysis:")
+    print(f"Percentage of subjects with definite determiners: {definite_pct:.1f}%")
+    print(f"Percentage of subjects containing numbers: {number_pct:.1f}%")
+    
+    subject_char_by_function = group_means(aggregates)[['Subject_Definite', 'Subject_Contains_Number']] * 100
+    print("\nSubject characteristics by discourse function (%):")
+    print(subject_char_by_function)
+    
+    add_figure(figures, draw_definite_subjects, f'{output_dir}/definite_subjects_by_function.png',
+               definite_pct=subject_char_by_function['Subject_Definite'])
+    
+    return {
+        'overall_definite_pct': definite_pct,
+        'overall_number_pct': number_pct,
+        'by_function': subject_char_by_function.to_dict()
+    }
+
+def conduct_chunked_corpus_comparison(aggregates, figures=None, output_dir='.'):
+    """
+    Chunked counterpart of conduct_corpus_comparison
+    """
+    from additional_analyses import draw_heatmap, draw_locative_by_source
+    from rendering import add_figure
+    
+    # Get the top source files (by frequency)
+    top_sources = value_counts(aggregates, 'File').head(5).index.tolist()
+    
+    print("\nCorpus Comparison Analysis:")
+    print(f"Analyzing top {len(top_sources)} sources")
+    
+    # P-values and confidence intervals of the per-source percentages
+    resampling = {}
+    
+    def by_source(columns, name):
+        table = crosstab(aggregates, 'File', columns)
+        table = table.loc[table.index.isin(top_sources)]
+        # Only values that occur in the top sources, as after filtering the full frame
+        table = table.loc[:, table.sum() > 0]
+        resampling[name] = resample_crosstab(table)
+        return table.div(table.sum(axis=1), axis=0) * 100
+    
+    element_type_by_source = by_source('Fronted Element Type', 'element_type_by_source')
+    print("\nFronted element types by source (%):")
+    print(element_type_by_source)
+    print_resampling(resampling['element_type_by_source'])
+    
+    discourse_by_source = by_source('Discourse Function', 'discourse_by_source')
+    print("\nDiscourse functions by source (%):")
+    print(discourse_by_source)
+    print_resampling(resampling['discourse_by_source'])
+    
+    add_figure(figures, draw_heatmap, f'{output_dir}/discourse_by_source.png', table=discourse_by_source,
+               title='Discourse Functions by Source (%)', xlabel='Discourse Function', ylabel='Source',
+               figsize=(14, 8), rotate_xticks=True)
+    
+    locative_by_source = by_source('Locative', 'locative_by_source')
+    print("\nLocative vs. non-locative by source (%):")
+    print(locative_by_source)
+    print_resampling(resampling['locative_by_source'])
+    
+    add_figure(figures, draw_locative_by_source, f'{output_dir}/locative_by_source.png', locative_by_source=locative_by_source)
+    
+    return {
+        'element_type_by_source': element_type_by_source.to_dict(),
+        'discourse_by_source': discourse_by_source.to_dict(),
+        'locative_by_source': locative_by_source.to_dict(),
+        'resampling': {name: resampling_record(result) for name, result in resampling.items()}
+    }
+
+def run_chunked_analyses(aggregates, figures=None, output_dir='.'):
+    """
+    Run the statistical analyses and the corpus comparison on aggregated counts
+    (the chunked counterpart of run_all_analyses)
+    """
+    print("Beginning chunked statistical analyses...")
+    
+    try:
+        stats_results = perform_chunked_statistical_analysis(aggregates, figures, output_dir)
+        subject_results = analyze_chunked_subject_characteristics(aggregates, figures, output_dir)
+        corpus_results = conduct_chunked_corpus_comparison(aggregates, figures, output_dir)
+        
+        print("\nAll analyses completed successfully!")
+        
+        return {
+            'stats_results': stats_results,
+            'subject_results': subject_results,
+            'corpus_results': corpus_results
+        }
+    
+    except Exception as e:
+        print(f"Error during analysis: {str(e)}")
+        return None
@@ -1,100 +1,121 @@
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.feature_extraction.text import CountVectorizer
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import nltk
-import re
-from collections import Counter
+from data_loading import ensure_frame
+from term_matrix import term_matrix, top_keywords, top_keywords_by_group, log_likelihood_keyness
+from rendering import add_figure
+from resampling import resample_crosstab, resampling_record, print_resampling
 
-# Download NLTK resources if needed
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
+# Values of the Locative column for locative and non-locative inversions
+# (the analyser writes 'Locative'/'Non-locative', older files use 'yes'/'no')
+LOCATIVE_STATUS = {'Locative': 'locative', 'yes': 'locative',
+                   'Non-locative': 'non-locative', 'no': 'non-locative'}
 
-def load_data(file_path):
+def draw_bars(values, title, xlabel, ylabel, figsize=(10, 6), rotate_xticks=False):
     """
-    Load and prepare the CSV data
+    Draw a vertical bar plot of a Series
     """
-    df = pd.read_csv(file_path)
-    print(f"Loaded {len(df)} rows from {file_path}")
-    return df
+    plt.figure(figsize=figsize)
+    sns.barplot(x=values.index.astype(str), y=values.values, palette='viridis')
+    plt.title(title, fontsize=16)
+    plt.xlabel(xlabel, fontsize=14)
+    plt.ylabel(ylabel, fontsize=14)
+    if rotate_xticks:
+        plt.xticks(rotation=45, ha='right')
+    else:
+        plt.xticks(rotation=0)
+    plt.tight_layout()
 
-def analyze_context_keywords(df, output_dir='.'):
+def draw_length_distribution(lengths, title):
     """
-    Analyze keywords in the context around inversions
+    Draw a histogram of word lengths with their mean and median
     """
-    print("\nAnalyzing contextual keywords...")
+    mean, median = lengths.mean(), lengths.median()
     
-    # Combine fronted elements for analysis
-    all_fronted = df['Fronted Element'].dropna().astype(str).tolist()
+    plt.figure(figsize=(10, 6))
+    sns.histplot(lengths, bins=15, kde=True)
+    plt.title(title, fontsize=16)
+    plt.xlabel('Number of Words', fontsize=14)
+    plt.ylabel('Frequency', fontsize=14)
+    plt.axvline(mean, color='red', linestyle='--', label=f"Mean: {mean:.2f}")
+    plt.axvline(median, color='green', linestyle='--', label=f"Median: {median:.2f}")
+    plt.legend()
+    plt.tight_layout()
+
+def draw_top_keywords(top_keywords):
+    """
+    Draw a bar plot of the top keywords in fronted elements
+    """
+    plt.figure(figsize=(12, 8))
+    words, counts = zip(*top_keywords)
+    sns.barplot(x=list(counts), y=list(words), palette='viridis')
+    plt.title('Top 20 Keywords in Fronted Elements', fontsize=16)
+    plt.xlabel('Frequency', fontsize=14)
+    plt.ylabel('Keyword', fontsize=14)
+    plt.tight_layout()
+
+def draw_locative_keywords(locative_counts, non_locative_counts):
+    """
+    Draw the top keywords of locative and non-locative fronted elements side by side
+    """
+    loc_words, loc_counts = zip(*locative_counts)
+    non_loc_words, non_loc_counts = zip(*non_locative_counts)
+    
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
     
-    # Get English stopwords
-    stop_words = set(stopwords.words('english'))
+    # Locative keywords
+    sns.barplot(x=list(loc_counts), y=list(loc_words), palette='Blues_r', ax=ax1)
+    ax1.set_title('Top Keywords in Locative Fronted Elements', fontsize=14)
+    ax1.set_xlabel('Frequency', fontsize=12)
+    ax1.set_ylabel('Keyword', fontsize=12)
     
-    # Additional words to exclude (common function words and prepositions)
-    additional_exclude = {'in', 'on', 'at', 'by', 'to', 'from', 'with', 'for', 'of', 'the', 
-                         'a', 'an', 'and', 'or', 'is', 'are', 'was', 'were', 'be', 'been',
-                         'this', 'that', 'these', 'those', 'there', 'here', 'their', 'its'}
-    stop_words.update(additional_exclude)
+    # Non-locative keywords
+    sns.barplot(x=list(non_loc_counts), y=list(non_loc_words), palette='Oranges_r', ax=ax2)
+    ax2.set_title('Top Keywords in Non-locative Fronted Elements', fontsize=14)
+    ax2.set_xlabel('Frequency', fontsize=12)
+    ax2.set_ylabel('', fontsize=12)  # No label needed for second plot
     
-    # Process text to extract meaningful words
-    def extract_keywords(text):
-        # Lowercase and tokenize
-        tokens = word_tokenize(text.lower())
-        # Remove stopwords, short words, and non-alphabetic tokens
-        keywords = [word for word in tokens if word not in stop_words 
-                   and len(word) > 2 and word.isalpha()]
-        return keywords
+    plt.tight_layout()
+
+def draw_start_type_vs_discourse(cross_tab):
+    """
+    Draw a heatmap of discourse functions per fronted element start type
+    """
+    plt.figure(figsize=(14, 10))
+    sns.heatmap(cross_tab, annot=True, cmap='YlGnBu', fmt='.1f')
+    plt.title('Relationship Between Fronted Element Start Types and Discourse Functions (%)', fontsize=16)
+    plt.xlabel('Discourse Function', fontsize=14)
+    plt.ylabel('Fronted Element Start Type', fontsize=14)
+    plt.tight_layout()
+
+def analyze_context_keywords(df, output_dir='.', figures=None):
+    """
+    Analyze keywords in the context around inversions
+    """
+    print("\nAnalyzing contextual keywords...")
     
-    # Extract keywords from all fronted elements
-    all_keywords = []
-    for text in all_fronted:
-        all_keywords.extend(extract_keywords(text))
+    # Every keyword count below is a column sum of the fronted element term matrix
+    matrix, terms = term_matrix(df, 'Fronted Element')
     
-    # Count keyword frequencies
-    keyword_counts = Counter(all_keywords)
-    top_keywords = keyword_counts.most_common(20)
+    top_keywords_overall = top_keywords(matrix, terms, 20)
     
     print("Top 20 keywords in fronted elements:")
-    for word, count in top_keywords:
+    for word, count in top_keywords_overall:
         print(f"  {word}: {count}")
     
     # Visualize top keywords
-    plt.figure(figsize=(12, 8))
-    words, counts = zip(*top_keywords)
-    sns.barplot(x=list(counts), y=list(words), palette='viridis')
-    plt.title('Top 20 Keywords in Fronted Elements', fontsize=16)
-    plt.xlabel('Frequency', fontsize=14)
-    plt.ylabel('Keyword', fontsize=14)
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/top_keywords.png', dpi=300)
-    plt.close()
+    if top_keywords_overall:
+        add_figure(figures, draw_top_keywords, f'{output_dir}/top_keywords.png', top_keywords=top_keywords_overall)
     
     # Analyze keywords by locative status
+    locative_counts = []
+    non_locative_counts = []
+    locative_keyness = pd.DataFrame()
     if 'Locative' in df.columns:
-        locative_keywords = []
-        non_locative_keywords = []
-        
-        for i, row in df.iterrows():
-            if pd.isna(row['Fronted Element']) or pd.isna(row['Locative']):
-                continue
-                
-            keywords = extract_keywords(str(row['Fronted Element']))
-            
-            if row['Locative'] == 'yes':
-                locative_keywords.extend(keywords)
-            elif row['Locative'] == 'no':
-                non_locative_keywords.extend(keywords)
-        
-        # Count keyword frequencies
-        locative_counts = Counter(locative_keywords).most_common(10)
-        non_locative_counts = Counter(non_locative_keywords).most_common(10)
+        locative_status = df['Locative'].astype(object).map(LOCATIVE_STATUS)
+        by_status = top_keywords_by_group(matrix, terms, locative_status, 10)
+        locative_counts = by_status.get('locative', [])
+        non_locative_counts = by_status.get('non-locative', [])
         
         print("\nTop 10 keywords in locative fronted elements:")
         for word, count in locative_counts:
@@ -104,81 +125,43 @@ def analyze_context_keywords(df, output_dir='.'):
         for word, count in non_locative_counts:
             print(f"  {word}: {count}")
         
-        # Combine for visualization
-        loc_words, loc_counts = zip(*locative_counts) if locative_counts else ([], [])
-        non_loc_words, non_loc_counts = zip(*non_locative_counts) if non_locative_counts else ([], [])
+        # Keywords distinguishing locative from non-locative fronted elements
+        keyness = log_likelihood_keyness(matrix, terms, locative_status, 'locative', 'non-locative')
+        locative_keyness = keyness.head(10)
+        
+        print("\nKeywords distinguishing locative fronted elements (log-likelihood):")
+        for row in locative_keyness.itertuples():
+            print(f"  {row.term}: {row.log_likelihood:.2f} ({row.use}, {row.target_freq} vs. {row.reference_freq})")
         
         # Create comparative visualization
-        if loc_words and non_loc_words:
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
-            
-            # Locative keywords
-            sns.barplot(x=list(loc_counts), y=list(loc_words), palette='Blues_r', ax=ax1)
-            ax1.set_title('Top Keywords in Locative Fronted Elements', fontsize=14)
-            ax1.set_xlabel('Frequency', fontsize=12)
-            ax1.set_ylabel('Keyword', fontsize=12)
-            
-            # Non-locative keywords
-            sns.barplot(x=list(non_loc_counts), y=list(non_loc_words), palette='Oranges_r', ax=ax2)
-            ax2.set_title('Top Keywords in Non-locative Fronted Elements', fontsize=14)
-            ax2.set_xlabel('Frequency', fontsize=12)
-            ax2.set_ylabel('', fontsize=12)  # No label needed for second plot
-            
-            plt.tight_layout()
-            plt.savefig(f'{output_dir}/locative_vs_nonlocative_keywords.png', dpi=300)
-            plt.close()
+        if locative_counts and non_locative_counts:
+            add_figure(figures, draw_locative_keywords, f'{output_dir}/locative_vs_nonlocative_keywords.png',
+                       locative_counts=locative_counts, non_locative_counts=non_locative_counts)
+    
+    # Analyze keywords by discourse function
+    function_keywords = {}
+    if 'Discourse Function' in df.columns:
+        function_keywords = top_keywords_by_group(matrix, terms, df['Discourse Function'], 10)
+        
+        print("\nTop 5 keywords by discourse function:")
+        for func, counts in function_keywords.items():
+            print(f"  {func}: {', '.join(word for word, count in counts[:5])}")
     
     return {
-        'top_keywords': dict(top_keywords),
-        'locative_keywords': dict(locative_counts) if 'locative_counts' in locals() else {},
-        'non_locative_keywords': dict(non_locative_counts) if 'non_locative_counts' in locals() else {}
+        'top_keywords': dict(top_keywords_overall),
+        'locative_keywords': dict(locative_counts),
+        'non_locative_keywords': dict(non_locative_counts),
+        'locative_keyness': locative_keyness.to_dict('records'),
+        'keywords_by_function': {func: dict(counts) for func, counts in function_keywords.items()}
     }
 
-def analyze_fronted_element_patterns(df, output_dir='.'):
+def analyze_fronted_element_patterns(df, output_dir='.', figures=None):
     """
     Analyze syntactic patterns in fronted elements
     """
     print("\nAnalyzing fronted element patterns...")
     
-    # Function to classify the start of fronted elements
-    def classify_start(text):
-        if pd.isna(text):
-            return 'Unknown'
-            
-        text = str(text).strip().lower()
-        
-        # Check for prepositions at the beginning
-        prepositions = ['in', 'on', 'at', 'by', 'with', 'from', 'to', 'into', 'onto', 'under', 
-                        'over', 'through', 'behind', 'below', 'above', 'beside', 'beneath', 
-                        'between', 'beyond', 'among', 'across', 'around', 'along', 'against']
-        
-        for prep in prepositions:
-            if text.startswith(f"{prep} "):
-                return 'Preposition'
-        
-        # Check for adverbs at the beginning
-        adverbs = ['here', 'there', 'now', 'then', 'thus', 'hence', 'perhaps', 'maybe', 
-                  'clearly', 'obviously', 'certainly', 'surely', 'indeed', 'especially',
-                  'particularly', 'specifically', 'notably', 'importantly', 'significantly']
-        
-        for adv in adverbs:
-            if text.startswith(f"{adv} ") or text == adv:
-                return 'Adverb'
-        
-        # Check for adjectives at the beginning
-        adjectives = ['more', 'less', 'most', 'least', 'better', 'worse', 'best', 'worst',
-                     'important', 'significant', 'crucial', 'critical', 'essential', 'necessary',
-                     'interesting', 'surprising', 'striking', 'remarkable', 'notable', 'notable']
-        
-        for adj in adjectives:
-            if text.startswith(f"{adj} ") or text == adj:
-                return 'Adjective'
-                
-        # Default case
-        return 'Other'
-    
-    # Classify fronted elements
-    df['Fronted_Start'] = df['Fronted Element'].apply(classify_start)
+    # Fronted_Start is computed once in features.py
     
     # Count the frequencies of each start type
     start_counts = df['Fronted_Start'].value_counts()
@@ -188,42 +171,26 @@ def analyze_fronted_element_patterns(df, output_dir='.'):
         print(f"  {start}: {count} ({count/len(df)*100:.1f}%)")
     
     # Visualize
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x=start_counts.index, y=start_counts.values, palette='viridis')
-    plt.title('Distribution of Fronted Element Start Types', fontsize=16)
-    plt.xlabel('Start Type', fontsize=14)
-    plt.ylabel('Count', fontsize=14)
-    plt.xticks(rotation=0)
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/fronted_start_types.png', dpi=300)
-    plt.close()
+    add_figure(figures, draw_bars, f'{output_dir}/fronted_start_types.png', values=start_counts,
+               title='Distribution of Fronted Element Start Types', xlabel='Start Type', ylabel='Count')
     
     # Analyze relationship between start type and discourse function
+    start_type_resampling = None
     if 'Discourse Function' in df.columns:
         # Create a cross-tabulation
         cross_tab = pd.crosstab(df['Fronted_Start'], df['Discourse Function'], normalize='index') * 100
         
         print("\nRelationship between fronted element start type and discourse function (%):")
         print(cross_tab)
+        start_type_resampling = resample_crosstab(pd.crosstab(df['Fronted_Start'], df['Discourse Function']))
+        print_resampling(start_type_resampling)
         
         # Visualize
-        plt.figure(figsize=(14, 10))
-        sns.heatmap(cross_tab, annot=True, cmap='YlGnBu', fmt='.1f')
-        plt.title('Relationship Between Fronted Element Start Types and Discourse Functions (%)', fontsize=16)
-        plt.xlabel('Discourse Function', fontsize=14)
-        plt.ylabel('Fronted Element Start Type', fontsize=14)
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/start_type_vs_discourse.png', dpi=300)
-        plt.close()
-    
-    # Function to get the length of fronted elements in words
-    def count_words(text):
-        if pd.isna(text):
-            return 0
-        return len(str(text).split())
-    
-    # Add length information
-    df['Fronted_Length'] = df['Fronted Element'].apply(count_words)
+        add_figure(figures, draw_start_type_vs_discourse, f'{output_dir}/start_type_vs_discourse.png',
+                   cross_tab=cross_tab)
+    
+    # Add length information (word counts are computed when loading)
+    df['Fronted_Length'] = df['Fronted_Word_Count']
     
     # Analyze length distribution
     length_stats = df['Fronted_Length'].describe()
@@ -235,17 +202,8 @@ def analyze_fronted_element_patterns(df, output_dir='.'):
     print(f"  Max: {length_stats['max']:.0f}")
     
     # Visualize length distribution
-    plt.figure(figsize=(10, 6))
-    sns.histplot(df['Fronted_Length'], bins=15, kde=True)
-    plt.title('Distribution of Fronted Element Lengths (in words)', fontsize=16)
-    plt.xlabel('Number of Words', fontsize=14)
-    plt.ylabel('Frequency', fontsize=14)
-    plt.axvline(length_stats['mean'], color='red', linestyle='--', label=f"Mean: {length_stats['mean']:.2f}")
-    plt.axvline(length_stats['50%'], color='green', linestyle='--', label=f"Median: {length_stats['50%']:.2f}")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/fronted_length_distribution.png', dpi=300)
-    plt.close()
+    add_figure(figures, draw_length_distribution, f'{output_dir}/fronted_length_distribution.png',
+               lengths=df['Fronted_Length'], title='Distribution of Fronted Element Lengths (in words)')
     
     # Analyze length by start type
     length_by_start = df.groupby('Fronted_Start')['Fronted_Length'].mean().sort_values(ascending=False)
@@ -255,70 +213,38 @@ def analyze_fronted_element_patterns(df, output_dir='.'):
         print(f"  {start}: {avg_len:.2f} words")
     
     # Visualize
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x=length_by_start.index, y=length_by_start.values, palette='viridis')
-    plt.title('Average Fronted Element Length by Start Type', fontsize=16)
-    plt.xlabel('Start Type', fontsize=14)
-    plt.ylabel('Average Length (words)', fontsize=14)
-    plt.xticks(rotation=0)
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/length_by_start_type.png', dpi=300)
-    plt.close()
+    add_figure(figures, draw_bars, f'{output_dir}/length_by_start_type.png', values=length_by_start,
+               title='Average Fronted Element Length by Start Type', xlabel='Start Type',
+               ylabel='Average Length (words)')
     
     return {
         'start_type_distribution': start_counts.to_dict(),
         'length_statistics': length_stats.to_dict(),
-        'avg_length_by_start': length_by_start.to_dict()
+        'avg_length_by_start': length_by_start.to_dict(),
+        'start_type_by_function_resampling': resampling_record(start_type_resampling) if start_type_resampling else None
     }
 
-def analyze_subject_complexity(df, output_dir='.'):
+def analyze_subject_complexity(df, output_dir='.', figures=None):
     """
     Analyze the complexity and characteristics of subjects in inversions
     """
     print("\nAnalyzing subject complexity...")
     
-    # Function to determine if a subject has a modifier
-    def has_modifier(text):
-        if pd.isna(text):
-            return False
-            
-        text = str(text).lower()
-        # Check for adjectives, possessives, and relative clauses
-        modifiers = ['the', 'a', 'an', 'this', 'that', 'these', 'those', 'my', 'your', 'his', 'her', 
-                    'its', 'our', 'their', 'which', 'who', 'whose', 'where']
-        
-        # Check if any modifier is present
-        for mod in modifiers:
-            if f" {mod} " in f" {text} ":
-                return True
-                
-        # Check for adjectives
-        adj_patterns = [r'\b(new|old|big|small|large|little|good|bad|great|high|low)\b',
-                      r'\b(red|blue|green|black|white|yellow|brown|purple|pink)\b',
-                      r'\b(important|significant|relevant|critical|crucial|essential)\b',
-                      r'\b(interesting|fascinating|exciting|boring|surprising)\b']
-        
-        for pattern in adj_patterns:
-            if re.search(pattern, text):
-                return True
-                
-        return False
-    
-    # Function to count words in subject
-    def count_words(text):
-        if pd.isna(text):
-            return 0
-        return len(str(text).split())
-    
-    # Analyze subjects
-    df['Subject_Has_Modifier'] = df['Subject'].apply(has_modifier)
-    df['Subject_Word_Count'] = df['Subject'].apply(count_words)
+    # Subject_Has_Modifier is computed once in features.py
     
     # Calculate the percentage of subjects with modifiers
     modifier_pct = df['Subject_Has_Modifier'].mean() * 100
     
     print(f"Subjects with modifiers: {modifier_pct:.1f}%")
     
+    # Most frequent subject keywords, from the subject term matrix
+    subject_matrix, subject_terms = term_matrix(df, 'Subject')
+    subject_keywords = top_keywords(subject_matrix, subject_terms, 20)
+    
+    print("\nTop 20 keywords in subjects:")
+    for word, count in subject_keywords:
+        print(f"  {word}: {count}")
+    
     # Get subject length statistics
     subject_length_stats = df['Subject_Word_Count'].describe()
     
@@ -329,83 +255,62 @@ def analyze_subject_complexity(df, output_dir='.'):
     print(f"  Max: {subject_length_stats['max']:.0f}")
     
     # Visualize subject length distribution
-    plt.figure(figsize=(10, 6))
-    sns.histplot(df['Subject_Word_Count'], bins=15, kde=True)
-    plt.title('Distribution of Subject Lengths (in words)', fontsize=16)
-    plt.xlabel('Number of Words', fontsize=14)
-    plt.ylabel('Frequency', fontsize=14)
-    plt.axvline(subject_length_stats['mean'], color='red', linestyle='--', 
-               label=f"Mean: {subject_length_stats['mean']:.2f}")
-    plt.axvline(subject_length_stats['50%'], color='green', linestyle='--', 
-               label=f"Median: {subject_length_stats['50%']:.2f}")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/subject_length_distribution.png', dpi=300)
-    plt.close()
+    add_figure(figures, draw_length_distribution, f'{output_dir}/subject_length_distribution.png',
+               lengths=df['Subject_Word_Count'], title='Distribution of Subject Lengths (in words)')
     
     # Compare subject complexity across discourse functions
     if 'Discourse Function' in df.columns:
         # Calculate average subject length by discourse function
-        length_by_function = df.groupby('Discourse Function')['Subject_Word_Count'].mean().sort_values(ascending=False)
+        length_by_function = df.groupby('Discourse Function', observed=True)['Subject_Word_Count'].mean().sort_values(ascending=False)
         
         print("\nAverage subject length by discourse function:")
         for func, avg_len in length_by_function.items():
             print(f"  {func}: {avg_len:.2f} words")
         
         # Visualize
-        plt.figure(figsize=(12, 6))
-        sns.barplot(x=length_by_function.index, y=length_by_function.values, palette='viridis')
-        plt.title('Average Subject Length by Discourse Function', fontsize=16)
-        plt.xlabel('Discourse Function', fontsize=14)
-        plt.ylabel('Average Length (words)', fontsize=14)
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/subject_length_by_function.png', dpi=300)
-        plt.close()
+        add_figure(figures, draw_bars, f'{output_dir}/subject_length_by_function.png', values=length_by_function,
+                   title='Average Subject Length by Discourse Function', xlabel='Discourse Function',
+                   ylabel='Average Length (words)', figsize=(12, 6), rotate_xticks=True)
         
         # Calculate percentage of subjects with modifiers by discourse function
-        modifier_by_function = df.groupby('Discourse Function')['Subject_Has_Modifier'].mean() * 100
+        modifier_by_function = df.groupby('Discourse Function', observed=True)['Subject_Has_Modifier'].mean() * 100
         
         print("\nPercentage of subjects with modifiers by discourse function:")
         for func, pct in modifier_by_function.items():
             print(f"  {func}: {pct:.1f}%")
         
         # Visualize
-        plt.figure(figsize=(12, 6))
-        sns.barplot(x=modifier_by_function.index, y=modifier_by_function.values, palette='viridis')
-        plt.title('Percentage of Subjects with Modifiers by Discourse Function', fontsize=16)
-        plt.xlabel('Discourse Function', fontsize=14)
-        plt.ylabel('Percentage with Modifiers', fontsize=14)
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/subject_modifiers_by_function.png', dpi=300)
-        plt.close()
+        add_figure(figures, draw_bars, f'{output_dir}/subject_modifiers_by_function.png', values=modifier_by_function,
+                   title='Percentage of Subjects with Modifiers by Discourse Function', xlabel='Discourse Function',
+                   ylabel='Percentage with Modifiers', figsize=(12, 6), rotate_xticks=True)
     
     return {
         'modifier_percentage': modifier_pct,
+        'top_subject_keywords': dict(subject_keywords),
         'subject_length_stats': subject_length_stats.to_dict(),
         'length_by_function': length_by_function.to_dict() if 'length_by_function' in locals() else {},
         'modifier_by_function': modifier_by_function.to_dict() if 'modifier_by_function' in locals() else {}
     }
 
-def run_contextual_analyses(file_path, output_dir='.'):
+def run_contextual_analyses(data, output_dir='.', figures=None):
     """
     Run all contextual analyses
+    (data is the shared inversion DataFrame or a CSV path; with a figures
+    list the plots are queued for rendering instead of drawn right away)
     """
     print("Beginning contextual analyses...")
     
     try:
-        # Load the data
-        df = load_data(file_path)
+        df = ensure_frame(data)
         
         # Run the keyword analysis
-        keyword_results = analyze_context_keywords(df, output_dir)
+        keyword_results = analyze_context_keywords(df, output_dir, figures)
         
         # Analyze fronted element patterns
-        pattern_results = analyze_fronted_element_patterns(df, output_dir)
+        pattern_results = analyze_fronted_element_patterns(df, output_dir, figures)
         
         # Analyze subject complexity
-        subject_results = analyze_subject_complexity(df, output_dir)
+        subject_results = analyze_subject_complexity(df, output_dir, figures)
         
         print("\nAll contextual analyses completed successfully!")
         
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from features import add_features, has_features
+
+# Low-cardinality columns, stored as categoricals to save memory and speed up grouping
+CATEGORICAL_COLUMNS = ['File', 'Fronted Element Type', 'Locative', 'Quotative',
+                       'Discourse Function', 'Information Structure']
+
+# Categorical columns whose missing values are analysed as 'Unknown'
+UNKNOWN_COLUMNS = ['Fronted Element Type', 'Locative', 'Discourse Function', 'Information Structure']
+
+# Position of each row in the source CSV; it stays with the row through
+# filtering and re-indexing, so text analyses can find its term matrix row
+ROW_ID_COLUMN = 'Row_Id'
+
+def load_inversions(file_path):
+    """
+    Load the inversion CSV once for all analyses
+    
+    Low-cardinality columns are read as categoricals, missing categories are
+    filled with 'Unknown' and the derived feature columns (word counts,
+    subject and fronted element characteristics) are added from the feature
+    cache next to the CSV, so every analysis can share the same frame.
+    """
+    columns = pd.read_csv(file_path, nrows=0).columns
+    dtypes = {col: 'category' for col in CATEGORICAL_COLUMNS if col in columns}
+    df = pd.read_csv(file_path, dtype=dtypes)
+    
+    print(f"Loaded {len(df)} rows from {file_path}")
+    print(f"Missing values per column:\n{df.isnull().sum()}")
+    
+    # Lets text analyses find the term matrices stored next to the CSV
+    df.attrs['source'] = file_path
+    df[ROW_ID_COLUMN] = np.arange(len(df))
+    
+    # Fill missing values appropriately
+    fill_unknown(df)
+    
+    # Shared derived columns
+    return add_features(df, file_path)
+
+def fill_unknown(df):
+    """
+    Fill missing values of the UNKNOWN_COLUMNS with 'Unknown' in place
+    (for categorical and plain text columns alike)
+    """
+    for col in UNKNOWN_COLUMNS:
+        if col in df.columns and df[col].isna().any():
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and 'Unknown' not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories('Unknown')
+            df[col] = df[col].fillna('Unknown')
+    return df
+
+def ensure_frame(data):
+    """
+    Return data as a DataFrame, loading it first if a CSV path is given
+    (derived feature columns are added if a frame lacks them)
+    """
+    if isinstance(data, pd.DataFrame):
+        return data if has_features(data) else add_features(data)
+    return load_inversions(data)
+
+def drop_unused_categories(df):
+    """
+    Remove categories that no longer occur, e.g. after filtering rows,
+    so value counts and cross-tabulations only show observed values
+    """
+    df = df.copy()
+    for col in df.select_dtypes('category').columns:
+        df[col] = df[col].cat.remove_unused_categories()
+    return df
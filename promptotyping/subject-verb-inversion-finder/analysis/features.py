@@ -0,0 +1,172 @@
+import os
+import re
+import glob
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Bump when a feature definition below changes, to invalidate cached feature tables
+FEATURE_VERSION = 1
+
+# Columns computed by compute_features, in order
+FEATURE_COLUMNS = ['Fronted_Word_Count', 'Subject_Word_Count', 'Subject_Definite',
+                   'Subject_Contains_Number', 'Fronted_Start', 'Subject_Has_Modifier']
+
+WORD = re.compile(r'\S+')
+DIGIT = re.compile(r'\d')
+
+# Subjects starting with a definite determiner or possessive
+DEFINITE_START = re.compile(r'(?:the|this|that|these|those|my|your|our|their) ')
+
+# Word classes at the start of fronted elements, checked in this order
+PREPOSITION_START = re.compile(
+    r'(?:in|on|at|by|with|from|to|into|onto|under|over|through|behind|below|above|beside|beneath|'
+    r'between|beyond|among|across|around|along|against) ')
+ADVERB_START = re.compile(
+    r'(?:here|there|now|then|thus|hence|perhaps|maybe|clearly|obviously|certainly|surely|indeed|'
+    r'especially|particularly|specifically|notably|importantly|significantly)(?: |\Z)')
+ADJECTIVE_START = re.compile(
+    r'(?:more|less|most|least|better|worse|best|worst|important|significant|crucial|critical|'
+    r'essential|necessary|interesting|surprising|striking|remarkable|notable)(?: |\Z)')
+
+# Determiners, possessives and relative words as space-separated tokens, or common adjectives
+MODIFIER = re.compile(
+    r'(?:^| )(?:the|a|an|this|that|these|those|my|your|his|her|its|our|their|which|who|whose|where)(?= |\Z)'
+    r'|\b(?:new|old|big|small|large|little|good|bad|great|high|low'
+    r'|red|blue|green|black|white|yellow|brown|purple|pink'
+    r'|important|significant|relevant|critical|crucial|essential'
+    r'|interesting|fascinating|exciting|boring|surprising)\b')
+
+def count_words(series):
+    """
+    Count whitespace-separated words in a text column (0 for missing values)
+    """
+    return series.fillna('').astype(str).str.count(WORD).astype(int)
+
+def text_column(df, column):
+    """
+    Return a text column as strings, or an all-missing column if it is absent
+    """
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype=object)
+    series = df[column]
+    return series.where(series.isna(), series.astype(str))
+
+def flag(series, matches):
+    """
+    Turn a vectorised match result into a nullable boolean column,
+    missing where the text itself is missing
+    """
+    return matches.fillna(False).astype('boolean').mask(series.isna())
+
+def classify_start(fronted):
+    """
+    Classify the first word of each fronted element as Preposition, Adverb,
+    Adjective or Other ('Unknown' for missing values)
+    """
+    text = fronted.str.strip().str.lower()
+    start = np.select(
+        [fronted.isna().to_numpy(),
+         text.str.match(PREPOSITION_START).fillna(False).to_numpy(bool),
+         text.str.match(ADVERB_START).fillna(False).to_numpy(bool),
+         text.str.match(ADJECTIVE_START).fillna(False).to_numpy(bool)],
+        ['Unknown', 'Preposition', 'Adverb', 'Adjective'],
+        default='Other')
+    return pd.Series(start, index=fronted.index, dtype=object)
+
+def compute_features(df):
+    """
+    Compute the derived feature columns for all rows in one vectorised pass
+    """
+    fronted = text_column(df, 'Fronted Element')
+    subject = text_column(df, 'Subject')
+    subject_lower = subject.str.lower()
+    
+    return pd.DataFrame({
+        'Fronted_Word_Count': count_words(fronted),
+        'Subject_Word_Count': count_words(subject),
+        # Missing subjects stay missing, so they do not count towards percentages
+        'Subject_Definite': flag(subject, subject_lower.str.strip().str.match(DEFINITE_START)),
+        'Subject_Contains_Number': flag(subject, subject.str.contains(DIGIT)),
+        'Fronted_Start': classify_start(fronted),
+        'Subject_Has_Modifier': subject_lower.str.contains(MODIFIER).fillna(False).astype(bool),
+    }, index=df.index)
+
+def file_digest(file_path):
+    """
+    Return the SHA-256 digest of a file's contents
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+def feature_cache_path(file_path):
+    """
+    Return the feature cache file next to an input CSV
+    
+    The name includes a hash of the CSV contents and the feature version,
+    so an edited input or changed feature definitions lead to a fresh table.
+    """
+    key = json.dumps({
+        "file": file_digest(file_path),
+        "feature_version": FEATURE_VERSION,
+    }, sort_keys=True)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return f"{file_path}.{digest}.features.pkl"
+
+def save_features(features, cache_path):
+    """
+    Write a feature table and remove stale tables of the same input
+    """
+    file_prefix = cache_path.rsplit('.', 3)[0]
+    for old_path in glob.glob(glob.escape(file_prefix) + '.*.features.pkl'):
+        if old_path != cache_path:
+            os.remove(old_path)
+    
+    # Write to a temporary file first so an interrupted run leaves no partial cache
+    temp_path = cache_path + '.tmp'
+    features.to_pickle(temp_path)
+    os.replace(temp_path, cache_path)
+
+def load_features(df, file_path=None):
+    """
+    Return the feature table of df
+    
+    With the path of the CSV df was read from, the table is cached next to it
+    and reused as long as the CSV is unchanged.
+    """
+    if file_path is None:
+        return compute_features(df)
+    
+    cache_path = feature_cache_path(file_path)
+    if os.path.exists(cache_path):
+        features = pd.read_pickle(cache_path)
+        if features.index.equals(df.index):
+            print(f"Loaded cached features from {cache_path}")
+            return features
+    
+    features = compute_features(df)
+    try:
+        save_features(features, cache_path)
+        print(f"Cached features in {cache_path}")
+    except OSError as e:
+        print(f"Could not cache features: {e}")
+    return features
+
+def add_features(df, file_path=None):
+    """
+    Add the derived feature columns to df (replacing existing ones)
+    """
+    features = load_features(df, file_path)
+    for col in FEATURE_COLUMNS:
+        df[col] = features[col]
+    return df
+
+def has_features(df):
+    """
+    Check whether df already has all derived feature columns
+    """
+    return all(col in df.columns for col in FEATURE_COLUMNS)
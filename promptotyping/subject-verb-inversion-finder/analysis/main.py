@@ -1,15 +1,30 @@
-import os
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import time
+import_start = time.time()
+
+import os
+import sys
+import argparse
+import importlib
 from datetime import datetime
+from data_loading import load_inversions, ensure_frame
+
+# Time spent importing the modules above (pandas and the data loading)
+STARTUP_IMPORT_SECONDS = time.time() - import_start
 
-# Import our analysis modules
-# Assuming the previous code is saved in separate Python files
-from python_visualizations import generate_all_visualizations
-from additional_analyses import run_all_analyses
-from contextual_analysis import run_contextual_analyses
+# Default input CSV
+DEFAULT_INPUT = "../data/corpus_inversions_20250324_133147.csv"
+
+def import_analysis(module_name):
+    """
+    Import an analysis module (and the plotting libraries it needs) on first use,
+    reporting how long the import took
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    start_time = time.time()
+    module = importlib.import_module(module_name)
+    print(f"Imported {module_name} in {time.time() - start_time:.2f} seconds")
+    return module
 
 def create_output_directory():
     """
@@ -24,12 +39,14 @@ def create_output_directory():
     
     return output_dir
 
-def generate_summary_report(file_path, output_dir):
+def generate_summary_report(data, output_dir, source=None):
     """
     Generate a simple summary report about the data
+    (data is the shared inversion DataFrame or a CSV path)
     """
-    # Load the data
-    df = pd.read_csv(file_path)
+    df = ensure_frame(data)
+    if source is None:
+        source = data if isinstance(data, str) else "in-memory DataFrame"
     
     # Basic statistics
     report = {
@@ -40,12 +57,18 @@ def generate_summary_report(file_path, output_dir):
         'information_structure': df['Information Structure'].value_counts().to_dict() if 'Information Structure' in df.columns else {},
     }
     
-    # Write report to file
+    write_summary_report(report, output_dir, source)
+    return report
+
+def write_summary_report(report, output_dir, source):
+    """
+    Write the summary report counts to summary_report.txt
+    """
     with open(f"{output_dir}/summary_report.txt", "w") as f:
         f.write("SUBJECT-VERB INVERSION CORPUS ANALYSIS\n")
         f.write("=====================================\n\n")
         f.write(f"Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Data Source: {file_path}\n\n")
+        f.write(f"Data Source: {source}\n\n")
         
         f.write(f"Total inversions analyzed: {report['total_inversions']}\n\n")
         
@@ -78,53 +101,185 @@ def generate_summary_report(file_path, output_dir):
             f.write("\n")
     
     print(f"Summary report generated: {output_dir}/summary_report.txt")
+
+def run_summary(df, context, figures):
+    """
+    Task: write the summary report
+    """
+    return generate_summary_report(df, context['output_dir'], context['source'])
+
+def run_visualizations(df, context, figures):
+    """
+    Task: queue the basic visualizations
+    """
+    return import_analysis('python_visualizations').generate_all_visualizations(df, figures, context['output_dir'])
+
+def run_statistics(df, context, figures):
+    """
+    Task: run the advanced statistical analyses
+    """
+    return import_analysis('additional_analyses').run_all_analyses(df, figures, context['output_dir'])
+
+def run_contextual(df, context, figures):
+    """
+    Task: run the contextual analyses
+    """
+    return import_analysis('contextual_analysis').run_contextual_analyses(df, context['output_dir'], figures)
+
+def prepare_term_matrices(df):
+    """
+    Load the term matrices of the input once, before the text analyses are forked
+    """
+    import_analysis('term_matrix').source_term_matrices(df.attrs['source'])
+
+def run_aggregation(df, context, figures):
+    """
+    Task: stream the input in chunks and accumulate the counts the chunked analyses need
+    """
+    return import_analysis('chunked').aggregate_inversions(context['source'], context['params']['chunk_size'])
+
+def run_chunked_summary(df, context, figures):
+    """
+    Task: write the summary report from the aggregated counts
+    """
+    report = import_analysis('chunked').summary_report(context['results']['aggregate'])
+    write_summary_report(report, context['output_dir'], context['source'])
     return report
 
+def run_chunked_statistics(df, context, figures):
+    """
+    Task: run the statistical analyses on the aggregated counts
+    """
+    return import_analysis('chunked').run_chunked_analyses(context['results']['aggregate'], figures, context['output_dir'])
+
+# The analysis task graph. Each task declares the modules whose code it runs
+# (part of its input hash, together with the input CSV), the tasks whose
+# results it needs and the files it writes besides its figures
+TASKS = {
+    'summary': {
+        'run': run_summary,
+        'code': ['main', 'data_loading', 'features'],
+        'outputs': ['summary_report.txt'],
+    },
+    'visualizations': {
+        'run': run_visualizations,
+        'code': ['main', 'python_visualizations', 'data_loading', 'features', 'resampling', 'rendering'],
+    },
+    'statistics': {
+        'run': run_statistics,
+        'code': ['main', 'additional_analyses', 'data_loading', 'features', 'term_matrix', 'resampling', 'rendering'],
+    },
+    'contextual': {
+        'run': run_contextual,
+        'code': ['main', 'contextual_analysis', 'data_loading', 'features', 'term_matrix', 'resampling', 'rendering'],
+        'prepare': prepare_term_matrices,
+    },
+}
+
+# The task graph of the chunked mode, for inputs too large to load at once:
+# one pass over the input accumulates counts and sketches the analyses share
+CHUNKED_TASKS = {
+    'aggregate': {
+        'run': run_aggregation,
+        'code': ['main', 'chunked', 'data_loading', 'features'],
+    },
+    'summary': {
+        'run': run_chunked_summary,
+        'code': ['main', 'chunked'],
+        'after': ['aggregate'],
+        'outputs': ['summary_report.txt'],
+    },
+    'statistics': {
+        'run': run_chunked_statistics,
+        'code': ['main', 'chunked', 'additional_analyses', 'resampling', 'rendering'],
+        'after': ['aggregate'],
+    },
+}
+
+def parse_args():
+    """
+    Parse command line options
+    """
+    parser = argparse.ArgumentParser(description="Run the subject-verb inversion analysis pipeline.")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help=f"Inversion CSV to analyse (default: {DEFAULT_INPUT})")
+    parser.add_argument("--output-dir", help="Directory for the results (default: a new timestamped directory)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of processes running analyses and rendering figures (default: number of CPUs)")
+    parser.add_argument("--memo-dir",
+                        help="Directory for analysis results reused while their inputs are unchanged "
+                             "(default: pipeline.MEMO_DIR)")
+    parser.add_argument("--no-memo", action="store_true", help="Run every analysis, ignoring memoised results")
+    parser.add_argument("--figure-cache-dir",
+                        help="Directory for rendered figures reused across runs (default: rendering.FIGURE_CACHE_DIR)")
+    parser.add_argument("--no-figure-cache", action="store_true", help="Render every figure, ignoring the cache")
+    parser.add_argument("--only", nargs="+", choices=list(TASKS), default=list(TASKS),
+                        help="Run only these analyses (default: all)")
+    parser.add_argument("--chunked", action="store_true",
+                        help="Stream the input in chunks instead of loading it (summary and statistics only)")
+    parser.add_argument("--chunk-size", type=int, default=100000,
+                        help="Rows per chunk in the chunked mode (default: 100000)")
+    return parser.parse_args()
+
 def main():
     """
     Run the full subject-verb inversion analysis pipeline
     """
+    args = parse_args()
+    
     # Start timing
     start_time = time.time()
     
-    # Set the file path
-    file_path = "../data/corpus_inversions_20250324_133147.csv"
+    file_path = args.input
     
     # Create output directory
-    output_dir = create_output_directory()
+    if args.output_dir:
+        output_dir = args.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+    else:
+        output_dir = create_output_directory()
     
     print(f"Starting analysis of {file_path}")
-    print(f"Results will be saved to {output_dir}\n")
+    print(f"Results will be saved to {output_dir}")
+    print(f"Startup imports took {STARTUP_IMPORT_SECONDS:.2f} seconds\n")
     
-    try:
-        # Generate summary report
-        print("\n=== GENERATING SUMMARY REPORT ===")
-        summary = generate_summary_report(file_path, output_dir)
-        
-        # Run basic visualizations
-        print("\n=== GENERATING BASIC VISUALIZATIONS ===")
-        generate_all_visualizations(file_path)
-        
-        # Run advanced statistical analyses
-        print("\n=== RUNNING ADVANCED STATISTICAL ANALYSES ===")
-        advanced_results = run_all_analyses(file_path)
-        
-        # Run contextual analyses
-        print("\n=== RUNNING CONTEXTUAL ANALYSES ===")
-        contextual_results = run_contextual_analyses(file_path, output_dir)
-        
-        # End timing
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        
-        print("\n=== ANALYSIS COMPLETE ===")
-        print(f"Total time: {elapsed_time:.2f} seconds")
-        print(f"All results saved to {output_dir}")
-        
-    except Exception as e:
-        print(f"\nERROR: Analysis failed with error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    if args.chunked:
+        # Nothing is loaded; the aggregation task streams the input
+        df = None
+        tasks = dict(CHUNKED_TASKS, aggregate=dict(CHUNKED_TASKS['aggregate'], params={'chunk_size': args.chunk_size}))
+        skipped = [name for name in args.only if name not in tasks]
+        if skipped:
+            print(f"Not available in the chunked mode: {', '.join(skipped)}")
+        selected = [name for name in args.only if name in tasks]
+    else:
+        # Load the data once; every analysis shares the same frame
+        print("\n=== LOADING DATA ===")
+        df = load_inversions(file_path)
+        tasks = TASKS
+        selected = args.only
+    
+    def render(figures):
+        print(f"\n=== RENDERING {len(figures)} FIGURES ===")
+        rendering = import_analysis('rendering')
+        cache_dir = None if args.no_figure_cache else args.figure_cache_dir or rendering.FIGURE_CACHE_DIR
+        return rendering.render_figures(figures, args.workers, cache_dir)
+    
+    # Independent analyses run concurrently; unchanged ones are restored from the memo
+    pipeline = import_analysis('pipeline')
+    memo_dir = None if args.no_memo else args.memo_dir or pipeline.MEMO_DIR
+    results = pipeline.run_task_graph(tasks, selected, df, file_path, output_dir, workers=args.workers,
+                                      memo_dir=memo_dir, render=render)
+    
+    # End timing
+    end_time = time.time()
+    elapsed_time = end_time - start_time
+    
+    failed = [name for name in selected if name not in results]
+    if failed:
+        print(f"\nERROR: These analyses failed: {', '.join(failed)}")
+    print("\n=== ANALYSIS COMPLETE ===")
+    print(f"Total time: {elapsed_time:.2f} seconds")
+    print(f"All results saved to {output_dir}")
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
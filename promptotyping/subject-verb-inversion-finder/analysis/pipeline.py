@@ -0,0 +1,320 @@
+import io
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import pickle
+import hashlib
+import traceback
+import contextlib
+import multiprocessing
+from datetime import datetime
+from features import file_digest
+
+# Directory for memoised task results and outputs
+MEMO_DIR = "pipeline_cache"
+# Bump when the memo layout changes, to invalidate memoised tasks
+PIPELINE_VERSION = 1
+# Per-run record of tasks, input hashes, timings and outputs, written to the output directory
+MANIFEST_FILE = "run_manifest.json"
+
+ANALYSIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# State shared with forked task processes (set right before forking)
+shared_frame = None
+shared_tasks = {}
+shared_contexts = {}
+
+def code_digest(modules):
+    """
+    Return a hash of the source files of the given analysis modules
+    """
+    code_hash = hashlib.sha256()
+    for module in sorted(modules):
+        code_hash.update(module.encode('utf-8'))
+        code_hash.update(file_digest(os.path.join(ANALYSIS_DIR, f"{module}.py")).encode('utf-8'))
+    return code_hash.hexdigest()
+
+def task_order(tasks, selected):
+    """
+    Return the selected tasks and the tasks they depend on, dependencies first
+    """
+    order = []
+    
+    def visit(name, path=()):
+        if name in path:
+            raise ValueError(f"Circular task dependency: {' -> '.join(path + (name,))}")
+        if name in order:
+            return
+        for dependency in tasks[name].get('after', []):
+            visit(dependency, path + (name,))
+        order.append(name)
+    
+    for name in selected:
+        visit(name)
+    return order
+
+def task_input_hash(name, task, data_digest, input_hashes):
+    """
+    Return the input hash of a task
+    
+    It covers the input data, the task's code and parameters and the input
+    hashes of the tasks it depends on, so a task is re-run when any of them
+    changes.
+    """
+    key = json.dumps({
+        "task": name,
+        "data": data_digest,
+        "code": code_digest(task['code']),
+        "params": task.get('params', {}),
+        "after": {dependency: input_hashes[dependency] for dependency in task.get('after', [])},
+        "pipeline_version": PIPELINE_VERSION,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def memo_path(memo_dir, name, input_hash):
+    """
+    Return the memo directory of a task run
+    """
+    return os.path.join(memo_dir, f"{name}.{input_hash[:16]}")
+
+def load_memo(path, output_dir):
+    """
+    Restore a memoised task: copy its outputs into output_dir and return its
+    memo entry, or None if there is no complete entry
+    """
+    result_path = os.path.join(path, 'result.pkl')
+    if not os.path.exists(result_path):
+        return None
+    with open(result_path, 'rb') as f:
+        entry = pickle.load(f)
+    
+    for output in entry['outputs']:
+        memo_file = os.path.join(path, 'outputs', output)
+        if not os.path.exists(memo_file):
+            return None
+        target = os.path.join(output_dir, output)
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        shutil.copyfile(memo_file, target)
+    return entry
+
+def save_memo(path, result, outputs, output_dir):
+    """
+    Store a task's result and copies of its outputs and remove stale entries of the same task
+    """
+    memo_dir = os.path.dirname(path)
+    os.makedirs(memo_dir, exist_ok=True)
+    
+    task_prefix = os.path.basename(path).rsplit('.', 1)[0]
+    for old_path in glob.glob(os.path.join(memo_dir, glob.escape(task_prefix) + '.*')):
+        if old_path != path:
+            shutil.rmtree(old_path, ignore_errors=True)
+    
+    # Write to a temporary directory first so an interrupted run leaves no partial entry
+    temp_path = path + '.tmp'
+    shutil.rmtree(temp_path, ignore_errors=True)
+    for output in outputs:
+        memo_file = os.path.join(temp_path, 'outputs', output)
+        os.makedirs(os.path.dirname(memo_file), exist_ok=True)
+        shutil.copyfile(os.path.join(output_dir, output), memo_file)
+    os.makedirs(temp_path, exist_ok=True)
+    with open(os.path.join(temp_path, 'result.pkl'), 'wb') as f:
+        pickle.dump({'result': result, 'outputs': outputs}, f)
+    
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(temp_path, path)
+
+def prepare_task(task, df):
+    """
+    Run a task's prepare function in this process and return the error (if any)
+    """
+    try:
+        task['prepare'](df)
+    except Exception as e:
+        traceback.print_exc(file=sys.stdout)
+        return str(e)
+    return None
+
+def execute_task(name):
+    """
+    Run one task on the shared frame, capturing what it prints
+    
+    Tasks get their own shallow copy of the frame (if there is one), so
+    columns they add do not leak into other tasks. Returns the result, the queued figures, the
+    captured log, the run time and the error (if any).
+    """
+    task = shared_tasks[name]
+    figures = []
+    log = io.StringIO()
+    result = None
+    error = None
+    start_time = time.time()
+    with contextlib.redirect_stdout(log):
+        try:
+            df = shared_frame.copy(deep=False) if shared_frame is not None else None
+            result = task['run'](df, shared_contexts[name], figures)
+            if result is None:
+                error = "the task returned no result"
+        except Exception as e:
+            error = str(e)
+            traceback.print_exc(file=log)
+    return {
+        'name': name,
+        'result': result,
+        'figures': figures if error is None else [],
+        'log': log.getvalue(),
+        'seconds': time.time() - start_time,
+        'error': error,
+    }
+
+def run_wave(names, workers):
+    """
+    Run independent tasks, concurrently in forked processes where possible,
+    and yield their outcomes as they finish
+    """
+    methods = multiprocessing.get_all_start_methods()
+    workers = min(workers, len(names))
+    if workers <= 1 or "fork" not in methods:
+        for name in names:
+            yield execute_task(name)
+        return
+    
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers) as pool:
+        for outcome in pool.imap_unordered(execute_task, names):
+            yield outcome
+
+def run_task_graph(tasks, selected, df, source, output_dir, workers=1, memo_dir=MEMO_DIR,
+                   render=None):
+    """
+    Run the selected tasks of a task graph and their dependencies on df
+    (None when the tasks read the input themselves)
+    
+    tasks maps task names to dicts with
+      run:     function(df, context, figures) returning the task's result
+      code:    analysis modules whose source is part of the input hash
+      after:   tasks whose results the task needs (context['results'])
+      params:  settings passed to the task (context['params']), part of its input hash
+      outputs: files the task writes to output_dir (relative to it), besides its figures
+      prepare: optional function(df) run in this process before the task,
+               e.g. to load data that forked tasks then share (the task runs
+               even if it raises; the error is noted in the manifest)
+    Tasks whose input hash is unchanged are restored from memo_dir (None
+    disables memoisation). Tasks whose dependencies are done run
+    concurrently in waves; render(figures) renders the figures a wave
+    queued and returns the saved files. A manifest with per-task status,
+    input hash, timings and outputs is written to output_dir.
+    Returns the results of all successful tasks by name.
+    """
+    global shared_frame
+    
+    start_time = time.time()
+    data_digest = file_digest(source)
+    order = task_order(tasks, selected)
+    
+    input_hashes = {}
+    for name in order:
+        input_hashes[name] = task_input_hash(name, tasks[name], data_digest, input_hashes)
+    
+    manifest = {
+        'started': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source': source,
+        'data_digest': data_digest,
+        'output_dir': output_dir,
+        'workers': workers,
+        'tasks': {},
+        'waves': [],
+    }
+    results = {}
+    failed = set()
+    
+    # Restore memoised tasks
+    pending = []
+    for name in order:
+        entry = load_memo(memo_path(memo_dir, name, input_hashes[name]), output_dir) if memo_dir else None
+        if entry is None:
+            pending.append(name)
+            continue
+        results[name] = entry['result']
+        manifest['tasks'][name] = {'status': 'memoised', 'input_hash': input_hashes[name],
+                                   'seconds': 0.0, 'outputs': entry['outputs']}
+        print(f"[{name}] unchanged, restored {len(entry['outputs'])} outputs from the memo")
+    
+    while pending:
+        # Tasks with a failed dependency are skipped
+        for name in [name for name in pending if failed & set(tasks[name].get('after', []))]:
+            pending.remove(name)
+            failed.add(name)
+            manifest['tasks'][name] = {'status': 'skipped', 'input_hash': input_hashes[name],
+                                       'error': "a dependency failed"}
+            print(f"[{name}] skipped because a dependency failed")
+        
+        wave = [name for name in pending if all(dependency in results for dependency in tasks[name].get('after', []))]
+        if not wave:
+            break
+        wave_start = time.time()
+        print(f"\n=== RUNNING {', '.join(wave).upper()} ===")
+        
+        # Preparation only saves work in the forked tasks, so a task whose
+        # preparation fails still runs (and does the work itself)
+        prepare_errors = {}
+        for name in [name for name in wave if tasks[name].get('prepare')]:
+            error = prepare_task(tasks[name], df)
+            if error:
+                prepare_errors[name] = error
+                print(f"[{name}] preparation failed, running the task anyway: {error}")
+        
+        shared_frame = df
+        shared_tasks.update(tasks)
+        shared_contexts.update({name: {
+            'output_dir': output_dir,
+            'source': source,
+            'params': tasks[name].get('params', {}),
+            'results': {dependency: results[dependency] for dependency in tasks[name].get('after', [])},
+        } for name in wave})
+        
+        outcomes = {}
+        for outcome in run_wave(wave, workers):
+            name = outcome['name']
+            outcomes[name] = outcome
+            print(f"\n--- {name} ({outcome['seconds']:.2f} seconds) ---")
+            print(outcome['log'], end='')
+        
+        # Render the figures of the whole wave at once
+        figures = [spec for name in wave for spec in outcomes[name]['figures']]
+        render_start = time.time()
+        saved = set(render(figures)) if figures and render else set()
+        render_seconds = time.time() - render_start
+        
+        for name in wave:
+            pending.remove(name)
+            outcome = outcomes[name]
+            record = {'input_hash': input_hashes[name], 'seconds': round(outcome['seconds'], 3)}
+            if name in prepare_errors:
+                record['prepare_error'] = prepare_errors[name]
+            manifest['tasks'][name] = record
+            if outcome['error']:
+                failed.add(name)
+                record.update(status='failed', error=outcome['error'])
+                print(f"[{name}] failed: {outcome['error']}")
+                continue
+            
+            figure_files = [spec[1] for spec in outcome['figures']]
+            outputs = tasks[name].get('outputs', []) + [os.path.relpath(path, output_dir) for path in figure_files]
+            results[name] = outcome['result']
+            record.update(status='ran', outputs=outputs, figures=len(figure_files))
+            
+            # Only complete runs are memoised, so missing figures are retried next time
+            if memo_dir and all(path in saved for path in figure_files):
+                save_memo(memo_path(memo_dir, name, input_hashes[name]), outcome['result'], outputs, output_dir)
+        
+        manifest['waves'].append({'tasks': wave, 'seconds': round(time.time() - wave_start, 3),
+                                  'render_seconds': round(render_seconds, 3), 'figures': len(figures)})
+    
+    manifest['total_seconds'] = round(time.time() - start_time, 3)
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"\nRun manifest written to {os.path.join(output_dir, MANIFEST_FILE)}")
+    return results
@@ -1,141 +1,92 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import numpy as np
-from collections import Counter
+from data_loading import ensure_frame
+from rendering import add_figure
+from resampling import resample_crosstab, resampling_record, print_resampling
 
-# Set the style for all visualizations
-plt.style.use('seaborn-v0_8-whitegrid')
-sns.set(font_scale=1.2)
-colors = sns.color_palette('viridis', 10)
-
-def load_and_clean_data(file_path):
-    """
-    Load the CSV file and perform initial cleaning
-    """
-    # Load the data
-    df = pd.read_csv(file_path)
-    
-    # Check for missing values and handle them
-    print(f"Initial shape: {df.shape}")
-    print(f"Missing values per column:\n{df.isnull().sum()}")
-    
-    # Fill missing values appropriately
-    # For categorical columns, fill with 'Unknown'
-    for col in ['Fronted Element Type', 'Locative', 'Discourse Function', 'Information Structure']:
-        if col in df.columns:
-            df[col] = df[col].fillna('Unknown')
-    
-    print(f"Shape after cleaning: {df.shape}")
-    return df
-
-def plot_fronted_element_types(df, output_file='fronted_element_types.png'):
+def draw_count_bars(counts, title, ylabel, figsize=(12, 8)):
     """
-    Create a bar plot showing the distribution of different fronted element types
+    Draw a horizontal bar plot of counts with the count next to each bar
     """
-    plt.figure(figsize=(12, 8))
-    
-    # Count the frequencies
-    counts = df['Fronted Element Type'].value_counts()
+    plt.figure(figsize=figsize)
     
     # Create a horizontal bar plot
-    ax = sns.barplot(y=counts.index, x=counts.values, palette='viridis')
+    ax = sns.barplot(y=counts.index.astype(str), x=counts.values, palette='viridis')
     
     # Add count labels to the bars
     for i, v in enumerate(counts.values):
         ax.text(v + 0.1, i, str(v), va='center')
     
-    plt.title('Distribution of Fronted Element Types', fontsize=16)
+    plt.title(title, fontsize=16)
     plt.xlabel('Count', fontsize=14)
-    plt.ylabel('Fronted Element Type', fontsize=14)
+    plt.ylabel(ylabel, fontsize=14)
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
-    
-    print(f"Plot saved as {output_file}")
-    return counts
 
-def plot_locative_distribution(df, output_file='locative_distribution.png'):
+def draw_pie(counts, title, palette):
     """
-    Create a pie chart showing the distribution of locative vs. non-locative inversions
+    Draw a pie chart of counts
     """
     plt.figure(figsize=(10, 8))
     
-    # Count locative vs. non-locative
-    loc_counts = df['Locative'].value_counts()
-    
-    # Create a pie chart
-    plt.pie(loc_counts.values, labels=loc_counts.index, autopct='%1.1f%%', 
-            colors=sns.color_palette('Blues', len(loc_counts)),
+    plt.pie(counts.values, labels=counts.index, autopct='%1.1f%%',
+            colors=sns.color_palette(palette, len(counts)),
             startangle=90, shadow=False)
     
-    plt.title('Distribution of Locative vs. Non-locative Inversions', fontsize=16)
+    plt.title(title, fontsize=16)
     plt.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
+
+def plot_fronted_element_types(df, output_file='fronted_element_types.png', figures=None):
+    """
+    Create a bar plot showing the distribution of different fronted element types
+    """
+    # Count the frequencies
+    counts = df['Fronted Element Type'].value_counts()
+    
+    add_figure(figures, draw_count_bars, output_file, counts=counts,
+               title='Distribution of Fronted Element Types', ylabel='Fronted Element Type')
+    return counts
+
+def plot_locative_distribution(df, output_file='locative_distribution.png', figures=None):
+    """
+    Create a pie chart showing the distribution of locative vs. non-locative inversions
+    """
+    # Count locative vs. non-locative
+    loc_counts = df['Locative'].value_counts()
     
-    print(f"Plot saved as {output_file}")
+    add_figure(figures, draw_pie, output_file, counts=loc_counts,
+               title='Distribution of Locative vs. Non-locative Inversions', palette='Blues')
     return loc_counts
 
-def plot_discourse_functions(df, output_file='discourse_functions.png'):
+def plot_discourse_functions(df, output_file='discourse_functions.png', figures=None):
     """
     Create a bar plot showing the distribution of discourse functions
     """
-    plt.figure(figsize=(12, 8))
-    
     # Count the frequencies
     counts = df['Discourse Function'].value_counts()
     
-    # Create a horizontal bar plot
-    ax = sns.barplot(y=counts.index, x=counts.values, palette='viridis')
-    
-    # Add count labels to the bars
-    for i, v in enumerate(counts.values):
-        ax.text(v + 0.1, i, str(v), va='center')
-    
-    plt.title('Distribution of Discourse Functions', fontsize=16)
-    plt.xlabel('Count', fontsize=14)
-    plt.ylabel('Discourse Function', fontsize=14)
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
-    
-    print(f"Plot saved as {output_file}")
+    add_figure(figures, draw_count_bars, output_file, counts=counts,
+               title='Distribution of Discourse Functions', ylabel='Discourse Function')
     return counts
 
-def plot_information_structure(df, output_file='information_structure.png'):
+def plot_information_structure(df, output_file='information_structure.png', figures=None):
     """
     Create a pie chart showing the distribution of information structure patterns
     """
-    plt.figure(figsize=(10, 8))
-    
     # Count information structure patterns
     info_counts = df['Information Structure'].value_counts()
     
-    # Create a pie chart
-    plt.pie(info_counts.values, labels=info_counts.index, autopct='%1.1f%%', 
-            colors=sns.color_palette('Greens', len(info_counts)),
-            startangle=90, shadow=False)
-    
-    plt.title('Distribution of Information Structure Patterns', fontsize=16)
-    plt.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
-    
-    print(f"Plot saved as {output_file}")
+    add_figure(figures, draw_pie, output_file, counts=info_counts,
+               title='Distribution of Information Structure Patterns', palette='Greens')
     return info_counts
 
-def plot_fronted_element_by_discourse(df, output_file='fronted_by_discourse.png'):
+def draw_fronted_element_by_discourse(cross_tab):
     """
-    Create a heatmap showing the relationship between fronted element types and discourse functions
+    Draw a heatmap of discourse functions per fronted element type (row-normalized)
     """
     plt.figure(figsize=(14, 10))
     
-    # Create a cross-tabulation of fronted element types and discourse functions
-    cross_tab = pd.crosstab(df['Fronted Element Type'], df['Discourse Function'])
-    
     # Normalize by row (fronted element type)
     cross_tab_norm = cross_tab.div(cross_tab.sum(axis=1), axis=0)
     
@@ -146,21 +97,21 @@ def plot_fronted_element_by_discourse(df, output_file='fronted_by_discourse.png'
     plt.xlabel('Discourse Function', fontsize=14)
     plt.ylabel('Fronted Element Type', fontsize=14)
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
+
+def plot_fronted_element_by_discourse(df, output_file='fronted_by_discourse.png', figures=None):
+    """
+    Create a heatmap showing the relationship between fronted element types and discourse functions
+    """
+    # Create a cross-tabulation of fronted element types and discourse functions
+    cross_tab = pd.crosstab(df['Fronted Element Type'], df['Discourse Function'])
     
-    print(f"Plot saved as {output_file}")
+    add_figure(figures, draw_fronted_element_by_discourse, output_file, cross_tab=cross_tab)
     return cross_tab
 
-def plot_locative_by_discourse(df, output_file='locative_by_discourse.png'):
+def draw_locative_by_discourse(cross_tab):
     """
-    Create a grouped bar plot showing the relationship between locative status and discourse functions
+    Draw grouped bars of discourse function percentages per locative status
     """
-    plt.figure(figsize=(12, 8))
-    
-    # Create a cross-tabulation of locative status and discourse functions
-    cross_tab = pd.crosstab(df['Locative'], df['Discourse Function'])
-    
     # Convert to percentage for easier comparison
     cross_tab_pct = cross_tab.div(cross_tab.sum(axis=1), axis=0) * 100
     
@@ -173,85 +124,45 @@ def plot_locative_by_discourse(df, output_file='locative_by_discourse.png'):
     plt.xticks(rotation=0)
     plt.legend(title='Discourse Function')
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
+
+def plot_locative_by_discourse(df, output_file='locative_by_discourse.png', figures=None):
+    """
+    Create a grouped bar plot showing the relationship between locative status and discourse functions
+    """
+    # Create a cross-tabulation of locative status and discourse functions
+    cross_tab = pd.crosstab(df['Locative'], df['Discourse Function'])
     
-    print(f"Plot saved as {output_file}")
+    add_figure(figures, draw_locative_by_discourse, output_file, cross_tab=cross_tab)
     return cross_tab
 
-def plot_verb_frequency(df, output_file='verb_frequency.png', top_n=20):
+def plot_verb_frequency(df, output_file='verb_frequency.png', top_n=20, figures=None):
     """
     Create a bar plot showing the most common verbs used in inversions
     """
-    plt.figure(figsize=(14, 10))
-    
     # Count the frequencies of verbs
     verb_counts = df['Verb'].value_counts().head(top_n)
     
-    # Create a horizontal bar plot
-    ax = sns.barplot(y=verb_counts.index, x=verb_counts.values, palette='viridis')
-    
-    # Add count labels to the bars
-    for i, v in enumerate(verb_counts.values):
-        ax.text(v + 0.1, i, str(v), va='center')
-    
-    plt.title(f'Top {top_n} Most Frequent Verbs in Inversions', fontsize=16)
-    plt.xlabel('Count', fontsize=14)
-    plt.ylabel('Verb', fontsize=14)
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
-    
-    print(f"Plot saved as {output_file}")
+    add_figure(figures, draw_count_bars, output_file, counts=verb_counts,
+               title=f'Top {top_n} Most Frequent Verbs in Inversions', ylabel='Verb', figsize=(14, 10))
     return verb_counts
 
-def plot_source_distribution(df, output_file='source_distribution.png', top_n=10):
+def plot_source_distribution(df, output_file='source_distribution.png', top_n=10, figures=None):
     """
     Create a bar plot showing the distribution of inversions across different source files
     """
-    plt.figure(figsize=(14, 8))
-    
     # Count the frequencies of source files
     source_counts = df['File'].value_counts().head(top_n)
     
-    # Create a horizontal bar plot
-    ax = sns.barplot(y=source_counts.index, x=source_counts.values, palette='viridis')
-    
-    # Add count labels to the bars
-    for i, v in enumerate(source_counts.values):
-        ax.text(v + 0.1, i, str(v), va='center')
-    
-    plt.title(f'Top {top_n} Sources of Inversions', fontsize=16)
-    plt.xlabel('Count', fontsize=14)
-    plt.ylabel('Source File', fontsize=14)
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
-    
-    print(f"Plot saved as {output_file}")
+    add_figure(figures, draw_count_bars, output_file, counts=source_counts,
+               title=f'Top {top_n} Sources of Inversions', ylabel='Source File', figsize=(14, 8))
     return source_counts
 
-def analyze_word_length_complexity(df, output_file='complexity_analysis.png'):
+def draw_word_length_complexity(data, labels):
     """
-    Analyze and visualize the complexity of inversions by comparing word counts
-    in fronted elements, verbs, and subjects
+    Draw box plots of word counts
     """
     plt.figure(figsize=(12, 8))
     
-    # Function to count words
-    def count_words(text):
-        if pd.isna(text):
-            return 0
-        return len(str(text).split())
-    
-    # Create new columns with word counts
-    df['Fronted_Word_Count'] = df['Fronted Element'].apply(count_words)
-    df['Subject_Word_Count'] = df['Subject'].apply(count_words)
-    
-    # Create box plots
-    data = [df['Fronted_Word_Count'], df['Subject_Word_Count']]
-    labels = ['Fronted Element', 'Subject']
-    
     # Create a box plot
     ax = plt.boxplot(data, patch_artist=True, labels=labels)
     
@@ -264,8 +175,17 @@ def analyze_word_length_complexity(df, output_file='complexity_analysis.png'):
     plt.ylabel('Word Count', fontsize=14)
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
+
+def analyze_word_length_complexity(df, output_file='complexity_analysis.png', figures=None):
+    """
+    Analyze and visualize the complexity of inversions by comparing word counts
+    in fronted elements, verbs, and subjects
+    """
+    # Create box plots from the word counts computed when loading
+    data = [df['Fronted_Word_Count'], df['Subject_Word_Count']]
+    labels = ['Fronted Element', 'Subject']
+    
+    add_figure(figures, draw_word_length_complexity, output_file, data=data, labels=labels)
     
     # Calculate and return statistics
     stats = {
@@ -275,32 +195,44 @@ def analyze_word_length_complexity(df, output_file='complexity_analysis.png'):
         'Subject_Median': df['Subject_Word_Count'].median()
     }
     
-    print(f"Plot saved as {output_file}")
     print(f"Complexity statistics: {stats}")
     return stats
 
-def generate_all_visualizations(file_path):
+def generate_all_visualizations(data, figures=None, output_dir='.'):
     """
     Generate all visualizations for the inversion analysis
+    (data is the shared inversion DataFrame or a CSV path; with a figures
+    list the plots are queued for rendering instead of drawn right away)
+    
+    Returns the data behind each plot by plot name.
     """
-    print("Loading data...")
-    df = load_and_clean_data(file_path)
+    df = ensure_frame(data)
     
     print("\nGenerating visualizations...")
     # Generate all plots
-    plot_fronted_element_types(df)
-    plot_locative_distribution(df)
-    plot_discourse_functions(df)
-    plot_information_structure(df)
-    plot_fronted_element_by_discourse(df)
-    plot_locative_by_discourse(df)
-    plot_verb_frequency(df)
-    plot_source_distribution(df)
-    analyze_word_length_complexity(df)
+    results = {}
+    results['fronted_element_types'] = plot_fronted_element_types(df, f'{output_dir}/fronted_element_types.png', figures=figures)
+    results['locative_distribution'] = plot_locative_distribution(df, f'{output_dir}/locative_distribution.png', figures=figures)
+    results['discourse_functions'] = plot_discourse_functions(df, f'{output_dir}/discourse_functions.png', figures=figures)
+    results['information_structure'] = plot_information_structure(df, f'{output_dir}/information_structure.png', figures=figures)
+    results['fronted_element_by_discourse'] = plot_fronted_element_by_discourse(df, f'{output_dir}/fronted_by_discourse.png', figures=figures)
+    results['locative_by_discourse'] = plot_locative_by_discourse(df, f'{output_dir}/locative_by_discourse.png', figures=figures)
+    results['verb_frequency'] = plot_verb_frequency(df, f'{output_dir}/verb_frequency.png', figures=figures)
+    results['source_distribution'] = plot_source_distribution(df, f'{output_dir}/source_distribution.png', figures=figures)
+    results['word_length_complexity'] = analyze_word_length_complexity(df, f'{output_dir}/complexity_analysis.png', figures=figures)
+    
+    # Permutation p-values and bootstrap confidence intervals of the plotted crosstabs
+    results['resampling'] = {}
+    for name in ['fronted_element_by_discourse', 'locative_by_discourse']:
+        print(f"\n{name.replace('_', ' ').capitalize()}:")
+        resampling = resample_crosstab(results[name])
+        print_resampling(resampling)
+        results['resampling'][name] = resampling_record(resampling)
     
     print("\nAll visualizations generated successfully!")
+    return results
 
 if __name__ == "__main__":
     # Replace with the actual file path
     file_path = "../data/corpus_inversions_20250324_133147.csv"
-    generate_all_visualizations(file_path)
\ No newline at end of file
+    generate_all_visualizations(file_path)
@@ -0,0 +1,214 @@
+import os
+import glob
+import time
+import shutil
+import hashlib
+import inspect
+import multiprocessing
+from importlib import metadata
+import matplotlib
+import matplotlib.pyplot as plt
+import pandas as pd
+
+# Resolution of all saved figures
+DPI = 300
+
+# rcParams that are not copied to render workers (they always draw with Agg)
+WORKER_EXCLUDED_PARAMS = {'backend', 'backend_fallback'}
+
+# Directory for rendered figures, reused while their data and parameters are unchanged
+FIGURE_CACHE_DIR = "figure_cache"
+# Bump when rendering changes in a way the cache key does not capture
+FIGURE_CACHE_VERSION = 1
+# Plotting libraries whose versions are part of the figure cache key
+PLOTTING_LIBRARIES = ['matplotlib', 'seaborn', 'wordcloud']
+
+# Whether apply_plot_style has run in this process
+plot_style_applied = False
+
+def apply_plot_style():
+    """
+    Set the style for all visualizations (once per process, before drawing)
+    """
+    global plot_style_applied
+    if plot_style_applied:
+        return
+    import seaborn as sns
+    
+    plt.style.use('seaborn-v0_8-whitegrid')
+    sns.set(font_scale=1.2)
+    plot_style_applied = True
+
+def add_figure(figures, draw, output_file, **data):
+    """
+    Queue a figure for rendering, or render it right away if figures is None
+    
+    draw is a module-level function that draws the figure from the keyword
+    arguments in data; saving and closing is done by render_figure, so the
+    figure can be rendered in another process.
+    """
+    spec = (draw, output_file, data)
+    if figures is None:
+        render_figure(spec)
+    else:
+        figures.append(spec)
+
+def render_figure(spec):
+    """
+    Draw and save one figure specification, returning its file or None on failure
+    """
+    draw, output_file, data = spec
+    try:
+        apply_plot_style()
+        draw(**data)
+        plt.savefig(output_file, dpi=DPI)
+        print(f"Plot saved as {output_file}")
+        return output_file
+    except Exception as e:
+        print(f"Could not render {output_file}: {str(e)}")
+        return None
+    finally:
+        # Also closes figures opened before pandas plotting created its own
+        plt.close('all')
+
+def plot_style():
+    """
+    Return the current rcParams that affect how figures are drawn
+    """
+    return {key: value for key, value in matplotlib.rcParams.items() if key not in WORKER_EXCLUDED_PARAMS}
+
+def library_versions():
+    """
+    Return the installed versions of the plotting libraries (None if one is missing)
+    """
+    versions = {}
+    for library in PLOTTING_LIBRARIES:
+        try:
+            versions[library] = metadata.version(library)
+        except metadata.PackageNotFoundError:
+            versions[library] = None
+    return versions
+
+def hash_value(value_hash, value):
+    """
+    Feed a figure's data into a hash
+    
+    Frames and Series are hashed by their values, index, labels and dtypes,
+    containers element by element and everything else by its repr.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        value_hash.update(type(value).__name__.encode('utf-8'))
+        value_hash.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        value_hash.update(repr((value.index.name, str(value.index.dtype))).encode('utf-8'))
+        if isinstance(value, pd.DataFrame):
+            value_hash.update(repr(value.columns.tolist()).encode('utf-8'))
+            value_hash.update(repr(value.dtypes.astype(str).tolist()).encode('utf-8'))
+        else:
+            value_hash.update(repr((value.name, str(value.dtype))).encode('utf-8'))
+    elif isinstance(value, dict):
+        value_hash.update(b'{')
+        for key in sorted(value, key=repr):
+            hash_value(value_hash, key)
+            hash_value(value_hash, value[key])
+        value_hash.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        value_hash.update(b'[')
+        for item in value:
+            hash_value(value_hash, item)
+        value_hash.update(b']')
+    else:
+        value_hash.update(repr(value).encode('utf-8'))
+        value_hash.update(b';')
+
+def figure_cache_path(spec, cache_dir=FIGURE_CACHE_DIR):
+    """
+    Return the cache file for a figure specification
+    
+    The name includes a hash of the figure's data, the source of its draw
+    function, the plot style and the library versions, so any change to them
+    leads to a fresh rendering.
+    """
+    draw, output_file, data = spec
+    figure_hash = hashlib.sha256()
+    hash_value(figure_hash, {
+        "draw": f"{draw.__module__}.{draw.__qualname__}",
+        "source": inspect.getsource(draw),
+        "data": data,
+        "dpi": DPI,
+        "style": plot_style(),
+        "libraries": library_versions(),
+        "cache_version": FIGURE_CACHE_VERSION,
+    })
+    digest = figure_hash.hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(output_file)}.{digest}.png")
+
+def save_cached_figure(output_file, cache_path):
+    """
+    Copy a rendered figure to the cache and remove stale renderings of the same figure
+    """
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    file_prefix = os.path.basename(cache_path).rsplit('.', 2)[0]
+    for old_path in glob.glob(os.path.join(cache_dir, glob.escape(file_prefix) + '.*.png')):
+        if old_path != cache_path:
+            os.remove(old_path)
+    
+    # Write to a temporary file first so an interrupted run leaves no partial cache
+    temp_path = cache_path + '.tmp'
+    shutil.copyfile(output_file, temp_path)
+    os.replace(temp_path, cache_path)
+
+def init_render_worker(rc_params):
+    """
+    Set up a render worker with the Agg backend and the parent's plot style
+    """
+    plt.switch_backend('Agg')
+    matplotlib.rcParams.update(rc_params)
+
+def render_figures(figures, workers=None, cache_dir=FIGURE_CACHE_DIR):
+    """
+    Render queued figure specifications in a pool of worker processes
+    
+    Figures whose data and parameters are unchanged since an earlier run are
+    copied from cache_dir instead (None disables the cache). With workers=1
+    (or a single figure to render) the figures are rendered in this process.
+    Returns the list of saved files.
+    """
+    if not figures:
+        return []
+    start_time = time.time()
+    apply_plot_style()
+    
+    cache_paths = {}
+    cached = []
+    to_render = figures
+    if cache_dir:
+        to_render = []
+        for spec in figures:
+            output_file = spec[1]
+            cache_paths[output_file] = figure_cache_path(spec, cache_dir)
+            if os.path.exists(cache_paths[output_file]):
+                shutil.copyfile(cache_paths[output_file], output_file)
+                cached.append(output_file)
+            else:
+                to_render.append(spec)
+        print(f"Figure cache: {len(cached)} hits, {len(to_render)} misses.")
+    
+    workers = max(1, min(workers or os.cpu_count() or 1, len(to_render)))
+    if workers == 1:
+        saved = [render_figure(spec) for spec in to_render]
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with context.Pool(workers, initializer=init_render_worker, initargs=(plot_style(),)) as pool:
+            saved = list(pool.imap_unordered(render_figure, to_render))
+    
+    saved = [output_file for output_file in saved if output_file]
+    for output_file in saved:
+        if output_file in cache_paths:
+            save_cached_figure(output_file, cache_paths[output_file])
+    
+    print(f"Rendered {len(saved)} of {len(to_render)} figures with {workers} worker(s) "
+          f"in {time.time() - start_time:.2f} seconds")
+    return cached + saved
@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+# Resamples per test and the seed they are drawn with, so reports are reproducible
+RESAMPLES = 2000
+SEED = 0
+
+# Coverage of the bootstrap confidence intervals
+CONFIDENCE = 0.95
+
+# Largest table (in non-empty cells) that is resampled: the permutations cost
+# about 0.4 ms and the bootstrap about 0.4 ms per cell for 2000 resamples
+MAX_RESAMPLING_CELLS = 1000
+
+def chi_square_statistics(tables, expected):
+    """
+    Return the chi-square statistic of each table in a (resamples, rows, columns) stack
+    (cells with an expected count of 0 are left out)
+    """
+    observed = expected > 0
+    deviations = np.where(observed, tables - expected, 0.0)
+    return (deviations ** 2 / np.where(observed, expected, 1.0)).sum(axis=(-2, -1))
+
+def permuted_tables(table, n_resamples=RESAMPLES, rng=None):
+    """
+    Draw the crosstabs of n_resamples random permutations of the column labels
+    
+    Shuffling the labels keeps both margins, so each resampled table follows
+    the multivariate hypergeometric distribution. It is drawn cell by cell
+    with hypergeometric draws over all resamples at once, so the cost
+    depends on the size of the table, not on the number of rows behind it.
+    Every cell is one draw in a Python loop, so keep tables to about
+    MAX_RESAMPLING_CELLS cells. Returns an array of shape (n_resamples, rows, columns).
+    """
+    rng = np.random.default_rng(SEED) if rng is None else rng
+    table = np.asarray(table, dtype=np.int64)
+    n_rows, n_cols = table.shape
+    row_totals = table.sum(axis=1)
+    
+    tables = np.zeros((n_resamples, n_rows, n_cols), dtype=np.int64)
+    # Column labels not yet handed out to a row, per resample
+    remaining = np.tile(table.sum(axis=0), (n_resamples, 1))
+    remaining_total = int(table.sum())
+    for i in range(n_rows - 1):
+        draws = np.full(n_resamples, row_totals[i])
+        # Labels of the columns after column j still available for this row
+        later = np.full(n_resamples, remaining_total)
+        for j in range(n_cols - 1):
+            later = later - remaining[:, j]
+            tables[:, i, j] = rng.hypergeometric(remaining[:, j], later, draws)
+            draws -= tables[:, i, j]
+        tables[:, i, -1] = draws
+        remaining -= tables[:, i]
+        remaining_total -= int(row_totals[i])
+    tables[:, -1] = remaining
+    return tables
+
+def bootstrap_row_proportions(table, n_resamples=RESAMPLES, rng=None):
+    """
+    Draw bootstrap resamples of the row proportions of a crosstab
+    
+    Resampling the rows of each group with replacement gives multinomial
+    counts, so all resamples are drawn in one call. Returns an array of
+    shape (n_resamples, rows, columns); rows without counts are NaN.
+    """
+    rng = np.random.default_rng(SEED) if rng is None else rng
+    table = np.asarray(table, dtype=np.int64)
+    row_totals = table.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        proportions = np.where(row_totals[:, None] > 0, table / row_totals[:, None], 1.0 / table.shape[1])
+    
+    counts = rng.multinomial(row_totals, proportions, size=(n_resamples, len(row_totals)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return counts / np.where(row_totals > 0, row_totals, np.nan)[:, None]
+
+def resample_crosstab(table, n_resamples=RESAMPLES, seed=SEED, confidence=CONFIDENCE):
+    """
+    Attach resampling p-values and confidence intervals to a crosstab of counts
+    
+    Returns a dict with
+      chi2, p_value:   the chi-square statistic and its permutation p-value
+                       for independence of rows and columns
+      cell_p_values:   per cell, the permutation p-value of its deviation from
+                       the count expected under independence (two-sided)
+      percentages:     the row percentages, e.g. per source
+      ci_lower/ci_upper: their percentile bootstrap confidence intervals
+      note:            why the permutation test was skipped, if it was
+    Empty rows and columns are left out of the permutation test. With fewer
+    than two non-empty rows or columns the test is skipped and chi2 and the
+    p-values are NaN. Tables with more than MAX_RESAMPLING_CELLS non-empty
+    cells (e.g. a Verb or File crosstab) are not resampled at all, so their
+    confidence intervals are NaN as well.
+    """
+    rng = np.random.default_rng(seed)
+    table = pd.DataFrame(table)
+    counts = table.to_numpy(dtype=np.int64).reshape(table.shape)
+    
+    def frame(values):
+        return pd.DataFrame(values, index=table.index, columns=table.columns)
+    
+    # Rows and columns without counts take no part in the permutations
+    used_rows = counts.sum(axis=1) > 0
+    used_columns = counts.sum(axis=0) > 0
+    used = counts[np.ix_(used_rows, used_columns)]
+    chi2 = np.nan
+    p_value = np.nan
+    cell_p_values = np.full(counts.shape, np.nan)
+    note = None
+    if min(used.shape) < 2:
+        note = "fewer than two non-empty rows or columns"
+    elif used.size > MAX_RESAMPLING_CELLS:
+        note = f"more than {MAX_RESAMPLING_CELLS} non-empty cells"
+    else:
+        expected = np.outer(used.sum(axis=1), used.sum(axis=0)) / used.sum()
+        permuted = permuted_tables(used, n_resamples, rng)
+        chi2 = float(chi_square_statistics(used, expected))
+        # Permutation p-values count the observed table as one of the resamples
+        p_value = (1 + np.sum(chi_square_statistics(permuted, expected) >= chi2 - 1e-9)) / (n_resamples + 1)
+        deviation = np.abs(used - expected)
+        # Cells of empty rows or columns never deviate
+        cell_p_values = np.ones(counts.shape)
+        cell_p_values[np.ix_(used_rows, used_columns)] = \
+            (1 + np.sum(np.abs(permuted - expected) >= deviation - 1e-9, axis=0)) / (n_resamples + 1)
+    
+    alpha = (1 - confidence) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentages = counts / counts.sum(axis=1, keepdims=True) * 100
+    if counts.size and used.size <= MAX_RESAMPLING_CELLS:
+        proportions = bootstrap_row_proportions(counts, n_resamples, rng) * 100
+        ci_lower = np.quantile(proportions, alpha, axis=0)
+        ci_upper = np.quantile(proportions, 1 - alpha, axis=0)
+    else:
+        ci_lower = ci_upper = np.full(counts.shape, np.nan)
+    
+    return {
+        'chi2': chi2,
+        'p_value': float(p_value),
+        'n_resamples': n_resamples,
+        'seed': seed,
+        'confidence': confidence,
+        'note': note,
+        'cell_p_values': frame(cell_p_values),
+        'percentages': frame(percentages),
+        'ci_lower': frame(ci_lower),
+        'ci_upper': frame(ci_upper),
+    }
+
+def resampling_record(result):
+    """
+    Return a resample_crosstab result with its tables as dicts, for the analysis results
+    """
+    return {key: value.to_dict() if isinstance(value, pd.DataFrame) else value for key, value in result.items()}
+
+def print_resampling(result):
+    """
+    Print the permutation test of a crosstab and its row percentages with confidence intervals
+    """
+    if result.get('note'):
+        print(f"Permutation test skipped: {result['note']}")
+    else:
+        print(f"Permutation test ({result['n_resamples']} resamples, seed {result['seed']}): "
+              f"chi-square {result['chi2']:.2f}, p = {result['p_value']:.4f}")
+    
+    if result['ci_lower'].isna().all().all():
+        print("Row percentages (not resampled):")
+        print(result['percentages'].round(1))
+        return
+    
+    cells = result['percentages'].round(1).astype(str) + ' [' + \
+        result['ci_lower'].round(1).astype(str) + ', ' + result['ci_upper'].round(1).astype(str) + ']'
+    # Mark cells that deviate significantly from independence
+    cells = cells.mask(result['cell_p_values'] < 0.05, cells + '*')
+    print(f"Row percentages with {result['confidence']:.0%} bootstrap confidence intervals "
+          f"(* cell p < 0.05):")
+    print(cells)
@@ -0,0 +1,240 @@
+import os
+import glob
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from features import file_digest
+from data_loading import ROW_ID_COLUMN
+
+# Text columns with a document-term matrix
+TEXT_COLUMNS = ['Fronted Element', 'Subject']
+
+# Bump when the tokenisation or the file layout changes, to invalidate stored matrices
+TERM_MATRIX_VERSION = 2
+
+# Terms are words of three or more letters that are not part of a larger
+# token with digits, hyphens, apostrophes or dots (so 'well-known', 'covid19',
+# "O'Malley" or 'www.example.com' yield no term)
+KEYWORD_PATTERN = r"(?u)(?<![\w'.-])[^\W\d_]{3,}(?![\w-]|\.\w)"
+
+# Additional words to exclude (common function words and prepositions)
+ADDITIONAL_STOP_WORDS = {'in', 'on', 'at', 'by', 'to', 'from', 'with', 'for', 'of', 'the',
+                         'a', 'an', 'and', 'or', 'is', 'are', 'was', 'were', 'be', 'been',
+                         'this', 'that', 'these', 'those', 'there', 'here', 'their', 'its'}
+
+# Matrices loaded or built in this process, by source CSV
+loaded_matrices = {}
+
+def keyword_stop_words():
+    """
+    Return the English NLTK stopwords plus the additional excluded words
+    
+    Nothing is downloaded: without NLTK or its stopword corpus (e.g. when
+    offline) scikit-learn's English stop words are used instead.
+    """
+    try:
+        from nltk.corpus import stopwords
+        words = set(stopwords.words('english'))
+    except (ImportError, LookupError):
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        print("NLTK stopwords not available, using scikit-learn's English stop words")
+        words = set(ENGLISH_STOP_WORDS)
+    return words | ADDITIONAL_STOP_WORDS
+
+def build_term_matrix(texts, stop_words=None):
+    """
+    Tokenise all texts in one pass into a sparse document-term matrix
+    
+    Returns the matrix (one row per text, missing texts give empty rows)
+    and the array of terms of its columns.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+    
+    vectorizer = CountVectorizer(lowercase=True, token_pattern=KEYWORD_PATTERN,
+                                 stop_words=sorted(stop_words) if stop_words else None,
+                                 dtype=np.int64)
+    try:
+        matrix = vectorizer.fit_transform(pd.Series(texts).fillna('').astype(str))
+    except ValueError:
+        # No text contains a single term
+        return sp.csr_matrix((len(texts), 0), dtype=np.int64), np.array([], dtype=str)
+    return matrix, vectorizer.get_feature_names_out().astype(str)
+
+def term_matrix_path(file_path, stop_words):
+    """
+    Return the stored matrices file next to an input CSV
+    
+    The name includes a hash of the CSV contents, the tokenisation and the
+    stop words, so any change to them leads to freshly built matrices.
+    """
+    key = json.dumps({
+        "file": file_digest(file_path),
+        "pattern": KEYWORD_PATTERN,
+        "stop_words": sorted(stop_words),
+        "columns": TEXT_COLUMNS,
+        "term_matrix_version": TERM_MATRIX_VERSION,
+    }, sort_keys=True)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return f"{file_path}.{digest}.terms.npz"
+
+def save_term_matrices(matrices, matrices_path):
+    """
+    Write the matrices and vocabularies of all text columns to one .npz file
+    and remove stale files of the same input
+    """
+    file_prefix = matrices_path.rsplit('.', 3)[0]
+    for old_path in glob.glob(glob.escape(file_prefix) + '.*.terms.npz'):
+        if old_path != matrices_path:
+            os.remove(old_path)
+    
+    arrays = {}
+    for i, column in enumerate(TEXT_COLUMNS):
+        matrix, terms = matrices[column]
+        arrays.update({f'{i}_data': matrix.data, f'{i}_indices': matrix.indices,
+                       f'{i}_indptr': matrix.indptr, f'{i}_shape': np.array(matrix.shape),
+                       f'{i}_terms': terms})
+    
+    # Write to a temporary file first so an interrupted run leaves no partial file
+    temp_path = matrices_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(temp_path, matrices_path)
+
+def load_term_matrices(matrices_path):
+    """
+    Read the matrices and vocabularies written by save_term_matrices
+    """
+    matrices = {}
+    with np.load(matrices_path, allow_pickle=False) as arrays:
+        for i, column in enumerate(TEXT_COLUMNS):
+            matrix = sp.csr_matrix((arrays[f'{i}_data'], arrays[f'{i}_indices'], arrays[f'{i}_indptr']),
+                                   shape=tuple(arrays[f'{i}_shape']))
+            matrices[column] = (matrix, arrays[f'{i}_terms'])
+    return matrices
+
+def source_term_matrices(file_path):
+    """
+    Return the matrices of all text columns of an input CSV
+    
+    They are built from the text columns of the whole CSV once per input
+    file, stored next to it and reused as long as the CSV is unchanged.
+    """
+    if file_path in loaded_matrices:
+        return loaded_matrices[file_path]
+    
+    stop_words = keyword_stop_words()
+    matrices_path = term_matrix_path(file_path, stop_words)
+    if os.path.exists(matrices_path):
+        matrices = load_term_matrices(matrices_path)
+        print(f"Loaded term matrices from {matrices_path}")
+    else:
+        available = pd.read_csv(file_path, nrows=0).columns
+        texts = pd.read_csv(file_path, usecols=[col for col in TEXT_COLUMNS if col in available])
+        matrices = {column: build_term_matrix(texts[column] if column in texts.columns else [None] * len(texts), stop_words)
+                    for column in TEXT_COLUMNS}
+        try:
+            save_term_matrices(matrices, matrices_path)
+            print(f"Saved term matrices in {matrices_path}")
+        except OSError as e:
+            print(f"Could not save term matrices: {e}")
+    
+    loaded_matrices[file_path] = matrices
+    return matrices
+
+def term_matrix(df, column):
+    """
+    Return the document-term matrix and terms of a text column for the rows of df
+    
+    Frames loaded with load_inversions (and row subsets of them) use the
+    stored matrix of their source CSV, selected by their row ids; other
+    frames are tokenised directly.
+    """
+    source = df.attrs.get('source')
+    if source and column in TEXT_COLUMNS and ROW_ID_COLUMN in df.columns:
+        matrix, terms = source_term_matrices(source)[column]
+        rows = df[ROW_ID_COLUMN].to_numpy()
+        if pd.api.types.is_integer_dtype(rows) and (len(rows) == 0 or (rows.min() >= 0 and rows.max() < matrix.shape[0])):
+            return matrix[rows], terms
+    return build_term_matrix(df[column], keyword_stop_words())
+
+def top_terms(counts, terms, n):
+    """
+    Return the n most frequent terms as (term, count) pairs,
+    breaking ties alphabetically
+    """
+    counts = np.asarray(counts).ravel()
+    order = np.lexsort((terms, -counts))
+    return [(str(terms[i]), int(counts[i])) for i in order[:n] if counts[i] > 0]
+
+def top_keywords(matrix, terms, n=20):
+    """
+    Return the n most frequent terms of a document-term matrix
+    """
+    return top_terms(matrix.sum(axis=0), terms, n)
+
+def grouped_term_frequencies(matrix, groups):
+    """
+    Sum the rows of a document-term matrix per group
+    
+    groups holds one label per row; rows with a missing label are ignored.
+    Returns the group labels and a matrix with one row of term counts per group.
+    """
+    codes, labels = pd.factorize(pd.Series(groups), sort=True)
+    rows = np.flatnonzero(codes >= 0)
+    indicator = sp.csr_matrix((np.ones(len(rows), dtype=np.int64), (codes[rows], rows)),
+                              shape=(len(labels), matrix.shape[0]))
+    return list(labels), (indicator @ matrix).tocsr()
+
+def top_keywords_by_group(matrix, terms, groups, n=10):
+    """
+    Return the n most frequent terms of every group as a dict
+    """
+    labels, group_counts = grouped_term_frequencies(matrix, groups)
+    return {label: top_terms(group_counts[i].toarray(), terms, n) for i, label in enumerate(labels)}
+
+def log_likelihood_keyness(matrix, terms, groups, target, reference=None):
+    """
+    Compare term frequencies of one group with a reference by log-likelihood (G2)
+    
+    The reference is another group label or, by default, all other rows with
+    a group. Returns a DataFrame of terms with their frequencies in both,
+    the G2 statistic and whether the term is over- or underused in the target,
+    sorted by G2.
+    """
+    groups = pd.Series(groups).astype(object)
+    in_target = (groups == target).to_numpy()
+    in_reference = (groups == reference).to_numpy() if reference is not None else (groups.notna() & ~in_target).to_numpy()
+    
+    a = np.asarray(matrix[in_target].sum(axis=0), dtype=float).ravel()
+    b = np.asarray(matrix[in_reference].sum(axis=0), dtype=float).ravel()
+    c, d = a.sum(), b.sum()
+    
+    # Expected frequencies if the term were spread evenly over both corpora
+    total = c + d if c + d else 1
+    expected_a = c * (a + b) / total
+    expected_b = d * (a + b) / total
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g2 = 2 * (np.where(a > 0, a * np.log(a / expected_a), 0) +
+                  np.where(b > 0, b * np.log(b / expected_b), 0))
+    
+    keyness = pd.DataFrame({
+        'term': terms,
+        'target_freq': a.astype(int),
+        'reference_freq': b.astype(int),
+        'log_likelihood': g2,
+        'use': np.where(a >= expected_a, 'overuse', 'underuse'),
+    })
+    keyness = keyness[(keyness['target_freq'] + keyness['reference_freq']) > 0]
+    return keyness.sort_values(['log_likelihood', 'term'], ascending=[False, True]).reset_index(drop=True)
+
+def wordcloud_frequencies(matrix, terms, max_words=100, stop_words=()):
+    """
+    Return the max_words most frequent terms of a document-term matrix
+    (leaving out stop_words) as a dict for WordCloud.generate_from_frequencies
+    """
+    counts = np.asarray(matrix.sum(axis=0)).ravel()
+    if stop_words:
+        counts = np.where(np.isin(terms, list(stop_words)), 0, counts)
+    return dict(top_terms(counts, terms, max_words))
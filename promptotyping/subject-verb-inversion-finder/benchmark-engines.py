@@ -0,0 +1,307 @@
+import os
+import re
+import sys
+import csv
+import time
+import queue
+import argparse
+import tempfile
+import importlib.util
+import multiprocessing
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FINDER_SCRIPT = os.path.join(BASE_DIR, "subject-verb-inversion-finder.py")
+ANALYSER_SCRIPT = os.path.join(BASE_DIR, "data", "subject-verb-inversion-analysis.py")
+GOLD_FILE = os.path.join(BASE_DIR, "gold_inversions.csv")
+
+ENGINES = ["regex", "spacy", "cascade"]
+
+# A gold sentence sharing this many consecutive words with an engine's source counts as leaked
+LEAK_WORDS = 5
+
+def load_script(name, path):
+    """Import one of the hyphen-named scripts as a module."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def new_finder(**options):
+    """
+    Create an EnhancedInversionFinder. It creates its output directory on
+    construction, so it gets a temporary one; the benchmark never saves its results.
+    """
+    module = load_script("inversion_finder", FINDER_SCRIPT)
+    with tempfile.TemporaryDirectory() as scratch:
+        return module.EnhancedInversionFinder(output_dir=scratch, **options)
+
+def peak_rss_mb():
+    """Return the peak resident memory of this process in MB, if available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def load_sample(corpus_dir, n_sentences):
+    """
+    Collect the first n_sentences sentences of the corpus.
+    Both engines get exactly these sentences, split with the regex finder's
+    sentence splitter, so their results can be compared sentence by sentence.
+    """
+    finder = new_finder(corpus_dir=corpus_dir)
+    sentences = []
+    for file_path in finder.load_corpus_files():
+        for paragraph in finder.extract_paragraphs(finder.read_file(file_path)):
+            for sentence in finder.extract_sentences(paragraph):
+                sentences.append(sentence)
+                if len(sentences) >= n_sentences:
+                    return sentences
+    return sentences
+
+def load_gold(gold_file):
+    """Load the gold sentences and their yes/no inversion labels."""
+    with open(gold_file, "r", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return [row["sentence"] for row in rows], [row["inversion"].strip().lower() == "yes" for row in rows]
+
+def word_runs(text, length=LEAK_WORDS):
+    """Return the runs of length consecutive lowercased words in a text."""
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    return {" ".join(words[i:i + length]) for i in range(len(words) - length + 1)}
+
+def check_gold_leakage(gold_sentences, source_files=(FINDER_SCRIPT, ANALYSER_SCRIPT)):
+    """
+    Fail if a gold sentence, or a near copy of one, occurs in an engine's source.
+    Sentences the engines were written or tested against would inflate their
+    gold scores, so the gold set must be held out from them.
+    """
+    source_runs = set()
+    for path in source_files:
+        with open(path, "r", encoding="utf-8") as f:
+            source_runs |= word_runs(f.read())
+    leaked = [sentence for sentence in gold_sentences if word_runs(sentence) & source_runs]
+    if leaked:
+        raise ValueError(f"{len(leaked)} gold sentences also occur in the engine sources: "
+                         + "; ".join(leaked))
+
+def regex_engine(options):
+    """Return a detector that runs the regex patterns of EnhancedInversionFinder."""
+    finder = new_finder(sentence_cache_size=options.regex_cache)
+    
+    def detect(sentences):
+        return [bool(finder.find_inversions_in_sentence(sentence)) for sentence in sentences]
+    return detect
+
+def spacy_engine(options, cascade=False):
+    """
+    Return a detector that parses sentences with the spaCy analyser.
+    With cascade=True only sentences passing its lexical prefilter are parsed.
+    """
+    analyser = load_script("inversion_analysis", ANALYSER_SCRIPT)
+    nlp = analyser.get_nlp(options.profile)
+    
+    def has_inversion(doc):
+        for sent in doc.sents:
+            try:
+                if analyser.identify_sentence_inversions(sent):
+                    return True
+            except Exception:
+                # The analyser skips problematic sentences as well
+                continue
+        return False
+    
+    def detect(sentences):
+        flags = [False] * len(sentences)
+        indices = [i for i, sentence in enumerate(sentences)
+                   if not cascade or analyser.is_cascade_candidate(sentence)]
+        texts = (analyser.preprocess_text(analyser.clean_text(sentences[i])) for i in indices)
+        for i, doc in zip(indices, nlp.pipe(texts, batch_size=options.batch_size)):
+            flags[i] = has_inversion(doc)
+        return flags
+    return detect
+
+ENGINE_FACTORIES = {
+    "regex": regex_engine,
+    "spacy": spacy_engine,
+    "cascade": lambda options: spacy_engine(options, cascade=True),
+}
+
+def run_engine(engine, sentences, gold_sentences, options, results):
+    """Load one engine and run it on the sample and the gold set (runs in a child process)."""
+    start_memory = peak_rss_mb()
+    
+    start_time = time.time()
+    detect = ENGINE_FACTORIES[engine](options)
+    load_time = time.time() - start_time
+    
+    start_time = time.time()
+    flags = detect(sentences)
+    run_time = time.time() - start_time
+    
+    peak = peak_rss_mb()
+    results.put({
+        "engine": engine,
+        "load_seconds": load_time,
+        "run_seconds": run_time,
+        "sentences_per_second": len(sentences) / run_time if run_time > 0 else 0,
+        # Memory added by loading and running the engine
+        "peak_memory_mb": peak - start_memory if peak is not None and start_memory is not None else None,
+        "flags": flags,
+        "gold_flags": detect(gold_sentences),
+    })
+
+def confusion(predicted, actual):
+    """Count true/false positives and negatives."""
+    tp = sum(1 for p, a in zip(predicted, actual) if p and a)
+    fp = sum(1 for p, a in zip(predicted, actual) if p and not a)
+    fn = sum(1 for p, a in zip(predicted, actual) if not p and a)
+    tn = len(actual) - tp - fp - fn
+    return tp, fp, fn, tn
+
+def precision_recall_f1(predicted, actual):
+    """Return precision, recall, F1 and accuracy of binary predictions."""
+    tp, fp, fn, tn = confusion(predicted, actual)
+    precision = tp / (tp + fp) if tp + fp else 0
+    recall = tp / (tp + fn) if tp + fn else 0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0
+    accuracy = (tp + tn) / len(actual) if actual else 0
+    return precision, recall, f1, accuracy
+
+def cohen_kappa(a, b):
+    """Return raw agreement and Cohen's kappa of two binary labelings."""
+    n = len(a)
+    if n == 0:
+        return 0, 0
+    observed = sum(1 for x, y in zip(a, b) if x == y) / n
+    rate_a = sum(a) / n
+    rate_b = sum(b) / n
+    expected = rate_a * rate_b + (1 - rate_a) * (1 - rate_b)
+    kappa = (observed - expected) / (1 - expected) if expected < 1 else 1.0
+    return observed, kappa
+
+def benchmark_engines(engines, sentences, gold_sentences, gold_labels, options):
+    """
+    Run each engine in a fresh forked process, so peak memory is not
+    inflated by engines measured earlier.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    
+    results = []
+    for engine in engines:
+        print(f"Running the {engine} engine...")
+        results_queue = context.Queue()
+        worker = context.Process(target=run_engine, args=(engine, sentences, gold_sentences, options, results_queue))
+        worker.start()
+        # Read the result before joining, since a child blocks until its queued result is consumed
+        result = None
+        while result is None and (worker.is_alive() or not results_queue.empty()):
+            try:
+                result = results_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+        worker.join()
+        if worker.exitcode != 0 or result is None:
+            print(f"  Benchmark of the {engine} engine failed.")
+            continue
+        
+        result["wall_seconds"] = result["load_seconds"] + result["run_seconds"]
+        result["sentences"] = len(sentences)
+        result["detected"] = sum(result["flags"])
+        precision, recall, f1, accuracy = precision_recall_f1(result["gold_flags"], gold_labels)
+        result.update(gold_precision=precision, gold_recall=recall, gold_f1=f1, gold_accuracy=accuracy)
+        results.append(result)
+    return results
+
+def agreement_table(results, gold_labels):
+    """Pairwise agreement and kappa between engines on the sample, and of each engine with the gold labels."""
+    rows = []
+    for i, a in enumerate(results):
+        for b in results[i + 1:]:
+            observed, kappa = cohen_kappa(a["flags"], b["flags"])
+            rows.append({"pair": f"{a['engine']} vs {b['engine']}", "data": "sample",
+                         "agreement": observed, "kappa": kappa})
+    for r in results:
+        observed, kappa = cohen_kappa(r["gold_flags"], gold_labels)
+        rows.append({"pair": f"{r['engine']} vs gold", "data": "gold",
+                     "agreement": observed, "kappa": kappa})
+    return rows
+
+def print_results(results, agreement, n_gold):
+    """Print the speed, memory and accuracy table."""
+    print(f"\n{'Engine':<10}{'Sent/s':>10}{'Load (s)':>10}{'Wall (s)':>10}{'Peak MB':>10}"
+          f"{'Detected':>10}{'Prec':>8}{'Recall':>8}{'F1':>8}")
+    for r in results:
+        memory = f"{r['peak_memory_mb']:.1f}" if r["peak_memory_mb"] is not None else "n/a"
+        print(f"{r['engine']:<10}{r['sentences_per_second']:>10.1f}{r['load_seconds']:>10.2f}"
+              f"{r['wall_seconds']:>10.2f}{memory:>10}{r['detected']:>10}"
+              f"{r['gold_precision']:>8.2f}{r['gold_recall']:>8.2f}{r['gold_f1']:>8.2f}")
+    print(f"(Precision, recall and F1 on {n_gold} gold sentences)")
+    
+    print("\nAgreement:")
+    for row in agreement:
+        print(f"  {row['pair']} ({row['data']}): {row['agreement']*100:.1f}% agreement, kappa {row['kappa']:.2f}")
+
+def save_results(results, agreement, output_dir):
+    """Save the engine and agreement tables as CSVs."""
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    benchmark_csv = os.path.join(output_dir, f"engine_benchmark_{timestamp}.csv")
+    columns = [key for key in results[0] if key not in ("flags", "gold_flags")]
+    with open(benchmark_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+    
+    agreement_csv = os.path.join(output_dir, f"engine_agreement_{timestamp}.csv")
+    with open(agreement_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["pair", "data", "agreement", "kappa"])
+        writer.writeheader()
+        writer.writerows(agreement)
+    
+    print(f"\nBenchmark results have been saved to {benchmark_csv} and {agreement_csv}")
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(
+        description="Compare speed, memory and accuracy of the regex finder and the spaCy analyser.")
+    parser.add_argument("--corpus-dir", default="data", help="Directory with the corpus files (default: data)")
+    parser.add_argument("--sample-sentences", type=int, default=2000,
+                        help="Number of corpus sentences to run every engine on (default: 2000)")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES,
+                        help="Engines to benchmark; cascade is the spaCy analyser with its lexical prefilter")
+    parser.add_argument("--gold", default=GOLD_FILE, help="CSV of gold-annotated sentences (sentence, inversion)")
+    parser.add_argument("--profile", choices=["slim", "full"], default="slim", help="spaCy pipeline profile")
+    parser.add_argument("--batch-size", type=int, default=256, help="nlp.pipe batch size for the spaCy engines")
+    parser.add_argument("--regex-cache", type=int, default=10000,
+                        help="Sentence cache size of the regex finder (0 disables it)")
+    parser.add_argument("--output-dir", default="inversion_results", help="Directory for the result CSVs")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    sentences = load_sample(args.corpus_dir, args.sample_sentences)
+    gold_sentences, gold_labels = load_gold(args.gold)
+    check_gold_leakage(gold_sentences)
+    print(f"Benchmarking {len(args.engines)} engines on {len(sentences)} corpus sentences "
+          f"and {len(gold_sentences)} gold sentences...")
+    
+    results = benchmark_engines(args.engines, sentences, gold_sentences, gold_labels, args)
+    if not results:
+        return
+    
+    agreement = agreement_table(results, gold_labels)
+    print_results(results, agreement, len(gold_sentences))
+    save_results(results, agreement, args.output_dir)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,53 @@
 import os
 import re
 import glob
+import math
+import bisect
+import random
+import argparse
 from collections import Counter, defaultdict
+from statistics import NormalDist
 import json
 
+# Word tokenisation pattern, applied exactly once per sentence
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+# Patterns for different inversion types (matching the existing format)
+INVERSION_PATTERNS = {
+    # Existential there constructions
+    "existential": {
+        "pattern": re.compile(r"(?<!\w)There\s+(is|are|was|were|exists|existed|remains|remained|seems|seemed|appears|appeared)\s+"),
+        "constituent_type": "AdvP (Existential)",
+        "is_locative": True
+    },
+    # Prepositional phrase inversions
+    "pp_inversion": {
+        "pattern": re.compile(r"(?<!\w)(In|On|At|From|Into|Under|Over|Within|Behind|Above|Below|Among|Between|Through|Across|Around|Along)\s+([^.,;:!?]+?)\s+(is|are|was|were|come[s]?|came|stand[s]?|stood|remain[s]?|remained|exist[s]?|existed|appear[s]?|appeared)\s+"),
+        "constituent_type": "PP (Prepositional Phrase)",
+        "is_locative": True
+    },
+    # Adverbial inversions
+    "adv_inversion": {
+        "pattern": re.compile(r"(?<!\w)(Here|There|Now|Then|Never|Seldom|Rarely|Only|Often|Thus|So|Indeed|Perhaps)\s+([^.,;:!?]*?)\s+(is|are|was|were|come[s]?|came|stand[s]?|stood|remain[s]?|remained|exist[s]?|existed|appear[s]?|appeared)\s+"),
+        "constituent_type": "AdvP (Adverb Phrase)",
+        "is_locative": False
+    },
+    # Adjective phrase inversions
+    "ap_inversion": {
+        "pattern": re.compile(r"(?<!\w)(Most|More|Less|Least|Especially|Particularly|Significantly|Notable|Central|Crucial|Essential|Important)\s+([^.,;:!?]*?)\s+(is|are|was|were|come[s]?|came|stand[s]?|stood|remain[s]?|remained|exist[s]?|existed|appear[s]?|appeared)\s+"),
+        "constituent_type": "AP (Adjective Phrase)",
+        "is_locative": False
+    },
+    # Numeric expression inversions
+    "numeric_inversion": {
+        "pattern": re.compile(r"(?<!\w)(One|Two|Three|Four|Five|Six|Seven|Eight|Nine|Ten|First|Second|Third)\s+([^.,;:!?]*?)\s+(is|are|was|were|come[s]?|came|stand[s]?|stood|remain[s]?|remained|exist[s]?|existed|appear[s]?|appeared)\s+"),
+        "constituent_type": "Numeric Expression",
+        "is_locative": False
+    }
+}
+
 def load_corpus_files(corpus_path="./data"):
-    """Load all text_acad_*.txt files from the specified path."""
+    """Load all text_acad_*.txt files from the specified path (in directory order)."""
     files = glob.glob(os.path.join(corpus_path, "text_acad_*.txt"))
     print(f"Found {len(files)} corpus files")
     return files
@@ -52,42 +94,8 @@ def find_inversion_candidates(sentence):
     
     inversions = []
     
-    # Patterns for different inversion types (matching the existing format)
-    patterns = {
-        # Existential there constructions
-        "existential": {
-            "pattern": re.compile(r"(?<!\w)There\s+(is|are|was|were|exists|existed|remains|remained|seems|seemed|appears|appeared)\s+"),
-            "constituent_type": "AdvP (Existential)",
-            "is_locative": True
-        },
-        # Prepositional phrase inversions
-        "pp_inversion": {
-            "pattern": re.compile(r"(?<!\w)(In|On|At|From|Into|Under|Over|Within|Behind|Above|Below|Among|Between|Through|Across|Around|Along)\s+([^.,;:!?]+?)\s+(is|are|was|were|come[s]?|came|stand[s]?|stood|remain[s]?|remained|exist[s]?|existed|appear[s]?|appeared)\s+"),
-            "constituent_type": "PP (Prepositional Phrase)",
-            "is_locative": True
-        },
-        # Adverbial inversions
-        "adv_inversion": {
-            "pattern": re.compile(r"(?<!\w)(Here|There|Now|Then|Never|Seldom|Rarely|Only|Often|Thus|So|Indeed|Perhaps)\s+([^.,;:!?]*?)\s+(is|are|was|were|come[s]?|came|stand[s]?|stood|remain[s]?|remained|exist[s]?|existed|appear[s]?|appeared)\s+"),
-            "constituent_type": "AdvP (Adverb Phrase)",
-            "is_locative": False
-        },
-        # Adjective phrase inversions
-        "ap_inversion": {
-            "pattern": re.compile(r"(?<!\w)(Most|More|Less|Least|Especially|Particularly|Significantly|Notable|Central|Crucial|Essential|Important)\s+([^.,;:!?]*?)\s+(is|are|was|were|come[s]?|came|stand[s]?|stood|remain[s]?|remained|exist[s]?|existed|appear[s]?|appeared)\s+"),
-            "constituent_type": "AP (Adjective Phrase)",
-            "is_locative": False
-        },
-        # Numeric expression inversions
-        "numeric_inversion": {
-            "pattern": re.compile(r"(?<!\w)(One|Two|Three|Four|Five|Six|Seven|Eight|Nine|Ten|First|Second|Third)\s+([^.,;:!?]*?)\s+(is|are|was|were|come[s]?|came|stand[s]?|stood|remain[s]?|remained|exist[s]?|existed|appear[s]?|appeared)\s+"),
-            "constituent_type": "Numeric Expression",
-            "is_locative": False
-        }
-    }
-    
     # Check each pattern type
-    for inv_type, config in patterns.items():
+    for inv_type, config in INVERSION_PATTERNS.items():
         match = config["pattern"].search(sentence)
         if match:
             # For existential pattern
@@ -126,17 +134,15 @@ def find_inversion_candidates(sentence):
     
     return inversions
 
-def analyze_corpus(corpus_path="./data", max_files=None):
-    """Analyze corpus files for subject-verb inversions."""
-    files = load_corpus_files(corpus_path)
-    
-    if max_files:
-        files = files[:max_files]
-    
-    stats = {
-        "total_files": len(files),
+def new_stats(total_files=0):
+    """Create an empty statistics dictionary."""
+    return {
+        "total_files": total_files,
+        "total_bytes": 0,
+        "file_sizes": {},
         "total_paragraphs": 0,
         "total_sentences": 0,
+        "total_words": 0,
         "total_inversions": 0,
         "locative_inversions": 0,
         "non_locative_inversions": 0,
@@ -145,14 +151,57 @@ def analyze_corpus(corpus_path="./data", max_files=None):
         "inversion_types": Counter(),
         "examples": []  # Store examples for output
     }
+
+def process_sentence(sentence, stats, file_name, detect_inversions=True):
+    """
+    Update corpus statistics for a single sentence in one pass.
+    The sentence is tokenised once for the word count and, unless running in
+    statistics-only mode, matched against the inversion patterns.
+    """
+    stats["total_sentences"] += 1
+    stats["total_words"] += len(WORD_PATTERN.findall(sentence))
     
-    total_words = 0
-    sentence_count = 0
+    if not detect_inversions:
+        return
+    
+    for inversion in find_inversion_candidates(sentence):
+        stats["total_inversions"] += 1
+        stats["constituent_types"][inversion["constituent_type"]] += 1
+        stats["inversion_types"][inversion["type"]] += 1
+        
+        if inversion["is_locative"]:
+            stats["locative_inversions"] += 1
+        else:
+            stats["non_locative_inversions"] += 1
+        
+        stats["inversions_by_file"][file_name] += 1
+        
+        # Keep the first 100 examples for output
+        if len(stats["examples"]) < 100:
+            stats["examples"].append(inversion)
+
+def analyze_corpus(corpus_path="./data", max_files=None, detect_inversions=True):
+    """
+    Analyze corpus files for subject-verb inversions.
+    With detect_inversions=False only the basic corpus statistics
+    (files, bytes, paragraphs, sentences, words) are computed.
+    """
+    files = load_corpus_files(corpus_path)
+    
+    if max_files:
+        files = files[:max_files]
+    
+    stats = new_stats(len(files))
     
     for file_path in files:
         file_name = os.path.basename(file_path)
         print(f"Processing {file_name}...")
         
+        # Record the file size while loading so it never has to be re-read
+        file_size = os.path.getsize(file_path)
+        stats["file_sizes"][file_name] = file_size
+        stats["total_bytes"] += file_size
+        
         # Read file content
         content = read_file(file_path)
         
@@ -160,53 +209,246 @@ def analyze_corpus(corpus_path="./data", max_files=None):
         paragraphs = extract_paragraphs(content)
         stats["total_paragraphs"] += len(paragraphs)
         
-        # Process each paragraph
+        # Process each sentence of each paragraph in a single pass
         for para in paragraphs:
-            # Extract sentences
-            sentences = extract_sentences(para)
-            stats["total_sentences"] += len(sentences)
-            
-            # Calculate word counts for average sentence length
-            for sentence in sentences:
-                words = re.findall(r'\b\w+\b', sentence)
-                total_words += len(words)
-                sentence_count += 1
-            
-            # Process each sentence for inversions
-            for sentence in sentences:
-                inversions = find_inversion_candidates(sentence)
-                
-                for inversion in inversions:
-                    stats["total_inversions"] += 1
-                    stats["constituent_types"][inversion["constituent_type"]] += 1
-                    stats["inversion_types"][inversion["type"]] += 1
-                    
-                    if inversion["is_locative"]:
-                        stats["locative_inversions"] += 1
-                    else:
-                        stats["non_locative_inversions"] += 1
-                    
-                    stats["inversions_by_file"][file_name] += 1
-                    
-                    # Keep the first 100 examples for output
-                    if len(stats["examples"]) < 100:
-                        stats["examples"].append(inversion)
+            for sentence in extract_sentences(para):
+                process_sentence(sentence, stats, file_name, detect_inversions)
     
     # Calculate average sentence length
-    if sentence_count > 0:
-        stats["avg_sentence_length"] = total_words / sentence_count
+    if stats["total_sentences"] > 0:
+        stats["avg_sentence_length"] = stats["total_words"] / stats["total_sentences"]
     
     return stats
 
+# Bytes read around a sampled offset; doubled until the whole paragraph is in view
+SAMPLE_WINDOW = 8192
+
+PARAGRAPH_MARKER = re.compile(r'@@\d+')
+
+def draw_offsets(file_sizes, sample_size, rng):
+    """
+    Draw sample_size byte offsets uniformly across all corpus files, so each
+    file is sampled in proportion to its size without being opened.
+    Returns the sorted offsets per file path.
+    """
+    paths = list(file_sizes)
+    cumulative = []
+    total = 0
+    for path in paths:
+        total += file_sizes[path]
+        cumulative.append(total)
+    
+    offsets = defaultdict(list)
+    for _ in range(sample_size):
+        position = rng.randrange(total)
+        index = bisect.bisect_right(cumulative, position)
+        start = cumulative[index] - file_sizes[paths[index]]
+        offsets[paths[index]].append(position - start)
+    return {path: sorted(file_offsets) for path, file_offsets in offsets.items()}
+
+def unit_at_offset(file, file_size, offset, unit="sentence"):
+    """
+    Return the sentence or paragraph covering a byte offset of an open corpus
+    file, reading only a window around it (None if the offset falls on a
+    paragraph marker or whitespace between units).
+    """
+    window = SAMPLE_WINDOW
+    while True:
+        start = max(0, offset - window)
+        end = min(file_size, offset + window)
+        file.seek(start)
+        raw = file.read(end - start)
+        text = raw.decode('utf-8', errors='replace')
+        position = len(raw[:offset - start].decode('utf-8', errors='replace'))
+        
+        # The paragraph lies between the markers around the offset
+        markers = list(PARAGRAPH_MARKER.finditer(text))
+        before = [m for m in markers if m.end() <= position]
+        after = [m for m in markers if m.start() > position]
+        if any(m.start() <= position < m.end() for m in markers):
+            return None
+        if (before or start == 0) and (after or end == file_size):
+            break
+        window *= 2
+    
+    para_start = before[-1].end() if before else 0
+    para_end = after[0].start() if after else len(text)
+    paragraph = text[para_start:para_end]
+    stripped_start = para_start + len(paragraph) - len(paragraph.lstrip())
+    paragraph = paragraph.strip()
+    if not stripped_start <= position < stripped_start + len(paragraph):
+        return None
+    if unit == "paragraph":
+        return paragraph
+    
+    # Locate the sentences of the paragraph to find the one covering the offset
+    position -= stripped_start
+    cursor = 0
+    for sentence in extract_sentences(paragraph):
+        sentence_start = paragraph.find(sentence, cursor)
+        if sentence_start < 0:
+            break
+        cursor = sentence_start + len(sentence)
+        if sentence_start <= position < cursor:
+            return sentence
+        if position < sentence_start:
+            return None
+    return None
+
+def sample_units(files, sample_size, unit, rng, max_rounds=20):
+    """
+    Draw sample_size sentences or paragraphs by random byte offsets
+    
+    Only the windows around the offsets are read; unsampled files are never
+    opened. A unit is drawn with probability proportional to its length in
+    bytes, so each sampled unit comes with its length for weighting.
+    Offsets between units are redrawn. Returns (file name, text, bytes) triples.
+    """
+    file_sizes = {path: os.path.getsize(path) for path in files}
+    file_sizes = {path: size for path, size in file_sizes.items() if size > 0}
+    sample = []
+    for _ in range(max_rounds):
+        missing = sample_size - len(sample)
+        if missing <= 0 or not file_sizes:
+            break
+        for path, offsets in draw_offsets(file_sizes, missing, rng).items():
+            file_name = os.path.basename(path)
+            with open(path, 'rb') as file:
+                for offset in offsets:
+                    text = unit_at_offset(file, file_sizes[path], offset, unit)
+                    if text:
+                        sample.append((file_name, text, len(text.encode('utf-8'))))
+    return sample, sum(file_sizes.values())
+
+def ratio_estimate(numerators, denominators, population_size=None, confidence=0.95, weights=None):
+    """
+    Estimate sum(numerators) / sum(denominators) from a random sample of
+    units with a normal-approximation confidence interval.
+    Uses the linearised variance of the ratio estimator, which also covers
+    cluster samples (e.g. paragraphs of sentences). Units drawn with unequal
+    probabilities are weighted by the inverse of their selection probability;
+    the finite population correction applies only when population_size is given.
+    """
+    n = len(numerators)
+    if weights is None:
+        weights = [1.0] * n
+    total_den = sum(w * m for w, m in zip(weights, denominators))
+    if n == 0 or total_den == 0:
+        return None
+    
+    estimate = sum(w * y for w, y in zip(weights, numerators)) / total_den
+    if n < 2:
+        return {"estimate": estimate, "std_error": None, "ci_low": None, "ci_high": None}
+    
+    residual_ss = sum((w * (y - estimate * m)) ** 2 for w, y, m in zip(weights, numerators, denominators))
+    fpc = max(0.0, 1 - n / population_size) if population_size else 1.0
+    std_error = math.sqrt(fpc * residual_ss * n / (n - 1)) / total_den
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    
+    return {
+        "estimate": estimate,
+        "std_error": std_error,
+        "ci_low": estimate - z * std_error,
+        "ci_high": estimate + z * std_error
+    }
+
+def clip_proportion(result):
+    """Clip a ratio estimate's confidence interval to the [0, 1] range."""
+    if result and result["ci_low"] is not None:
+        result["ci_low"] = max(0.0, result["ci_low"])
+        result["ci_high"] = min(1.0, result["ci_high"])
+    return result
+
+def sample_corpus(corpus_path="./data", sample_size=10000, unit="sentence", seed=42, confidence=0.95):
+    """
+    Estimate inversion rate, type distribution and average sentence length
+    from a seeded sample of sentences or paragraphs drawn at random byte
+    offsets across all corpus files, without reading the whole corpus.
+    """
+    # A fixed file order makes the seeded sample reproducible across file systems
+    files = sorted(load_corpus_files(corpus_path))
+    rng = random.Random(seed)
+    
+    print(f"Drawing a sample of {sample_size} {unit}s (seed {seed})...")
+    sample, total_bytes = sample_units(files, sample_size, unit, rng)
+    
+    # Per-unit measurements; a sampled paragraph is a cluster of sentences.
+    # Units were drawn in proportion to their length, so they are weighted by 1 / length
+    sentences, words, inversions, locative = [], [], [], []
+    unit_type_counts = []
+    weights = []
+    for file_name, text, length in sample:
+        unit_stats = new_stats()
+        texts = extract_sentences(text) if unit == "paragraph" else [text]
+        for sentence in texts:
+            process_sentence(sentence, unit_stats, file_name)
+        
+        sentences.append(unit_stats["total_sentences"])
+        words.append(unit_stats["total_words"])
+        inversions.append(unit_stats["total_inversions"])
+        locative.append(unit_stats["locative_inversions"])
+        unit_type_counts.append(unit_stats["inversion_types"])
+        weights.append(1 / length)
+    
+    all_types = sorted(set().union(*unit_type_counts)) if unit_type_counts else []
+    type_distribution = {
+        inv_type: clip_proportion(ratio_estimate(
+            [counts[inv_type] for counts in unit_type_counts], inversions, confidence=confidence, weights=weights))
+        for inv_type in all_types
+    }
+    
+    return {
+        "unit": unit,
+        "seed": seed,
+        "confidence": confidence,
+        # The mean of 1 / length estimates units per byte of text
+        "population_units": round(total_bytes * sum(weights) / len(weights)) if weights else 0,
+        "sample_units": len(sample),
+        "sample_sentences": sum(sentences),
+        "sample_inversions": sum(inversions),
+        "inversion_rate": clip_proportion(ratio_estimate(inversions, sentences, confidence=confidence, weights=weights)),
+        "locative_share": clip_proportion(ratio_estimate(locative, inversions, confidence=confidence, weights=weights)),
+        "avg_sentence_length": ratio_estimate(words, sentences, confidence=confidence, weights=weights),
+        "inversion_types": type_distribution
+    }
+
+def format_estimate(result, scale=1.0, suffix=""):
+    """Format an estimate with its confidence interval for display."""
+    if result is None:
+        return "n/a"
+    text = f"{result['estimate']*scale:.2f}{suffix}"
+    if result["ci_low"] is not None:
+        text += f" [{result['ci_low']*scale:.2f}, {result['ci_high']*scale:.2f}]"
+    return text
+
+def print_sample_results(estimates):
+    """Print sampled estimates with their confidence intervals."""
+    print(f"\n=== Sampled Corpus Estimates ({estimates['confidence']*100:.0f}% CI) ===")
+    print(f"Sample: {estimates['sample_units']} of about {estimates['population_units']} {estimates['unit']}s "
+          f"(seed {estimates['seed']})")
+    print(f"Sampled sentences: {estimates['sample_sentences']}")
+    print(f"Inversion rate: {format_estimate(estimates['inversion_rate'], 100, '%')}")
+    print(f"Locative share: {format_estimate(estimates['locative_share'], 100, '%')}")
+    print(f"Average sentence length: {format_estimate(estimates['avg_sentence_length'], suffix=' words')}")
+    
+    print("\nInversion types (share of inversions):")
+    for inv_type, result in sorted(estimates["inversion_types"].items(),
+                                   key=lambda x: x[1]["estimate"] if x[1] else 0, reverse=True):
+        print(f"  {inv_type}: {format_estimate(result, 100, '%')}")
+
 def print_results(stats):
     """Print analysis results in the required format."""
     print("\n=== Basic Corpus Statistics ===")
     print(f"Total files: {stats['total_files']}")
-    print(f"Total size: {sum(os.path.getsize(f) for f in glob.glob(os.path.join('./data', 'text_acad_*.txt')))/(1024*1024):.2f} MB")
+    print(f"Total size: {stats['total_bytes']/(1024*1024):.2f} MB")
     print(f"Total paragraphs: {stats['total_paragraphs']}")
     print(f"Total sentences: {stats['total_sentences']}")
+    print(f"Total words: {stats['total_words']}")
     print(f"Average sentence length: {stats.get('avg_sentence_length', 0):.2f} words")
     
+    if not stats["examples"]:
+        return
+    
     print("\n=== Potential Subject-Verb Inversion Examples ===")
     for i, example in enumerate(stats["examples"][:10]):
         print(f"{i+1}. {example['sentence']}")
@@ -220,8 +462,12 @@ def save_results(stats, output_file="corpus_analysis_results.json"):
     # Create a serializable version of stats
     json_stats = {
         "total_files": stats["total_files"],
+        "total_bytes": stats["total_bytes"],
+        "file_sizes": stats["file_sizes"],
         "total_paragraphs": stats["total_paragraphs"],
         "total_sentences": stats["total_sentences"],
+        "total_words": stats["total_words"],
+        "avg_sentence_length": stats.get("avg_sentence_length", 0),
         "total_inversions": stats["total_inversions"],
         "locative_inversions": stats["locative_inversions"],
         "non_locative_inversions": stats["non_locative_inversions"],
@@ -235,15 +481,49 @@ def save_results(stats, output_file="corpus_analysis_results.json"):
         
     print(f"Results saved to {output_file}")
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Basic corpus statistics and potential inversion detection.")
+    parser.add_argument("--corpus-dir", default="./data", help="Directory containing text_acad_*.txt files")
+    parser.add_argument("--max-files", type=int, default=5,
+                        help="Maximum number of files to analyze (0 for all, default: 5)")
+    parser.add_argument("--stats-only", action="store_true",
+                        help="Only compute basic corpus statistics, skip inversion detection")
+    parser.add_argument("--output", default="corpus_analysis_results.json", help="Path of the JSON results file")
+    parser.add_argument("--sample", type=int, default=0, metavar="N",
+                        help="Estimate statistics from N units drawn at random byte offsets across all files, "
+                             "reading only the text around each offset instead of a full scan")
+    parser.add_argument("--unit", choices=["sentence", "paragraph"], default="sentence",
+                        help="Sampling unit for --sample (default: sentence)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for --sample (default: 42)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level for --sample (default: 0.95)")
+    return parser.parse_args()
+
 def main():
-    # Analyze corpus (limit to 5 files to match existing output)
-    stats = analyze_corpus(max_files=5)
+    args = parse_args()
+    
+    if args.sample:
+        # Approximate statistics from a representative sample of the whole corpus
+        estimates = sample_corpus(args.corpus_dir, args.sample, args.unit, args.seed, args.confidence)
+        print_sample_results(estimates)
+        
+        output_file = args.output
+        if output_file == "corpus_analysis_results.json":
+            output_file = "corpus_sample_results.json"
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(estimates, f, indent=2)
+        print(f"Results saved to {output_file}")
+        return
+    
+    # Analyze corpus (limited to 5 files by default to match existing output)
+    stats = analyze_corpus(args.corpus_dir, max_files=args.max_files or None,
+                           detect_inversions=not args.stats_only)
     
     # Print basic statistics and examples
     print_results(stats)
     
     # Save results
-    save_results(stats)
+    save_results(stats, args.output)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,22 +1,134 @@
 import os
 import re
+import sys
 import csv
 import glob
-import spacy
+import json
+import codecs
+import random
+import hashlib
+import importlib.util
+import argparse
+import multiprocessing
 from tqdm import tqdm
-from collections import defaultdict
+from collections import Counter, defaultdict
 import time
 from datetime import datetime
 
-# Load the spaCy model
-print("Loading spaCy model...")
-nlp = spacy.load("en_core_web_sm")
-# Increase max length to avoid truncation issues
-nlp.max_length = 2000000
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+MODEL_NAME = "en_core_web_sm"
+
+# Components of en_core_web_sm that each profile leaves out.
+# Inversion detection only uses POS tags (tagger + attribute_ruler) and the
+# dependency parse, so NER and the lemmatizer are dead weight.
+PIPELINE_PROFILES = {
+    # Everything the model enables by default
+    "full": {"exclude": []},
+    # Only what identify_inversions needs
+    "slim": {"exclude": ["ner", "lemmatizer", "senter"]},
+    # Rule-based sentence splitting only, for a cheap first pass
+    "segment": {"exclude": ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"],
+                "sentencizer": True},
+}
+DEFAULT_PROFILE = "slim"
+
+def load_pipeline(profile=DEFAULT_PROFILE):
+    """Load the spaCy model with only the components of the given profile."""
+    # Imported here so that importing this module and --help stay instant
+    import spacy
+    
+    settings = PIPELINE_PROFILES[profile]
+    pipeline = spacy.load(MODEL_NAME, exclude=settings["exclude"])
+    if settings.get("sentencizer"):
+        pipeline.add_pipe("sentencizer")
+    # Increase max length to avoid truncation issues
+    pipeline.max_length = 2000000
+    return pipeline
+
+# The spaCy pipeline is loaded on first use by get_nlp()
+nlp = None
+nlp_profile = DEFAULT_PROFILE
+
+def get_nlp(profile=None):
+    """Return the spaCy pipeline, loading it (or switching to another profile) on first use."""
+    global nlp, nlp_profile
+    if profile is not None and profile != nlp_profile:
+        nlp = None
+        nlp_profile = profile
+    if nlp is None:
+        print(f"Loading spaCy model ({nlp_profile} profile)...")
+        nlp = load_pipeline(nlp_profile)
+    return nlp
+
+# Maximum characters per chunk handed to spaCy (to avoid memory issues)
+CHUNK_SIZE = 100000
+# Characters read from disk at a time when streaming a file
+READ_BLOCK_SIZE = 1 << 16
+
+# Where a chunk may be cut, from most to least preferred: before a
+# paragraph marker, after a sentence end, at whitespace
+PARAGRAPH_BOUNDARY = re.compile(r'(?=@@\d|<p>)')
+ABBREVIATIONS = ["Dr", "Mr", "Mrs", "Ms", "Prof", "Fig", "St", "etc", "al", "e.g", "i.e", "vs"]
+SENTENCE_BOUNDARY = re.compile("".join(f"(?<!{re.escape(a)})" for a in ABBREVIATIONS) +
+                               r'[.!?]["\')\]]*\s+(?=["\'(]?[A-Z0-9@<])')
+WHITESPACE_BOUNDARY = re.compile(r'\s+')
+CHUNK_BOUNDARIES = [PARAGRAPH_BOUNDARY, SENTENCE_BOUNDARY, WHITESPACE_BOUNDARY]
+
+# Lexical prefilter for cascade mode. A sentence is only parsed if it opens
+# with a typical fronted constituent (preposition, adverb, adjective,
+# participle or numeral), has a quotative verb after a comma or quote, or
+# contains a comparative/negative inversion such as "as did" or "nor is".
+FRONTING_PREPOSITIONS = ["in", "on", "at", "above", "below", "under", "over", "behind", "beneath",
+                         "beside", "between", "beyond", "by", "inside", "outside", "underneath",
+                         "upon", "within", "among", "amongst", "along", "around", "across",
+                         "through", "throughout", "into", "onto", "from", "to", "of", "with",
+                         "without", "after", "before", "during", "since", "until", "near",
+                         "against", "toward", "towards", "amid", "like", "unlike", "as"]
+FRONTING_ADVERBS = ["here", "there", "now", "then", "never", "seldom", "rarely", "only", "thus",
+                    "so", "such", "hence", "indeed", "perhaps", "maybe", "today", "yesterday",
+                    "tomorrow", "everywhere", "somewhere", "nowhere", "often", "always", "again",
+                    "little", "nor", "neither", "not", "no", "hardly", "scarcely", "barely",
+                    "also", "still", "yet", "far", "well", "first", "next", "last", "finally"]
+FRONTING_ADJECTIVES = ["most", "more", "less", "least", "central", "crucial", "essential",
+                       "paramount", "fundamental", "important", "relevant", "critical", "notable",
+                       "primary", "foremost", "equally", "especially", "particularly",
+                       "gone", "absent", "present", "missing", "lost", "implicit", "inherent"]
+NUMERALS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+            "second", "third", "fourth", "fifth"]
+QUOTATIVE_VERBS = ["say", "says", "said", "claim", "claims", "claimed", "state", "states", "stated",
+                   "explain", "explains", "explained", "reply", "replies", "replied", "respond",
+                   "responds", "responded", "suggest", "suggests", "suggested", "mention",
+                   "mentions", "mentioned", "write", "writes", "wrote", "note", "notes", "noted",
+                   "argue", "argues", "argued", "ask", "asks", "asked", "add", "adds", "added"]
+INVERTED_AUXILIARIES = ["is", "are", "was", "were", "do", "does", "did", "have", "has", "had",
+                        "can", "could", "will", "would", "should", "shall", "must", "might", "may"]
+
+CASCADE_PREFILTER = re.compile(
+    # Fronted constituent at the start, after optional quotes and conjunctions
+    r"^\W*(?:(?:and|but|or|yet)\s+)?(?:" + "|".join(FRONTING_PREPOSITIONS + FRONTING_ADVERBS +
+                                                   FRONTING_ADJECTIVES + NUMERALS) +
+    r"|\w+ly|\w+(?:ed|ing|en|er|est))\b"
+    # Fronted PP after a clause-initial conjunction
+    r"|[,;:]\s*(?:and|but|or|yet)\s+(?:" + "|".join(FRONTING_PREPOSITIONS) + r")\b"
+    # Quotative inversion
+    r"|[,\"'\u201d]\s*(?:\w+\s+){0,2}(?:" + "|".join(QUOTATIVE_VERBS) + r")\b"
+    # Comparative and negative inversions
+    r"|\b(?:as|than|so|nor|neither)\s+(?:" + "|".join(INVERTED_AUXILIARIES) + r")\b",
+    re.IGNORECASE
+)
+
+# Directory for serialized parses of each corpus file
+PARSE_CACHE_DIR = "parse_cache"
+# Bump when clean_text/preprocess_text or the chunking change, to invalidate cached parses
+PARSE_CACHE_VERSION = 2
 
 def load_text_files(directory='.'):
     """Load all .txt files in the given directory."""
-    txt_files = glob.glob(os.path.join(directory, '*.txt'))
+    txt_files = sorted(glob.glob(os.path.join(directory, '*.txt')))
     return txt_files
 
 def load_single_file(file_path):
@@ -33,6 +145,33 @@ def load_single_file(file_path):
             print(f"Error: Could not read file: {e}")
             return None
 
+def detect_encoding(file_path):
+    """
+    Return 'utf-8' if the whole file decodes as UTF-8 and 'latin-1' otherwise,
+    like load_single_file. The file is checked block by block.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return 'latin-1'
+    return 'utf-8'
+
+def open_text_file(file_path):
+    """Open a text file for streaming, or return None if it cannot be read."""
+    try:
+        return open(file_path, 'r', encoding=detect_encoding(file_path))
+    except OSError as e:
+        print(f"Error: Could not read file: {e}")
+        return None
+
+def iter_blocks(f, block_size=READ_BLOCK_SIZE):
+    """Yield the contents of an open text file block by block."""
+    return iter(lambda: f.read(block_size), '')
+
 def clean_text(text):
     """Clean the text before processing."""
     # Remove paragraph markers
@@ -54,18 +193,51 @@ def preprocess_text(text):
     text = text.replace('PERIOD', '.')
     return text
 
-def extract_sentences(text, max_sentences=None):
-    """Extract sentences using spaCy, with optional limit."""
-    text = clean_text(text)
-    text = preprocess_text(text)
-    
-    # Split into chunks for processing (to avoid memory issues)
-    chunk_size = 100000  # characters
-    chunks = [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
+def find_chunk_cut(text, limit):
+    """
+    Return the position at which to cut text so that the first part is at
+    most limit characters long, preferring paragraph, then sentence, then
+    word boundaries.
+    """
+    window = text[:limit]
+    for boundary in CHUNK_BOUNDARIES:
+        cut = 0
+        for match in boundary.finditer(window):
+            cut = match.end()
+        if cut > 0:
+            return cut
+    return limit
+
+def iter_text_chunks(blocks, chunk_size=CHUNK_SIZE):
+    """
+    Regroup raw text blocks into cleaned chunks of at most chunk_size characters.
+    Only about one chunk of raw text is held at a time, and chunks end at a
+    paragraph or sentence boundary, so sentences are only split when a
+    single sentence is longer than a chunk.
+    """
+    buffer = ""
+    for block in blocks:
+        buffer += block
+        while len(buffer) > chunk_size:
+            cut = find_chunk_cut(buffer, chunk_size)
+            chunk = preprocess_text(clean_text(buffer[:cut])).strip()
+            buffer = buffer[cut:]
+            if chunk:
+                yield chunk
     
+    chunk = preprocess_text(clean_text(buffer)).strip()
+    if chunk:
+        yield chunk
+
+def extract_sentences(text, max_sentences=None):
+    """
+    Parse the text with spaCy and return its sentence spans, with optional limit.
+    The spans keep the full parse of their chunk, so they are analysed
+    directly instead of being parsed a second time.
+    """
     all_sentences = []
-    for chunk in chunks:
-        doc = nlp(chunk)
+    for chunk in iter_text_chunks([text]):
+        doc = get_nlp()(chunk)
         sentences = list(doc.sents)
         all_sentences.extend(sentences)
         
@@ -76,36 +248,339 @@ def extract_sentences(text, max_sentences=None):
     
     return all_sentences
 
-def get_main_fronted_element(token, sent, verb_pos):
+def parse_cache_path(file_path, cache_dir=PARSE_CACHE_DIR):
+    """
+    Return the cache file for a corpus file's parse.
+    The name includes a hash of the file contents, the model name and version,
+    the enabled pipeline components and the chunking, so any change to them
+    leads to a fresh parse.
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            file_hash.update(block)
+    
+    pipeline = get_nlp()
+    key = json.dumps({
+        "file": file_hash.hexdigest(),
+        "model": f"{pipeline.meta.get('lang')}_{pipeline.meta.get('name')}",
+        "version": pipeline.meta.get("version"),
+        "pipeline": pipeline.pipe_names,
+        "chunk_size": CHUNK_SIZE,
+        "cache_version": PARSE_CACHE_VERSION,
+    }, sort_keys=True)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(file_path)}.{digest}.spacy")
+
+def load_cached_docs(cache_path):
+    """Load the parsed chunks of a file from its DocBin cache."""
+    from spacy.tokens import DocBin
+    
+    doc_bin = DocBin().from_disk(cache_path)
+    return doc_bin.get_docs(get_nlp().vocab)
+
+def save_cached_docs(doc_bin, cache_path):
+    """Write a file's DocBin and remove stale caches of the same file."""
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    file_prefix = os.path.basename(cache_path).rsplit('.', 2)[0]
+    for old_path in glob.glob(os.path.join(cache_dir, glob.escape(file_prefix) + '.*.spacy')):
+        if old_path != cache_path:
+            os.remove(old_path)
+    
+    # Write to a temporary file first so an interrupted run leaves no partial cache
+    temp_path = cache_path + '.tmp'
+    doc_bin.to_disk(temp_path)
+    os.replace(temp_path, cache_path)
+
+def iter_file_chunks(file_paths, sentence_counts, max_sentences=None, truncated=None):
+    """
+    Yield (chunk, (file_name, chunk_index)) tuples for nlp.pipe(as_tuples=True).
+    Files are streamed from disk chunk by chunk, and no further chunks of a
+    file are queued once sentence_counts shows it has reached max_sentences;
+    such files are added to the truncated set.
+    """
+    for file_path in file_paths:
+        file_name = os.path.basename(file_path)
+        f = open_text_file(file_path)
+        if f is None:
+            continue
+        
+        with f:
+            chunk_index = -1
+            for chunk_index, chunk in enumerate(iter_text_chunks(iter_blocks(f))):
+                if max_sentences and sentence_counts[file_name] >= max_sentences:
+                    if truncated is not None:
+                        truncated.add(file_name)
+                    break
+                yield chunk, (file_name, chunk_index)
+        
+        if chunk_index < 0:
+            # Still report empty files in the summary
+            yield "", (file_name, 0)
+
+def iter_corpus_docs(file_paths, sentence_counts, max_sentences=None, batch_size=4, n_process=1,
+                     cache_dir=PARSE_CACHE_DIR):
+    """
+    Yield (doc, (file_name, chunk_index)) for every chunk of the corpus, in file order.
+    
+    Files with a cached parse are loaded from disk; all other files go
+    through a single nlp.pipe stream, and each fully parsed file is added
+    to the cache. Files cut short by max_sentences are not cached.
+    """
+    from spacy.tokens import DocBin
+    
+    cache_paths = {}
+    if cache_dir:
+        cache_paths = {file_path: parse_cache_path(file_path, cache_dir) for file_path in file_paths}
+    to_parse = [file_path for file_path in file_paths
+                if not os.path.exists(cache_paths.get(file_path, ''))]
+    uncached = set(to_parse)
+    if cache_dir:
+        print(f"Parse cache: {len(file_paths) - len(to_parse)} files cached, {len(to_parse)} to parse.")
+    
+    truncated = set()
+    chunks = iter_file_chunks(to_parse, sentence_counts, max_sentences, truncated)
+    parsed = get_nlp().pipe(chunks, as_tuples=True, batch_size=batch_size, n_process=n_process)
+    pending = next(parsed, None)
+    
+    for file_path in file_paths:
+        file_name = os.path.basename(file_path)
+        if file_path not in uncached:
+            for chunk_index, doc in enumerate(load_cached_docs(cache_paths[file_path])):
+                yield doc, (file_name, chunk_index)
+            continue
+        
+        # nlp.pipe preserves input order, so the chunks of a file arrive together
+        doc_bin = DocBin(store_user_data=False)
+        while pending is not None and pending[1][0] == file_name:
+            doc_bin.add(pending[0])
+            yield pending
+            pending = next(parsed, None)
+        
+        if cache_dir and len(doc_bin) and file_name not in truncated:
+            save_cached_docs(doc_bin, cache_paths[file_path])
+
+def iter_parsed_files(file_paths, max_sentences=None, batch_size=4, n_process=1,
+                      cache_dir=PARSE_CACHE_DIR):
+    """
+    Stream all files through nlp.pipe and yield (file_name, sentence_count, inversions)
+    once each file has been fully parsed.
+    
+    Chunks of every file go through a single pipe, so spaCy batches them
+    internally and n_process > 1 spreads parsing across CPU cores.
+    Parses are cached in cache_dir (None disables the cache).
+    """
+    sentence_counts = defaultdict(int)
+    docs = iter_corpus_docs(file_paths, sentence_counts, max_sentences, batch_size, n_process, cache_dir)
+    
+    current_file = None
+    inversions = []
+    for doc, (file_name, chunk_index) in docs:
+        if file_name != current_file:
+            if current_file is not None:
+                yield current_file, sentence_counts[current_file], inversions
+            current_file = file_name
+            inversions = []
+        
+        for sent in doc.sents:
+            # Cached docs and chunks read ahead by the pipe may exceed the per-file limit
+            if max_sentences and sentence_counts[file_name] >= max_sentences:
+                break
+            sentence_counts[file_name] += 1
+            
+            try:
+                inversions.extend(identify_sentence_inversions(sent))
+            except Exception as e:
+                # Skip problematic sentences
+                continue
+    
+    if current_file is not None:
+        yield current_file, sentence_counts[current_file], inversions
+
+def is_cascade_candidate(sentence):
+    """Return True if the lexical prefilter lets a sentence through to the parser."""
+    return CASCADE_PREFILTER.search(sentence) is not None
+
+def iter_segmented_sentences(file_paths, max_sentences=None, files_read=None):
+    """
+    Yield (file_name, sentence_index, sentence) for every file, split with the
+    rule-based segment profile instead of the parser. Files that could be
+    read are appended to files_read.
+    """
+    segmenter = load_pipeline("segment")
+    for file_path in file_paths:
+        file_name = os.path.basename(file_path)
+        f = open_text_file(file_path)
+        if f is None:
+            continue
+        if files_read is not None:
+            files_read.append(file_name)
+        
+        with f:
+            sentence_index = 0
+            for doc in segmenter.pipe(iter_text_chunks(iter_blocks(f))):
+                for sent in doc.sents:
+                    if max_sentences and sentence_index >= max_sentences:
+                        break
+                    yield file_name, sentence_index, sent.text
+                    sentence_index += 1
+                
+                if max_sentences and sentence_index >= max_sentences:
+                    break
+
+def new_audit(sample_size, seed=42):
+    """Create the state for a recall audit of sentences rejected by the prefilter."""
+    return {
+        "sample_size": sample_size,
+        "random": random.Random(seed),
+        "rejected": 0,
+        "sample": [],
+        "candidate_hits": 0,
+    }
+
+def add_rejected_sentence(audit, file_name, sentence):
+    """Keep a uniform random sample of rejected sentences (reservoir sampling)."""
+    audit["rejected"] += 1
+    if len(audit["sample"]) < audit["sample_size"]:
+        audit["sample"].append((sentence, file_name))
+    else:
+        j = audit["random"].randrange(audit["rejected"])
+        if j < audit["sample_size"]:
+            audit["sample"][j] = (sentence, file_name)
+
+def iter_cascade_files(file_paths, max_sentences=None, batch_size=256, n_process=1, audit=None):
     """
-    Extract the main fronted element starting from a token.
+    Cascade mode: split every file with the cheap sentencizer, parse only the
+    sentences that pass the lexical prefilter, and yield
+    (file_name, sentence_count, inversions) per file like iter_parsed_files.
     
-    This function identifies the highest-level fronted element 
-    (avoiding nested phrases).
+    If an audit is given, a random sample of the rejected sentences is kept
+    in it for run_recall_audit.
     """
-    # Start with the token itself
-    current = token
+    sentence_counts = defaultdict(int)
+    files_read = []
     
-    # Try to find the highest-level head before the verb
-    while current.head.i < verb_pos and current.head.i > 0 and current.head != current:
-        # Only move up if the head is before the verb and not the root
-        current = current.head
+    def candidates():
+        for file_name, sentence_index, sentence in iter_segmented_sentences(file_paths, max_sentences, files_read):
+            sentence_counts[file_name] += 1
+            if is_cascade_candidate(sentence):
+                yield sentence, (file_name, sentence_index)
+            elif audit is not None:
+                add_rejected_sentence(audit, file_name, sentence)
     
-    # Get the entire phrase from this highest head
-    phrase_tokens = list(current.subtree)
+    parsed = get_nlp().pipe(candidates(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+    pending = next(parsed, None)
     
-    # Filter to only include tokens that appear before the verb
-    phrase_tokens = [t for t in phrase_tokens if t.i < verb_pos]
+    for file_path in file_paths:
+        file_name = os.path.basename(file_path)
+        inversions = []
+        
+        # nlp.pipe preserves input order, so the candidates of a file arrive together
+        while pending is not None and pending[1][0] == file_name:
+            doc = pending[0]
+            sentence_inversions = []
+            for sent in doc.sents:
+                try:
+                    sentence_inversions.extend(identify_sentence_inversions(sent))
+                except Exception as e:
+                    # Skip problematic sentences
+                    continue
+            if audit is not None and sentence_inversions:
+                audit["candidate_hits"] += 1
+            inversions.extend(sentence_inversions)
+            pending = next(parsed, None)
+        
+        # Once the stream has moved past a file, it has been fully segmented
+        if file_name in files_read:
+            yield file_name, sentence_counts[file_name], inversions
+
+def index_sentence(sent):
+    """
+    Precompute per-token data for fronted-element extraction in one pass over the sentence.
+    Returns token texts, POS tags, dependency labels and heads (by document
+    position); subtree bounds are added on first use.
+    """
+    texts, pos, deps, heads = [], [], [], []
+    for t in sent:
+        texts.append(t.text)
+        pos.append(t.pos_)
+        deps.append(t.dep_)
+        heads.append(t.head.i)
     
-    # Sort by position in the sentence
-    phrase_tokens.sort(key=lambda x: x.i)
+    return {
+        "start": sent.start,
+        "texts": texts,
+        "pos": pos,
+        "deps": deps,
+        "heads": heads,
+        "bounds": None,
+    }
+
+def subtree_bounds(info):
+    """
+    Compute the (first, last) position of every token's subtree in linear time.
+    Bounds are None for non-projective subtrees, whose tokens are not contiguous.
+    """
+    start = info["start"]
+    heads = [h - start for h in info["heads"]]
+    n = len(heads)
+    
+    # Visit every token after its head, then merge children into heads in reverse
+    children = [[] for _ in range(n)]
+    order = []
+    for i, h in enumerate(heads):
+        if h == i:
+            order.append(i)
+        else:
+            children[h].append(i)
+    for i in order:
+        order.extend(children[i])
+    
+    sizes = [1] * n
+    lefts = list(range(n))
+    rights = list(range(n))
+    for i in reversed(order):
+        h = heads[i]
+        if h != i:
+            sizes[h] += sizes[i]
+            if lefts[i] < lefts[h]:
+                lefts[h] = lefts[i]
+            if rights[i] > rights[h]:
+                rights[h] = rights[i]
+    
+    return [(lefts[i] + start, rights[i] + start) if rights[i] - lefts[i] + 1 == sizes[i] else None
+            for i in range(n)]
+
+def subtree_ids(head, sent, info, end=None):
+    """
+    Return the sorted positions of a token's subtree, optionally only those before end.
+    Projective subtrees are read directly from the precomputed bounds.
+    """
+    if info["bounds"] is None:
+        info["bounds"] = subtree_bounds(info)
+    bounds = info["bounds"][head - info["start"]]
+    if end is None:
+        end = sent.end
+    if bounds is not None:
+        return list(range(bounds[0], min(bounds[1] + 1, end)))
+    return sorted(t.i for t in sent.doc[head].subtree if t.i < end)
+
+def get_main_fronted_element(head, sent, verb_pos, info):
+    """
+    Extract the fronted element headed by a token (by document position).
+    The phrase is the part of the head's subtree that comes before the verb.
+    """
+    start = info["start"]
+    token_ids = subtree_ids(head, sent, info, verb_pos)
     
     # Join the tokens to form the phrase text
-    if phrase_tokens:
-        phrase_text = " ".join([t.text for t in phrase_tokens])
+    if token_ids:
+        phrase_text = " ".join([info["texts"][i - start] for i in token_ids])
         
         # Determine phrase type
-        phrase_type = determine_phrase_type(current)
+        phrase_type = determine_phrase_type(sent.doc[head])
         
         # Determine if it's locative
         is_loc = is_locative(phrase_text, phrase_type)
@@ -114,11 +589,70 @@ def get_main_fronted_element(token, sent, verb_pos):
             "text": phrase_text,
             "type": phrase_type,
             "locative": is_loc,
-            "token_ids": [t.i for t in phrase_tokens]
+            "token_ids": token_ids
         }
     
     return None
 
+def find_fronted_elements(sent, verb_pos, info):
+    """
+    Find the fronted elements before the verb at verb_pos.
+    
+    This identifies the highest-level fronted elements (avoiding nested
+    phrases). Head climbing is memoised and each phrase head is expanded
+    once, so extraction is linear in the number of tokens before the verb.
+    """
+    start = info["start"]
+    heads = info["heads"]
+    
+    # Highest head before the verb reachable from each token
+    tops = {}
+    
+    def climb(i):
+        chain = []
+        while i not in tops:
+            head = heads[i - start]
+            # Only move up if the head is before the verb and not the first token of the sentence
+            if not (head < verb_pos and head > start and head != i):
+                tops[i] = i
+                break
+            chain.append(i)
+            i = head
+        for j in chain:
+            tops[j] = tops[i]
+        return tops[i]
+    
+    phrases = {}
+    fronted_elements = []
+    processed_token_ids = set()
+    
+    for i in range(start, verb_pos):
+        # Skip tokens we've already included in a phrase
+        if i in processed_token_ids:
+            continue
+        
+        # Only consider tokens with certain POS/dependencies as phrase heads
+        if info["pos"][i - start] in ["ADP", "ADV", "ADJ", "VERB"] or info["deps"][i - start] in ["prep", "advmod", "amod", "advcl"]:
+            head = climb(i)
+            if head not in phrases:
+                phrases[head] = get_main_fronted_element(head, sent, verb_pos, info)
+            fronted_element = phrases[head]
+            
+            if fronted_element and len(fronted_element["text"].split()) > 1:  # Skip single words
+                # Add all tokens in this phrase to processed set
+                processed_token_ids.update(fronted_element["token_ids"])
+                
+                # Add to fronted elements
+                fronted_elements.append(fronted_element)
+    
+    # Deduplicate fronted elements (in case we have overlaps)
+    unique_elements = {}
+    for fe in fronted_elements:
+        if fe["text"] not in unique_elements:
+            unique_elements[fe["text"]] = fe
+    
+    return list(unique_elements.values())
+
 def determine_phrase_type(token):
     """Determine the phrase type based on the head token."""
     pos = token.pos_
@@ -195,8 +729,17 @@ def is_quotative_inversion(verb, subject):
             subject.text.lower() not in ["i", "we", "you", "they", "he", "she", "it"])
 
 def identify_inversions(doc):
+    """Identify subject-verb inversions in every sentence of a spaCy parsed document."""
+    inversions = []
+    
+    for sent in doc.sents:
+        inversions.extend(identify_sentence_inversions(sent))
+    
+    return inversions
+
+def identify_sentence_inversions(sent):
     """
-    Identify subject-verb inversions in a spaCy parsed document.
+    Identify subject-verb inversions in a single parsed sentence span.
     
     A subject-verb inversion is identified when:
     1. A verb has a subject
@@ -205,73 +748,49 @@ def identify_inversions(doc):
     """
     inversions = []
     
-    for sent in doc.sents:
-        # Skip very short sentences
-        if len(sent) < 4:
-            continue
-        
-        # Find all verbs in the sentence
-        verbs = [token for token in sent if token.pos_ == "VERB" or 
-                (token.pos_ == "AUX" and token.dep_ in ["ROOT", "ccomp", "xcomp"])]
+    # Skip very short sentences
+    if len(sent) < 4:
+        return inversions
+    
+    # Find all verbs in the sentence
+    verbs = [token for token in sent if token.pos_ == "VERB" or 
+            (token.pos_ == "AUX" and token.dep_ in ["ROOT", "ccomp", "xcomp"])]
+    
+    # Only sentences with a post-verbal subject are indexed
+    info = None
+    for verb in verbs:
+        # Find the subject of this verb (if any)
+        subjects = [child for child in verb.children if child.dep_ in ["nsubj", "nsubjpass", "csubj"]]
+        fronted = None
         
-        for verb in verbs:
-            # Find the subject of this verb (if any)
-            subjects = [child for child in verb.children if child.dep_ in ["nsubj", "nsubjpass", "csubj"]]
-            
-            for subject in subjects:
-                # Check if subject appears after the verb (potential inversion)
-                if subject.i > verb.i:
-                    # Check if this is a quotative inversion
-                    quotative = is_quotative_inversion(verb, subject)
-                    
-                    # Find fronted elements before the verb
-                    # We'll look at tokens from the beginning of the sentence to just before the verb
-                    fronted_tokens = [t for t in sent if t.i < verb.i]
-                    
-                    # Process each potential fronted element
-                    fronted_elements = []
-                    processed_token_ids = set()
-                    
-                    for token in fronted_tokens:
-                        # Skip tokens we've already included in a phrase
-                        if token.i in processed_token_ids:
-                            continue
-                        
-                        # Only consider tokens with certain POS/dependencies as phrase heads
-                        if token.pos_ in ["ADP", "ADV", "ADJ", "VERB"] or token.dep_ in ["prep", "advmod", "amod", "advcl"]:
-                            fronted_element = get_main_fronted_element(token, sent, verb.i)
-                            
-                            if fronted_element and len(fronted_element["text"].split()) > 1:  # Skip single words
-                                # Add all tokens in this phrase to processed set
-                                processed_token_ids.update(fronted_element["token_ids"])
-                                
-                                # Add to fronted elements
-                                fronted_elements.append(fronted_element)
-                    
-                    # Deduplicate fronted elements (in case we have overlaps)
-                    unique_elements = {}
-                    for fe in fronted_elements:
-                        if fe["text"] not in unique_elements:
-                            unique_elements[fe["text"]] = fe
-                    
-                    fronted_elements = list(unique_elements.values())
+        for subject in subjects:
+            # Check if subject appears after the verb (potential inversion)
+            if subject.i > verb.i:
+                # Check if this is a quotative inversion
+                quotative = is_quotative_inversion(verb, subject)
+                
+                # The fronted elements depend only on the verb, so they are found once per verb
+                if fronted is None:
+                    if info is None:
+                        info = index_sentence(sent)
+                    fronted = find_fronted_elements(sent, verb.i, info)
+                fronted_elements = list(fronted)
+                
+                # If we found fronted elements, record this as an inversion
+                if fronted_elements:
+                    # Get the subject phrase
+                    subject_ids = subtree_ids(subject.i, sent, info)
+                    subject_text = " ".join([info["texts"][i - sent.start] for i in subject_ids])
                     
-                    # If we found fronted elements, record this as an inversion
-                    if fronted_elements:
-                        # Get the subject phrase
-                        subject_tokens = list(subject.subtree)
-                        subject_tokens.sort(key=lambda x: x.i)
-                        subject_text = " ".join([t.text for t in subject_tokens])
-                        
-                        inversions.append({
-                            "sentence": sent.text,
-                            "verb": verb.text,
-                            "verb_position": verb.i,
-                            "subject": subject_text,
-                            "subject_position": subject.i,
-                            "fronted_elements": fronted_elements,
-                            "quotative": quotative
-                        })
+                    inversions.append({
+                        "sentence": sent.text,
+                        "verb": verb.text,
+                        "verb_position": verb.i - sent.start,
+                        "subject": subject_text,
+                        "subject_position": subject.i - sent.start,
+                        "fronted_elements": fronted_elements,
+                        "quotative": quotative
+                    })
     
     return inversions
 
@@ -339,222 +858,396 @@ def analyze_information_structure(inversion):
         "canonical_structure": fronted_given and subject_new
     }
 
-def analyze_corpus(max_sentences_per_file=None):
-    """Analyze all text files in the corpus for subject-verb inversions."""
-    # Create timestamp for output files
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+# Columns of the inversions and summary files
+INVERSION_COLUMNS = [
+    "File", 
+    "Sentence", 
+    "Fronted Element", 
+    "Fronted Element Type", 
+    "Locative", 
+    "Verb", 
+    "Subject", 
+    "Quotative",
+    "Discourse Function",
+    "Information Structure"
+]
+SUMMARY_COLUMNS = [
+    "File",
+    "Total Sentences",
+    "Total Inversions",
+    "Inversion Rate",
+    "Quotative Count",
+    "Non-Quotative Count",
+    "Scene-setting Count",
+    "Discourse structuring Count",
+    "Evaluative Count",
+    "Comparative Count",
+    "Given->New Count",
+    "Other Info Structure Count",
+    "PP (Locative) Count",
+    "PP (Non-locative) Count",
+    "AdvP (Locative) Count",
+    "AdvP (Non-locative) Count",
+    "AdjP (Locative) Count",
+    "AdjP (Non-locative) Count",
+    "VP (Locative) Count",
+    "VP (Non-locative) Count",
+    "Other (Locative) Count",
+    "Other (Non-locative) Count"
+]
+SUMMARY_FUNCTIONS = ["Scene-setting", "Discourse structuring", "Evaluative", "Comparative"]
+SUMMARY_PHRASE_TYPES = ["PP", "AdvP", "AdjP", "VP", "Other"]
+
+# Written to the output directory after every checkpoint; removed once the run completes
+CHECKPOINT_FILE = "analysis_checkpoint.json"
+CHECKPOINT_VERSION = 2
+
+def new_counts():
+    """Create the counters kept for each file and for the whole corpus."""
+    return {
+        "sentences": 0,
+        "inversions": 0,
+        "quotative": 0,
+        "types": Counter(),
+        "functions": Counter(),
+        "info_structure": Counter(),
+    }
+
+def add_counts(total, counts):
+    """Add a file's counters to the corpus counters."""
+    for key, value in counts.items():
+        if isinstance(value, dict):
+            total[key].update(value)
+        else:
+            total[key] += value
+
+def analyze_file_inversions(file_name, total_sentences, file_inversions):
+    """
+    Classify the inversions of a file.
+    Returns the rows for the inversions file (one per fronted element) and the file's counters.
+    """
+    counts = new_counts()
+    counts["sentences"] = total_sentences
+    counts["inversions"] = len(file_inversions)
+    rows = []
     
-    # Get all text files
-    file_paths = load_text_files()
-    print(f"Found {len(file_paths)} text files.")
+    for inversion in file_inversions:
+        # Analyze discourse function
+        discourse_function = classify_inversion_function(inversion)
+        counts["functions"][discourse_function] += 1
+        
+        # Count quotative inversions
+        if inversion["quotative"]:
+            counts["quotative"] += 1
+        
+        # Analyze information structure
+        info_structure = analyze_information_structure(inversion)
+        info_structure_text = "Given->New" if info_structure["canonical_structure"] else "Other"
+        counts["info_structure"][info_structure_text] += 1
+        
+        # Count primary fronted element type for each inversion
+        if inversion["fronted_elements"]:
+            main_fe = max(inversion["fronted_elements"], key=lambda x: len(x["text"]))
+            counts["types"][f"{main_fe['type']} ({'Locative' if main_fe['locative'] else 'Non-locative'})"] += 1
+        
+        # One row per fronted element in the inversion
+        for fe in inversion["fronted_elements"]:
+            rows.append([
+                file_name,
+                inversion["sentence"],
+                fe["text"],
+                fe["type"],
+                "Locative" if fe["locative"] else "Non-locative",
+                inversion["verb"],
+                inversion["subject"],
+                "Yes" if inversion["quotative"] else "No",
+                discourse_function,
+                info_structure_text
+            ])
     
-    # Prepare main CSV output file
-    main_csv = f"corpus_inversions_{timestamp}.csv"
-    with open(main_csv, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "File", 
-            "Sentence", 
-            "Fronted Element", 
-            "Fronted Element Type", 
-            "Locative", 
-            "Verb", 
-            "Subject", 
-            "Quotative",
-            "Discourse Function",
-            "Information Structure"
-        ])
-    
-    # Prepare summary statistics file
-    summary_csv = f"corpus_summary_{timestamp}.csv"
-    with open(summary_csv, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "File",
-            "Total Sentences",
-            "Total Inversions",
-            "Inversion Rate",
-            "Quotative Count",
-            "Non-Quotative Count",
-            "Scene-setting Count",
-            "Discourse structuring Count",
-            "Evaluative Count",
-            "Comparative Count",
-            "Given->New Count",
-            "Other Info Structure Count",
-            "PP (Locative) Count",
-            "PP (Non-locative) Count",
-            "AdvP (Locative) Count",
-            "AdvP (Non-locative) Count",
-            "AdjP (Locative) Count",
-            "AdjP (Non-locative) Count",
-            "VP (Locative) Count",
-            "VP (Non-locative) Count",
-            "Other (Locative) Count",
-            "Other (Non-locative) Count"
-        ])
+    return rows, counts
+
+def summary_row(file_name, counts):
+    """Build a file's row for the summary file."""
+    inversion_rate = (counts["inversions"] / counts["sentences"] * 100) if counts["sentences"] > 0 else 0
+    row = [
+        file_name,
+        counts["sentences"],
+        counts["inversions"],
+        f"{inversion_rate:.2f}%",
+        counts["quotative"],
+        counts["inversions"] - counts["quotative"],
+    ]
+    row += [counts["functions"][function] for function in SUMMARY_FUNCTIONS]
+    row += [counts["info_structure"]["Given->New"], counts["info_structure"]["Other"]]
+    for phrase_type in SUMMARY_PHRASE_TYPES:
+        row += [counts["types"][f"{phrase_type} (Locative)"], counts["types"][f"{phrase_type} (Non-locative)"]]
+    return row
+
+def load_checkpoint(output_dir):
+    """Return the checkpoint of an interrupted run in output_dir, or None."""
+    checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILE)
+    if not os.path.exists(checkpoint_path):
+        return None
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read checkpoint: {e}")
+        return None
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        return None
+    return checkpoint
+
+class ResultWriter:
+    """
+    Writes the inversions and summary files of a run.
     
-    # Corpus-wide statistics
-    total_corpus_sentences = 0
-    total_corpus_inversions = 0
-    corpus_inversion_types = defaultdict(int)
-    corpus_quotative_count = 0
-    corpus_function_types = defaultdict(int)
-    corpus_info_structure = {"Given->New": 0, "Other": 0}
-    
-    # Process each file
-    for file_path in file_paths:
-        file_name = os.path.basename(file_path)
-        print(f"\nAnalyzing {file_name}...")
-        
-        # Load the file
-        text = load_single_file(file_path)
-        if text is None:
-            continue
+    Both CSVs stay open for the whole run and rows are written in batches.
+    With columnar=True the inversion rows are also written as a Parquet
+    dataset (a directory of part files of part_rows rows, the last one
+    smaller) with the same columns; this needs pyarrow. checkpoint() flushes
+    and fsyncs everything written so far and records the file sizes, so a
+    resumed run can cut off rows written after the last checkpoint and
+    append from there. Rows not yet in a Parquet part are only durable in
+    the CSV; a resumed run reads them back from it.
+    """
+    
+    def __init__(self, output_dir, timestamp, columnar=False, buffer_rows=5000, part_rows=100000,
+                 checkpoint=None):
+        """Open the output files, or reopen them at the checkpoint's offsets when resuming."""
+        self.output_dir = output_dir
+        self.buffer_rows = buffer_rows
+        self.part_rows = part_rows
+        self.main_csv = os.path.join(output_dir, f"corpus_inversions_{timestamp}.csv")
+        self.summary_csv = os.path.join(output_dir, f"corpus_summary_{timestamp}.csv")
+        self.parquet_dir = None
+        self.parquet_parts = 0
+        # Inversion rows stored in Parquet parts so far
+        self.parquet_rows = 0
+        self.main_rows = []
+        self.summary_rows = []
+        self.columnar_rows = []
         
-        # Extract and parse sentences
-        print("  Extracting sentences...")
-        start_time = time.time()
-        sentences = extract_sentences(text, max_sentences_per_file)
-        print(f"  Found {len(sentences)} sentences. Extraction took {time.time() - start_time:.2f} seconds.")
+        if columnar:
+            if importlib.util.find_spec("pyarrow"):
+                self.parquet_dir = os.path.join(output_dir, f"corpus_inversions_{timestamp}.parquet")
+            else:
+                print("pyarrow is not installed; skipping the Parquet output.")
         
-        # Track this file's statistics
-        total_sentences = len(sentences)
-        total_corpus_sentences += total_sentences
+        offsets = checkpoint["offsets"] if checkpoint else {}
+        self.main_file = self._open(self.main_csv, offsets.get("main"))
+        self.summary_file = self._open(self.summary_csv, offsets.get("summary"))
+        self.main_writer = csv.writer(self.main_file)
+        self.summary_writer = csv.writer(self.summary_file)
         
-        # Process sentences in small batches to avoid memory issues
-        print("  Processing sentences with spaCy...")
-        batch_size = 50
-        file_inversions = []
+        if checkpoint:
+            self.parquet_parts = checkpoint.get("parquet_parts", 0)
+            self.parquet_rows = checkpoint.get("parquet_rows", 0)
+            self._remove_parts_after(self.parquet_parts)
+            if self.parquet_dir:
+                self.columnar_rows = self._rows_after(self.main_csv, self.parquet_rows)
+        else:
+            self.main_writer.writerow(INVERSION_COLUMNS)
+            self.summary_writer.writerow(SUMMARY_COLUMNS)
+            self._remove_parts_after(0)
+    
+    def _open(self, path, offset=None):
+        """Open a CSV for writing, or truncate it to offset and append to it when resuming."""
+        if offset is None:
+            return open(path, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+        with open(path, 'r+b') as f:
+            f.truncate(offset)
+        return open(path, 'a', newline='', encoding='utf-8', buffering=1 << 20)
+    
+    def _part_path(self, index):
+        return os.path.join(self.parquet_dir, f"part-{index:05d}.parquet")
+    
+    def _rows_after(self, path, count):
+        """Read back the inversion rows of a CSV after its first count rows."""
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return [row for i, row in enumerate(reader) if i >= count]
+    
+    def _remove_parts_after(self, count):
+        """Delete Parquet parts written after the last checkpoint."""
+        if not self.parquet_dir:
+            return
+        os.makedirs(self.parquet_dir, exist_ok=True)
+        for part_path in glob.glob(os.path.join(self.parquet_dir, "part-*.parquet")):
+            if int(os.path.basename(part_path)[5:10]) >= count:
+                os.remove(part_path)
+    
+    def write_inversions(self, rows):
+        """Queue rows for the inversions file."""
+        self.main_rows.extend(rows)
+        if self.parquet_dir:
+            self.columnar_rows.extend(rows)
+            if len(self.columnar_rows) >= self.part_rows:
+                self._write_part()
+        if len(self.main_rows) >= self.buffer_rows:
+            self._flush_rows()
+    
+    def write_summary(self, row):
+        """Queue a row for the summary file."""
+        self.summary_rows.append(row)
+    
+    def _flush_rows(self):
+        """Write the queued CSV rows."""
+        self.main_writer.writerows(self.main_rows)
+        self.summary_writer.writerows(self.summary_rows)
+        self.main_rows = []
+        self.summary_rows = []
+    
+    def _write_part(self):
+        """Write the queued columnar rows as the next Parquet part."""
+        if not self.columnar_rows:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
         
-        # Use tqdm for a progress bar
-        num_batches = (len(sentences) + batch_size - 1) // batch_size
-        for i in tqdm(range(0, len(sentences), batch_size), total=num_batches):
-            batch = sentences[i:i+batch_size]
-            
-            # Process each sentence separately to avoid context issues
-            for sent in batch:
-                # Skip sentences that are too long (to avoid memory issues)
-                if len(sent.text) > nlp.max_length:
-                    continue
-                    
-                try:
-                    doc = nlp(sent.text)
-                    inversions = identify_inversions(doc)
-                    file_inversions.extend(inversions)
-                except Exception as e:
-                    # Skip problematic sentences
-                    continue
+        columns = list(zip(*self.columnar_rows))
+        table = pa.table({name: pa.array(column, type=pa.string())
+                          for name, column in zip(INVERSION_COLUMNS, columns)})
+        with open(self._part_path(self.parquet_parts), 'wb') as f:
+            pq.write_table(table, f)
+            f.flush()
+            os.fsync(f.fileno())
+        self.parquet_parts += 1
+        self.parquet_rows += len(self.columnar_rows)
+        self.columnar_rows = []
+    
+    def checkpoint(self, state):
+        """Make all rows written so far durable and save state with the file offsets."""
+        # Parquet parts are only written once they are full, so checkpoints do not
+        # leave one small part per file; the CSV holds the rows until then
+        self._flush_rows()
+        offsets = {}
+        for name, f in [("main", self.main_file), ("summary", self.summary_file)]:
+            f.flush()
+            os.fsync(f.fileno())
+            offsets[name] = os.fstat(f.fileno()).st_size
         
+        checkpoint = dict(state, version=CHECKPOINT_VERSION, offsets=offsets,
+                          parquet_parts=self.parquet_parts, parquet_rows=self.parquet_rows)
+        checkpoint_path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        # Write to a temporary file first so an interrupted checkpoint keeps the previous one
+        temp_path = checkpoint_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, checkpoint_path)
+    
+    def close(self):
+        """Write the remaining rows, close the files and remove the checkpoint."""
+        self._flush_rows()
+        self._write_part()
+        self.main_file.close()
+        self.summary_file.close()
+        checkpoint_path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+def analyze_corpus(max_sentences_per_file=None, batch_size=None, n_process=1, cache_dir=PARSE_CACHE_DIR,
+                   mode="full", audit_sample=0, seed=42, corpus_dir='.', output_dir='.', profile=None,
+                   columnar=False, checkpoint_every=1, resume=False):
+    """
+    Analyze all text files in corpus_dir for subject-verb inversions and
+    write the results to output_dir.
+    
+    mode "full" parses every sentence (parses are cached in cache_dir);
+    mode "cascade" only parses sentences that pass the lexical prefilter,
+    and audit_sample > 0 estimates its recall from a seeded random sample
+    of rejected sentences. batch_size and n_process are passed to nlp.pipe.
+    
+    A checkpoint is written every checkpoint_every files; with resume=True
+    an interrupted run with the same settings continues from its last
+    checkpoint. columnar=True also writes the inversions as Parquet.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Get all text files
+    file_paths = load_text_files(corpus_dir)
+    print(f"Found {len(file_paths)} text files.")
+    get_nlp(profile)
+    
+    settings = {
+        "corpus_dir": os.path.abspath(corpus_dir),
+        "max_sentences": max_sentences_per_file,
+        "mode": mode,
+        "profile": nlp_profile,
+        "columnar": columnar,
+    }
+    checkpoint = load_checkpoint(output_dir) if resume else None
+    if checkpoint and checkpoint["settings"] != settings:
+        print("The checkpoint was written with different settings; starting a new run.")
+        checkpoint = None
+    
+    # Corpus-wide statistics
+    corpus_counts = new_counts()
+    files_done = []
+    if checkpoint:
+        # Reuse the interrupted run's output files
+        timestamp = checkpoint["timestamp"]
+        files_done = checkpoint["files_done"]
+        add_counts(corpus_counts, checkpoint["counts"])
+        print(f"Resuming from checkpoint: {len(files_done)} files already analyzed.")
+        if audit_sample:
+            print("  The recall audit only covers the files analyzed in this run.")
+    else:
+        # Create timestamp for output files
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    done = set(files_done)
+    remaining = [file_path for file_path in file_paths if os.path.basename(file_path) not in done]
+    
+    writer = ResultWriter(output_dir, timestamp, columnar, checkpoint=checkpoint)
+    
+    # Parse all files in one stream; results arrive file by file
+    audit = None
+    if mode == "cascade":
+        # Sentences are much smaller than chunks, so batch more of them
+        batch_size = batch_size or 256
+        if audit_sample:
+            audit = new_audit(audit_sample, seed)
+        print(f"Cascade mode: parsing prefiltered sentences with batch_size={batch_size}, n_process={n_process}...")
+        parsed_files = iter_cascade_files(remaining, max_sentences_per_file, batch_size, n_process, audit)
+    else:
+        batch_size = batch_size or 4
+        print(f"Parsing with batch_size={batch_size}, n_process={n_process}...")
+        parsed_files = iter_parsed_files(remaining, max_sentences_per_file, batch_size, n_process, cache_dir)
+    start_time = time.time()
+    for file_name, total_sentences, file_inversions in tqdm(parsed_files, total=len(remaining)):
+        print(f"\nAnalyzed {file_name} in {time.time() - start_time:.2f} seconds.")
+        print(f"  Found {total_sentences} sentences.")
         print(f"  Found {len(file_inversions)} subject-verb inversions.")
-        total_corpus_inversions += len(file_inversions)
         
-        # Analyze each inversion
-        file_inversion_types = defaultdict(int)
-        file_quotative_count = 0
-        file_function_types = defaultdict(int)
-        file_info_structure = {"Given->New": 0, "Other": 0}
+        rows, counts = analyze_file_inversions(file_name, total_sentences, file_inversions)
+        writer.write_inversions(rows)
+        writer.write_summary(summary_row(file_name, counts))
+        add_counts(corpus_counts, counts)
+        files_done.append(file_name)
         
-        # Add to CSV
-        with open(main_csv, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            for inversion in file_inversions:
-                # Analyze discourse function
-                discourse_function = classify_inversion_function(inversion)
-                file_function_types[discourse_function] += 1
-                corpus_function_types[discourse_function] += 1
-                
-                # Count quotative inversions
-                if inversion["quotative"]:
-                    file_quotative_count += 1
-                    corpus_quotative_count += 1
-                
-                # Analyze information structure
-                info_structure = analyze_information_structure(inversion)
-                info_structure_text = "Given->New" if info_structure["canonical_structure"] else "Other"
-                
-                if info_structure["canonical_structure"]:
-                    file_info_structure["Given->New"] += 1
-                    corpus_info_structure["Given->New"] += 1
-                else:
-                    file_info_structure["Other"] += 1
-                    corpus_info_structure["Other"] += 1
-                
-                # Count primary fronted element type for each inversion
-                if inversion["fronted_elements"]:
-                    main_fe = max(inversion["fronted_elements"], key=lambda x: len(x["text"]))
-                    inv_type = f"{main_fe['type']} ({'Locative' if main_fe['locative'] else 'Non-locative'})"
-                    file_inversion_types[inv_type] += 1
-                    corpus_inversion_types[inv_type] += 1
-                
-                # For each fronted element in the inversion (for detailed CSV)
-                for fe in inversion["fronted_elements"]:
-                    # Write to CSV
-                    writer.writerow([
-                        file_name,
-                        inversion["sentence"],
-                        fe["text"],
-                        fe["type"],
-                        "Locative" if fe["locative"] else "Non-locative",
-                        inversion["verb"],
-                        inversion["subject"],
-                        "Yes" if inversion["quotative"] else "No",
-                        discourse_function,
-                        info_structure_text
-                    ])
+        if len(files_done) % checkpoint_every == 0:
+            writer.checkpoint({"timestamp": timestamp, "settings": settings,
+                               "files_done": files_done, "counts": corpus_counts})
         
-        # Calculate file inversion rate
-        inversion_rate = (len(file_inversions) / total_sentences * 100) if total_sentences > 0 else 0
+        start_time = time.time()
         
         # Print file summary
+        inversion_rate = (counts["inversions"] / total_sentences * 100) if total_sentences > 0 else 0
         print(f"  Inversion rate: {inversion_rate:.2f}%")
         print("  Inversion types:")
-        for inv_type, count in sorted(file_inversion_types.items(), key=lambda x: x[1], reverse=True):
+        for inv_type, count in sorted(counts["types"].items(), key=lambda x: x[1], reverse=True):
             print(f"    {inv_type}: {count} ({count/len(file_inversions)*100:.1f}%)")
-        
-        # Write to summary CSV
-        with open(summary_csv, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Count each type
-            pp_loc = file_inversion_types.get("PP (Locative)", 0)
-            pp_non_loc = file_inversion_types.get("PP (Non-locative)", 0)
-            advp_loc = file_inversion_types.get("AdvP (Locative)", 0)
-            advp_non_loc = file_inversion_types.get("AdvP (Non-locative)", 0)
-            adjp_loc = file_inversion_types.get("AdjP (Locative)", 0)
-            adjp_non_loc = file_inversion_types.get("AdjP (Non-locative)", 0)
-            vp_loc = file_inversion_types.get("VP (Locative)", 0)
-            vp_non_loc = file_inversion_types.get("VP (Non-locative)", 0)
-            other_loc = file_inversion_types.get("Other (Locative)", 0)
-            other_non_loc = file_inversion_types.get("Other (Non-locative)", 0)
-            
-            writer.writerow([
-                file_name,
-                total_sentences,
-                len(file_inversions),
-                f"{inversion_rate:.2f}%",
-                file_quotative_count,
-                len(file_inversions) - file_quotative_count,
-                file_function_types.get("Scene-setting", 0),
-                file_function_types.get("Discourse structuring", 0),
-                file_function_types.get("Evaluative", 0),
-                file_function_types.get("Comparative", 0),
-                file_info_structure["Given->New"],
-                file_info_structure["Other"],
-                pp_loc,
-                pp_non_loc,
-                advp_loc,
-                advp_non_loc,
-                adjp_loc,
-                adjp_non_loc,
-                vp_loc,
-                vp_non_loc,
-                other_loc,
-                other_non_loc
-            ])
+    
+    writer.close()
     
     # Calculate overall corpus inversion rate
+    total_corpus_sentences = corpus_counts["sentences"]
+    total_corpus_inversions = corpus_counts["inversions"]
+    corpus_quotative_count = corpus_counts["quotative"]
     corpus_inversion_rate = (total_corpus_inversions / total_corpus_sentences * 100) if total_corpus_sentences > 0 else 0
     
     # Print corpus summary
@@ -565,7 +1258,7 @@ def analyze_corpus(max_sentences_per_file=None):
     print(f"Overall inversion rate: {corpus_inversion_rate:.2f}%")
     
     print("\nInversion Types Distribution:")
-    for inv_type, count in sorted(corpus_inversion_types.items(), key=lambda x: x[1], reverse=True):
+    for inv_type, count in sorted(corpus_counts["types"].items(), key=lambda x: x[1], reverse=True):
         print(f"  {inv_type}: {count} ({count/total_corpus_inversions*100:.1f}%)")
     
     print("\nQuotative vs. Non-Quotative:")
@@ -573,26 +1266,234 @@ def analyze_corpus(max_sentences_per_file=None):
     print(f"  Non-Quotative: {total_corpus_inversions - corpus_quotative_count} ({(total_corpus_inversions - corpus_quotative_count)/total_corpus_inversions*100:.1f}%)")
     
     print("\nDiscourse Function Distribution:")
-    for func, count in sorted(corpus_function_types.items(), key=lambda x: x[1], reverse=True):
+    for func, count in sorted(corpus_counts["functions"].items(), key=lambda x: x[1], reverse=True):
         print(f"  {func}: {count} ({count/total_corpus_inversions*100:.1f}%)")
     
     print("\nInformation Structure Distribution:")
-    for structure, count in corpus_info_structure.items():
+    for structure in ["Given->New", "Other"]:
+        count = corpus_counts["info_structure"][structure]
         print(f"  {structure}: {count} ({count/total_corpus_inversions*100:.1f}%)")
     
-    print(f"\nDetailed results have been saved to {main_csv}")
-    print(f"Summary statistics have been saved to {summary_csv}")
+    print(f"\nDetailed results have been saved to {writer.main_csv}")
+    if writer.parquet_dir:
+        print(f"Columnar results have been saved to {writer.parquet_dir}")
+    print(f"Summary statistics have been saved to {writer.summary_csv}")
+    
+    if audit is not None:
+        run_recall_audit(audit, timestamp, batch_size, n_process, output_dir)
 
-if __name__ == "__main__":
-    max_sentences_input = input("Enter maximum number of sentences to analyze per file (leave blank for all): ")
+def wilson_interval(hits, n, z=1.96):
+    """Return the Wilson score interval for a proportion of hits out of n."""
+    if n == 0:
+        return 0.0, 1.0
+    p = hits / n
+    centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+    margin = z * ((p * (1 - p) + z * z / (4 * n)) / n) ** 0.5 / (1 + z * z / n)
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+def run_recall_audit(audit, timestamp, batch_size=256, n_process=1, output_dir='.'):
+    """
+    Parse the sample of sentences rejected by the prefilter and estimate how
+    many sentences with inversions the cascade misses. Missed inversions are
+    saved to cascade_audit_<timestamp>.csv.
+    """
+    sample = audit["sample"]
+    print("\n===== CASCADE RECALL AUDIT =====")
+    print(f"Rejected sentences: {audit['rejected']}, parsing a random sample of {len(sample)}...")
     
-    max_sentences = None
-    if max_sentences_input.strip():
-        try:
-            max_sentences = int(max_sentences_input)
-        except ValueError:
-            print("Invalid number. Will analyze all sentences.")
+    missed = []
+    missed_sentences = 0
+    for doc, file_name in get_nlp().pipe(sample, as_tuples=True, batch_size=batch_size, n_process=n_process):
+        inversions = []
+        for sent in doc.sents:
+            try:
+                inversions.extend(identify_sentence_inversions(sent))
+            except Exception as e:
+                continue
+        if inversions:
+            missed_sentences += 1
+            missed.extend((file_name, inversion) for inversion in inversions)
+    
+    # Scale the sample miss rate up to all rejected sentences
+    low, high = wilson_interval(missed_sentences, len(sample))
+    miss_rate = missed_sentences / len(sample) if sample else 0
+    estimated_missed = miss_rate * audit["rejected"]
+    missed_low, missed_high = low * audit["rejected"], high * audit["rejected"]
+    found = audit["candidate_hits"]
+    
+    print(f"Sample sentences with inversions: {missed_sentences} ({miss_rate*100:.2f}%, 95% CI {low*100:.2f}-{high*100:.2f}%)")
+    print(f"Estimated missed sentences with inversions: {estimated_missed:.0f} (95% CI {missed_low:.0f}-{missed_high:.0f})")
+    print(f"Candidate sentences with inversions: {found}")
+    if found > 0:
+        recall = found / (found + estimated_missed)
+        recall_low, recall_high = found / (found + missed_high), found / (found + missed_low)
+        print(f"Estimated prefilter recall: {recall*100:.1f}% (95% CI {recall_low*100:.1f}-{recall_high*100:.1f}%)")
+    
+    audit_csv = os.path.join(output_dir, f"cascade_audit_{timestamp}.csv")
+    with open(audit_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["File", "Sentence", "Fronted Element", "Verb", "Subject", "Quotative"])
+        for file_name, inversion in missed:
+            for fe in inversion["fronted_elements"]:
+                writer.writerow([
+                    file_name,
+                    inversion["sentence"],
+                    fe["text"],
+                    inversion["verb"],
+                    inversion["subject"],
+                    "Yes" if inversion["quotative"] else "No"
+                ])
+    print(f"Missed inversions from the sample have been saved to {audit_csv}")
+
+def current_rss_mb():
+    """Return the resident memory of this process in MB (Linux only, else None)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def peak_rss_mb():
+    """Return the peak resident memory of this process in MB, if available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def load_benchmark_docs(file_paths, n_docs=500):
+    """Collect up to n_docs cleaned paragraphs from the corpus as benchmark input."""
+    # Paragraphs are delimited by <p> markers, @@ document ids or line breaks
+    docs = []
+    for file_path in file_paths:
+        text = load_single_file(file_path)
+        if text is None:
+            continue
+        for paragraph in re.split(r'<p>|@@\d+|\n', text):
+            paragraph = preprocess_text(clean_text(paragraph)).strip()
+            if paragraph:
+                docs.append(paragraph)
+                if len(docs) >= n_docs:
+                    return docs
+    return docs
+
+def run_profile_benchmark(profile, docs, batch_size, results):
+    """Load one profile and parse the benchmark docs (runs in a child process)."""
+    rss_start = current_rss_mb()
+    
+    start_time = time.time()
+    pipeline = load_pipeline(profile)
+    load_time = time.time() - start_time
+    
+    start_time = time.time()
+    tokens = 0
+    sentences = 0
+    for doc in pipeline.pipe(docs, batch_size=batch_size):
+        tokens += len(doc)
+        sentences += sum(1 for _ in doc.sents)
+    parse_time = time.time() - start_time
+    
+    peak = peak_rss_mb()
+    results.put({
+        "profile": profile,
+        "components": ", ".join(pipeline.pipe_names),
+        "load_seconds": load_time,
+        "docs_per_second": len(docs) / parse_time if parse_time > 0 else 0,
+        "tokens_per_second": tokens / parse_time if parse_time > 0 else 0,
+        "sentences": sentences,
+        # Memory added by loading and running the profile
+        "peak_memory_mb": peak - rss_start if peak is not None and rss_start is not None else None,
+    })
+
+def benchmark_profiles(profiles=None, n_docs=500, batch_size=50, corpus_dir='.', output_dir='.'):
+    """
+    Benchmark docs/second and memory for each pipeline profile.
+    Every profile runs in a fresh forked process, so peak memory is not
+    inflated by profiles measured earlier.
+    """
+    profiles = profiles or list(PIPELINE_PROFILES)
+    docs = load_benchmark_docs(load_text_files(corpus_dir), n_docs)
+    print(f"Benchmarking {len(profiles)} profiles on {len(docs)} paragraphs...")
+    
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    
+    results = []
+    for profile in profiles:
+        queue = context.Queue()
+        worker = context.Process(target=run_profile_benchmark, args=(profile, docs, batch_size, queue))
+        worker.start()
+        worker.join()
+        if worker.exitcode != 0:
+            print(f"  Benchmark of the {profile} profile failed.")
+            continue
+        results.append(queue.get())
+    
+    if not results:
+        return results
+    
+    print(f"\n{'Profile':<10}{'Docs/s':>10}{'Tokens/s':>12}{'Load (s)':>10}{'Peak MB':>10}  Components")
+    for r in results:
+        memory = f"{r['peak_memory_mb']:.1f}" if r["peak_memory_mb"] is not None else "n/a"
+        print(f"{r['profile']:<10}{r['docs_per_second']:>10.1f}{r['tokens_per_second']:>12.0f}"
+              f"{r['load_seconds']:>10.2f}{memory:>10}  {r['components']}")
+    
+    os.makedirs(output_dir, exist_ok=True)
+    benchmark_csv = os.path.join(output_dir, f"pipeline_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    with open(benchmark_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"\nBenchmark results have been saved to {benchmark_csv}")
+    return results
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Find subject-verb inversions in a corpus using a spaCy dependency parse.")
+    parser.add_argument("--corpus-dir", default=".", help="Directory with the corpus .txt files (default: current directory)")
+    parser.add_argument("--output-dir", default=".", help="Directory for the result CSVs (default: current directory)")
+    parser.add_argument("--max-sentences", type=int, default=None,
+                        help="Maximum number of sentences to analyze per file (default: all)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of parser processes (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="nlp.pipe batch size (default: 4 chunks, or 256 sentences in cascade mode)")
+    parser.add_argument("--profile", choices=[p for p in PIPELINE_PROFILES if p != "segment"], default=DEFAULT_PROFILE,
+                        help=f"spaCy pipeline profile (default: {DEFAULT_PROFILE})")
+    parser.add_argument("--mode", choices=["full", "cascade"], default="full",
+                        help="Parse every sentence, or only sentences passing the lexical prefilter")
+    parser.add_argument("--audit-sample", type=int, default=0,
+                        help="Cascade mode: number of rejected sentences to parse for the recall audit")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the recall audit sample")
+    parser.add_argument("--cache-dir", default=None,
+                        help=f"Directory for cached parses (default: <output-dir>/{PARSE_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write cached parses")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Also write the inversions as a Parquet dataset (requires pyarrow)")
+    parser.add_argument("--checkpoint-every", type=int, default=1,
+                        help="Number of files between checkpoints (default: 1)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from the checkpoint in the output directory")
+    parser.add_argument("--benchmark-profiles", action="store_true",
+                        help="Benchmark speed and memory of each pipeline profile instead of analyzing")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    if args.benchmark_profiles:
+        benchmark_profiles(corpus_dir=args.corpus_dir, output_dir=args.output_dir)
+        return
+    
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or os.path.join(args.output_dir, PARSE_CACHE_DIR)
     
     start_time = time.time()
-    analyze_corpus(max_sentences)
-    print(f"\nTotal analysis time: {(time.time() - start_time) / 60:.2f} minutes")
\ No newline at end of file
+    analyze_corpus(args.max_sentences, args.batch_size, max(1, args.workers), cache_dir,
+                   args.mode, args.audit_sample, args.seed, args.corpus_dir, args.output_dir, args.profile,
+                   columnar=args.parquet, checkpoint_every=max(1, args.checkpoint_every), resume=args.resume)
+    print(f"\nTotal analysis time: {(time.time() - start_time) / 60:.2f} minutes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import os
+import sys
+import csv
+import json
+import argparse
+from itertools import islice
+
+SECTIONS = ["overview", "confidence", "types", "constituents", "locative", "heavy-hitters", "examples", "complex"]
+
+def load_summary(results_dir="inversion_results"):
+    """Load the (small) summary JSON written by the inversion finder."""
+    summary_file = os.path.join(results_dir, "inversion_analysis_summary.json")
+    with open(summary_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def iter_examples(csv_path):
+    """
+    Lazily yield example rows from an examples CSV.
+    Rows are streamed from disk one at a time, so paging never loads the whole file.
+    """
+    if not os.path.exists(csv_path):
+        return
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        # Files without results contain only a "No ... found" line
+        if not reader.fieldnames or "sentence" not in reader.fieldnames:
+            return
+        yield from reader
+
+def get_page(rows, page=1, per_page=25):
+    """
+    Return the rows of a 1-based page and whether a further page exists.
+    Only page * per_page + 1 rows are read from the iterator.
+    """
+    start = (page - 1) * per_page
+    selected = list(islice(rows, start, start + per_page + 1))
+    return selected[:per_page], len(selected) > per_page
+
+def format_share(count, total, precision=1, label=""):
+    """Format a count's share of a total the way the analysis report does."""
+    suffix = f" {label}" if label else ""
+    if total > 0:
+        return f"({count/total*100:.{precision}f}%{suffix})"
+    return f"(0%{suffix})"
+
+def sorted_counts(counts):
+    """Sort a count dictionary by frequency, keeping insertion order for ties."""
+    return sorted(counts.items(), key=lambda x: x[1], reverse=True)
+
+def render_overview(summary):
+    """Render the header with overall corpus and inversion counts."""
+    total_inv = summary["total_inversions"]
+    total_sent = summary["total_sentences"]
+    complex_count = summary.get("complex_inversions_count", 0)
+    
+    lines = [
+        "=== Subject-Verb Inversion Analysis Report ===",
+        "",
+        f"Files analyzed: {summary['total_files']}",
+        f"Total paragraphs: {summary['total_paragraphs']}",
+        f"Total sentences: {total_sent}",
+        f"Total inversions found: {total_inv} {format_share(total_inv, total_sent, 2, 'of sentences')}",
+        f"Complex inversions: {complex_count} {format_share(complex_count, total_inv, 2, 'of all inversions')}",
+    ]
+    return "\n".join(lines) + "\n"
+
+def render_counts(title, counts, total_inv, capitalize=False):
+    """Render a count section (confidence levels, inversion or constituent types)."""
+    lines = [f"\n=== {title} ==="]
+    for name, count in sorted_counts(counts):
+        label = name.capitalize() if capitalize else name
+        lines.append(f"{label}: {count} {format_share(count, total_inv)}")
+    return "\n".join(lines) + "\n"
+
+def render_locative(summary):
+    """Render the locative vs. non-locative counts."""
+    total_inv = summary["total_inversions"]
+    loc = summary["locative_inversions"]
+    non_loc = summary["non_locative_inversions"]
+    return (f"\nLocative inversions: {loc} {format_share(loc, total_inv)}\n"
+            f"Non-locative inversions: {non_loc} {format_share(non_loc, total_inv)}\n\n")
+
+def render_heavy_hitters(summary, limit=10):
+    """Render the approximate most frequent fronted constituents, subjects and verbs."""
+    heavy_hitters = summary.get("heavy_hitters", {})
+    if not heavy_hitters:
+        return "\n=== Most Frequent Items ===\nNot available in this summary\n"
+    lines = []
+    for name, sketch in heavy_hitters.items():
+        lines.append(f"\n=== Most Frequent {name.replace('_', ' ').title()} ===")
+        for entry in sketch["top"][:limit]:
+            bound = f" (+/- {entry['max_error']})" if entry["max_error"] else ""
+            lines.append(f"{entry['item']}: {entry['count']}{bound}")
+    return "\n".join(lines) + "\n"
+
+def render_example(number, inv):
+    """Render a single example row from an examples CSV."""
+    lines = [
+        f"\n{number}. {inv['sentence']}",
+        f"   File: {inv['file']}",
+        f"   Type: {inv['type']}",
+        f"   Constituent type: {inv['constituent_type']}",
+        f"   Fronted constituent: '{inv['fronted_constituent']}'",
+        f"   Verb: '{inv['verb']}'",
+        f"   Subject: '{inv['subject']}'",
+        f"   Locative: {'Yes' if inv['is_locative'] == 'True' else 'No'}",
+        f"   Confidence: {inv['confidence'].capitalize()}",
+    ]
+    # The finder writes the line for every inversion with validation reasons, even an empty list
+    if "validation_reasons_str" in inv:
+        lines.append(f"   Validation: {', '.join(inv['validation_reasons_str'].split('; '))}")
+    return "\n".join(lines) + "\n"
+
+def render_examples_page(csv_path, title, page=1, per_page=25, show_pager=False):
+    """Render one page of examples, streaming only the rows needed from disk."""
+    rows, has_more = get_page(iter_examples(csv_path), page, per_page)
+    start = (page - 1) * per_page
+    
+    output = f"{title}\n"
+    for i, inv in enumerate(rows):
+        output += render_example(start + i + 1, inv)
+    if not show_pager:
+        # The full report lists the examples exactly like the finder's report
+        return output
+    if not rows:
+        output += f"\nNo examples on page {page}\n"
+    elif has_more:
+        output += f"\n[Page {page}; more examples on page {page + 1}]\n"
+    return output
+
+def render_section(section, results_dir, page=1, per_page=None, show_pager=False):
+    """Render a single report section."""
+    out_base = os.path.join(results_dir, "inversion_analysis")
+    
+    if section == "examples":
+        return render_examples_page(f"{out_base}_examples.csv",
+                                    "=== Example inversions (high/medium confidence only) ===",
+                                    page, per_page or 25, show_pager)
+    if section == "complex":
+        return render_examples_page(f"{out_base}_complex_examples.csv",
+                                    "\n\n=== Complex Inversion Examples ===",
+                                    page, per_page or 15, show_pager)
+    
+    summary = load_summary(results_dir)
+    total_inv = summary["total_inversions"]
+    if section == "overview":
+        return render_overview(summary)
+    if section == "confidence":
+        return render_counts("Confidence Levels", summary["confidence_levels"], total_inv, capitalize=True)
+    if section == "types":
+        return render_counts("Inversion Types", summary["inversion_types"], total_inv)
+    if section == "constituents":
+        return render_counts("Constituent Types", summary["constituent_types"], total_inv)
+    if section == "locative":
+        return render_locative(summary)
+    if section == "heavy-hitters":
+        return render_heavy_hitters(summary)
+    raise ValueError(f"Unknown section: {section}")
+
+def generate_report(results_dir="inversion_results", sections=None, page=1, per_page=None):
+    """
+    Yield the requested report sections one at a time.
+    With the default sections and page sizes the output matches the
+    inversion_analysis_report.txt written by the finder.
+    """
+    show_pager = sections is not None
+    if sections is None:
+        sections = ["overview", "confidence", "types", "constituents", "locative", "examples", "complex"]
+    for section in sections:
+        yield render_section(section, results_dir, page, per_page, show_pager)
+
+def positive_int(value):
+    """Parse a command line integer that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Render inversion analysis report sections on demand.")
+    parser.add_argument("--results-dir", default="inversion_results", help="Directory with the finder's results")
+    parser.add_argument("--section", choices=SECTIONS + ["all"], default="all",
+                        help="Report section to render (default: all)")
+    parser.add_argument("--page", type=positive_int, default=1, help="Page of examples to render (1-based)")
+    parser.add_argument("--per-page", type=positive_int, default=None,
+                        help="Examples per page (default: 25 for examples, 15 for complex)")
+    parser.add_argument("--output", default=None, help="Write the report to a file instead of stdout")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    sections = None if args.section == "all" else [args.section]
+    
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for text in generate_report(args.results_dir, sections, args.page, args.per_page):
+            out.write(text)
+    finally:
+        if args.output:
+            out.close()
+            print(f"Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
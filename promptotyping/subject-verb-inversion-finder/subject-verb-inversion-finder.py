@@ -3,17 +3,219 @@ import re
 import glob
 import csv
 import json
-from collections import Counter, defaultdict
+import heapq
+import hashlib
+import argparse
+from collections import Counter, OrderedDict, defaultdict
 from pathlib import Path
 
+class SpaceSavingCounter:
+    """
+    Approximate frequency counter for unbounded vocabularies (Space-Saving algorithm).
+    Keeps at most `capacity` items in memory; every reported count overestimates
+    the true count by at most the item's recorded error.
+    """
+    
+    def __init__(self, capacity=1000):
+        """Initialize an empty sketch tracking at most `capacity` items."""
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        # Min-heap of (count, item) entries; stale entries are skipped lazily
+        self._heap = []
+    
+    def __len__(self):
+        return len(self.counts)
+    
+    def _pop_min(self):
+        """Remove and return the tracked item with the smallest count."""
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                del self.counts[item]
+                return item, count, self.errors.pop(item)
+    
+    def _compact_heap(self):
+        """Rebuild the heap once stale entries dominate it."""
+        if len(self._heap) > 4 * self.capacity + 64:
+            self._heap = [(count, item) for item, count in self.counts.items()]
+            heapq.heapify(self._heap)
+    
+    def add(self, item, count=1):
+        """Count `count` occurrences of `item`."""
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            # Replace the least frequent item, inheriting its count as error bound
+            _, min_count, _ = self._pop_min()
+            self.counts[item] = min_count + count
+            self.errors[item] = min_count
+        heapq.heappush(self._heap, (self.counts[item], item))
+        self._compact_heap()
+    
+    def update(self, items):
+        """Count every item of an iterable."""
+        for item in items:
+            self.add(item)
+    
+    def min_count(self):
+        """Smallest tracked count, the maximum count of any untracked item when full."""
+        if len(self.counts) < self.capacity or not self.counts:
+            return 0
+        return min(self.counts.values())
+    
+    def merge(self, other):
+        """Merge another sketch into this one, keeping the error guarantees."""
+        self_min = self.min_count()
+        other_min = other.min_count()
+        counts = {}
+        errors = {}
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = self.counts.get(item, self_min) + other.counts.get(item, other_min)
+            errors[item] = self.errors.get(item, self_min) + other.errors.get(item, other_min)
+        
+        kept = heapq.nlargest(self.capacity, counts, key=counts.get)
+        self.counts = {item: counts[item] for item in kept}
+        self.errors = {item: errors[item] for item in kept}
+        self.total += other.total
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+    
+    def most_common(self, n=None):
+        """Return the n most frequent items as (item, count, error) tuples."""
+        items = sorted(self.counts.items(), key=lambda x: x[1], reverse=True)
+        if n is not None:
+            items = items[:n]
+        return [(item, count, self.errors[item]) for item, count in items]
+    
+    def to_dict(self, n=50):
+        """Serializable summary of the top n items."""
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "top": [
+                {"item": item, "count": count, "max_error": error, "min_count": count - error}
+                for item, count, error in self.most_common(n)
+            ]
+        }
+
+class ExampleWriter:
+    """
+    Streams the inversions of sufficient confidence to the examples CSVs as files are analyzed.
+    Only the examples shown in the reports are kept in memory, so memory does not
+    grow with the number of inversions in the corpus.
+    """
+    
+    CONFIDENCE_LEVELS = {"high": 3, "medium": 2, "low": 1}
+    COMPLEX_TYPES = ["complex_pp_inversion", "coordinated_inversion", "numeric_inversion"]
+    
+    def __init__(self, out_base, min_confidence="medium", keep=25, keep_complex=15):
+        """Write to <out_base>_examples.csv and <out_base>_complex_examples.csv."""
+        self.examples_path = f"{out_base}_examples.csv"
+        self.complex_path = f"{out_base}_complex_examples.csv"
+        self.min_level = self.CONFIDENCE_LEVELS.get(min_confidence, 1)
+        self.keep = keep
+        self.keep_complex = keep_complex
+        # First examples of each kind, for the printed summary and the report
+        self.examples = []
+        self.complex_examples = []
+        self.total = 0
+        self.included = 0
+        self.complex_included = 0
+        self.closed = False
+        self._files = {}
+        self._writers = {}
+    
+    def _write(self, name, path, inversion, excluded):
+        """Write one row, opening the file with the first row's fields as header."""
+        if name not in self._writers:
+            fieldnames = [field for field in inversion.keys() if field not in excluded]
+            self._files[name] = open(path, 'w', newline='', encoding='utf-8')
+            self._writers[name] = csv.DictWriter(self._files[name], fieldnames=fieldnames)
+            self._writers[name].writeheader()
+        writer = self._writers[name]
+        writer.writerow({k: v for k, v in inversion.items() if k in writer.fieldnames})
+    
+    def add(self, inversions):
+        """Write the inversions of one file that pass the confidence filter."""
+        for inv in inversions:
+            self.total += 1
+            if self.CONFIDENCE_LEVELS.get(inv.get("confidence", "low"), 0) < self.min_level:
+                continue
+            self.included += 1
+            
+            # Ensure validation_reasons are properly serialized
+            if isinstance(inv.get("validation_reasons"), list):
+                inv["validation_reasons_str"] = "; ".join(inv["validation_reasons"])
+            
+            self._write("examples", self.examples_path, inv,
+                        ["previous_sentence", "next_sentence", "validation_reasons"])
+            if len(self.examples) < self.keep:
+                self.examples.append(inv)
+            
+            # Complex inversions also go to a separate CSV for focused analysis
+            if inv.get("type") in self.COMPLEX_TYPES:
+                self.complex_included += 1
+                self._write("complex", self.complex_path, inv, ["previous_sentence", "next_sentence"])
+                if len(self.complex_examples) < self.keep_complex:
+                    self.complex_examples.append(inv)
+    
+    def report_filtering(self):
+        """Log how many inversions passed the confidence filter."""
+        excluded = self.total - self.included
+        print(f"Filtering: including {self.included}/{self.total} inversions ({excluded} excluded)")
+    
+    def close(self):
+        """Close the CSVs, writing a note to those that received no rows."""
+        if self.closed:
+            return
+        self.closed = True
+        for f in self._files.values():
+            f.close()
+        if not self.included:
+            with open(self.examples_path, 'w', encoding='utf-8') as f:
+                f.write("No inversions found\n")
+        elif not self.complex_included:
+            with open(self.complex_path, 'w', encoding='utf-8') as f:
+                f.write("No complex inversions found\n")
+
 class EnhancedInversionFinder:
     """Enhanced class for finding subject-verb inversions in academic texts with improved complex inversion detection."""
     
-    def __init__(self, corpus_dir="data", output_dir="inversion_results"):
+    def __init__(self, corpus_dir="data", output_dir="inversion_results", heavy_hitter_capacity=1000,
+                 sentence_cache_size=10000, track_duplicates=False, duplicate_capacity=50000):
         """Initialize with directory paths and enhanced patterns."""
         self.corpus_dir = corpus_dir
         self.output_dir = output_dir
         
+        # Bounded LRU cache of match results keyed by sentence hash, so repeated
+        # boilerplate (headers, copyright lines, abstracts) is only matched once
+        self.sentence_cache_size = sentence_cache_size
+        self.sentence_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # Optional corpus-wide count of repeated sentences for the duplicate report,
+        # in a Space-Saving sketch so memory stays bounded like the sentence cache
+        self.track_duplicates = track_duplicates
+        self.sentence_occurrences = SpaceSavingCounter(duplicate_capacity)
+        # Text of the sentences tracked by the sketch
+        self.duplicate_sentences = {}
+        
+        # Memory bound for the approximate top-k counters of open-vocabulary fields
+        self.heavy_hitter_capacity = heavy_hitter_capacity
+        self.heavy_hitter_fields = {
+            "fronted_constituents": "fronted_constituent",
+            "subjects": "subject",
+            "verbs": "verb"
+        }
+        
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
@@ -387,16 +589,70 @@ class EnhancedInversionFinder:
         
         return inversion
     
+    def sentence_key(self, sentence):
+        """Compact hash of a sentence used as cache and duplicate-tracking key."""
+        return hashlib.blake2b(sentence.encode('utf-8'), digest_size=16).digest()
+    
+    def copy_inversion(self, inversion):
+        """Copy a cached inversion so callers can annotate it without touching the cache."""
+        inv_copy = dict(inversion)
+        inv_copy["validation_reasons"] = list(inversion["validation_reasons"])
+        return inv_copy
+    
+    def cache_stats(self):
+        """Hit-rate instrumentation for the sentence cache."""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "capacity": self.sentence_cache_size,
+            "size": len(self.sentence_cache),
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups > 0 else 0
+        }
+    
+    def record_occurrence(self, key, sentence):
+        """Count a sentence occurrence for the corpus-wide duplicate report."""
+        self.sentence_occurrences.add(key)
+        self.duplicate_sentences[key] = sentence
+        # Drop the text of sentences the sketch no longer tracks
+        if len(self.duplicate_sentences) > 2 * self.sentence_occurrences.capacity:
+            self.duplicate_sentences = {k: self.duplicate_sentences[k] for k in self.sentence_occurrences.counts}
+    
     def find_inversions_in_sentence(self, sentence):
         """
         Enhanced inversion finder with unified pattern processing to reduce code duplication.
-        Uses a more streamlined approach to check different inversion types.
+        Results for identical sentences are served from a bounded LRU cache.
         """
-        inversions = []
-        
         # Skip very short sentences, questions, and sentences with metadata markers
         if len(sentence) < 10 or sentence.endswith('?') or '<<' in sentence:
-            return inversions
+            return []
+        
+        key = self.sentence_key(sentence)
+        if self.track_duplicates:
+            self.record_occurrence(key, sentence)
+        
+        cached = self.sentence_cache.get(key)
+        if cached is not None:
+            self.sentence_cache.move_to_end(key)
+            self.cache_hits += 1
+            return [self.copy_inversion(inv) for inv in cached]
+        
+        self.cache_misses += 1
+        inversions = self.match_sentence(sentence)
+        
+        if self.sentence_cache_size > 0:
+            self.sentence_cache[key] = [self.copy_inversion(inv) for inv in inversions]
+            if len(self.sentence_cache) > self.sentence_cache_size:
+                self.sentence_cache.popitem(last=False)
+        
+        return inversions
+    
+    def match_sentence(self, sentence):
+        """
+        Match a sentence against the complex and then the standard patterns.
+        Uses a more streamlined approach to check different inversion types.
+        """
+        inversions = []
         
         # First check complex patterns (may capture more specific cases)
         for pattern_type in self.complex_patterns:
@@ -414,6 +670,28 @@ class EnhancedInversionFinder:
         
         return inversions
     
+    def new_file_stats(self):
+        """Create an empty per-file statistics dictionary."""
+        return {
+            "total_paragraphs": 0,
+            "total_sentences": 0,
+            "total_inversions": 0,
+            "constituent_types": Counter(),
+            "locative_inversions": 0,
+            "non_locative_inversions": 0,
+            "confidence_levels": Counter(),
+            "inversion_types": Counter(),
+            # Approximate top-k counters for fronted constituents, subjects and verbs
+            "heavy_hitters": {
+                name: SpaceSavingCounter(self.heavy_hitter_capacity)
+                for name in self.heavy_hitter_fields
+            }
+        }
+    
+    def normalize_key(self, text):
+        """Normalize case and whitespace so variants of a phrase are counted together."""
+        return " ".join(text.lower().split())
+    
     def analyze_file(self, file_path):
         """Analyze a single file for subject-verb inversions with improved error handling."""
         file_name = os.path.basename(file_path)
@@ -423,32 +701,15 @@ class EnhancedInversionFinder:
         content = self.read_file(file_path)
         if not content:
             print(f"Warning: Unable to read or empty file: {file_name}")
-            return {"file": file_name, "inversions": [], "stats": {
-                "total_paragraphs": 0,
-                "total_sentences": 0,
-                "total_inversions": 0,
-                "constituent_types": Counter(),
-                "locative_inversions": 0,
-                "non_locative_inversions": 0,
-                "confidence_levels": Counter(),
-                "inversion_types": Counter()
-            }}
+            return {"file": file_name, "inversions": [], "stats": self.new_file_stats()}
         
         # Extract paragraphs
         paragraphs = self.extract_paragraphs(content)
         
         # Initialize results for this file
         inversions = []
-        stats = {
-            "total_paragraphs": len(paragraphs),
-            "total_sentences": 0,
-            "total_inversions": 0,
-            "constituent_types": Counter(),
-            "locative_inversions": 0,
-            "non_locative_inversions": 0,
-            "confidence_levels": Counter(),
-            "inversion_types": Counter()
-        }
+        stats = self.new_file_stats()
+        stats["total_paragraphs"] = len(paragraphs)
         
         # Process each paragraph
         for para_idx, para in enumerate(paragraphs):
@@ -485,6 +746,10 @@ class EnhancedInversionFinder:
                     else:
                         stats["non_locative_inversions"] += 1
                     
+                    # Track open-vocabulary fields in bounded memory
+                    for name, field in self.heavy_hitter_fields.items():
+                        stats["heavy_hitters"][name].add(self.normalize_key(inv[field]))
+                    
                     # Add paragraph and sentence references
                     inv["paragraph_index"] = para_idx
                     inv["sentence_index"] = sent_idx
@@ -498,77 +763,96 @@ class EnhancedInversionFinder:
             "stats": stats
         }
     
-    def process_files(self, files=None, max_files=None):
-        """Process multiple files with improved error handling."""
+    def iter_file_results(self, files=None, max_files=None):
+        """Analyze files one at a time, yielding each file's result with improved error handling."""
         if files is None:
             files = self.load_corpus_files()
         
         if max_files:
             files = files[:max_files]
         
-        results = []
-        
         for i, file_path in enumerate(files):
             print(f"Processing file {i+1}/{len(files)}")
             try:
-                results.append(self.analyze_file(file_path))
+                yield self.analyze_file(file_path)
             except Exception as e:
                 print(f"Error processing file {file_path}: {e}")
                 # Create an empty result to maintain file count
-                results.append({
+                yield {
                     "file": os.path.basename(file_path),
                     "inversions": [],
-                    "stats": {
-                        "total_paragraphs": 0,
-                        "total_sentences": 0,
-                        "total_inversions": 0,
-                        "constituent_types": Counter(),
-                        "locative_inversions": 0,
-                        "non_locative_inversions": 0,
-                        "confidence_levels": Counter(),
-                        "inversion_types": Counter()
-                    }
-                })
-        
-        return results
+                    "stats": self.new_file_stats()
+                }
     
-    def aggregate_results(self, results):
-        """Aggregate results from multiple files."""
-        aggregate = {
-            "total_files": len(results),
-            "total_paragraphs": sum(r["stats"]["total_paragraphs"] for r in results),
-            "total_sentences": sum(r["stats"]["total_sentences"] for r in results),
-            "total_inversions": sum(r["stats"]["total_inversions"] for r in results),
+    def process_files(self, files=None, max_files=None):
+        """Process multiple files, keeping every file's result (use analyze_corpus for large corpora)."""
+        return list(self.iter_file_results(files, max_files))
+    
+    def analyze_corpus(self, files=None, max_files=None, examples=None):
+        """
+        Analyze files and aggregate their statistics as they are processed.
+        Each file's inversions are handed to `examples` (an ExampleWriter) and then
+        dropped, so memory stays bounded however large the corpus is.
+        """
+        aggregate = self.new_aggregate()
+        for result in self.iter_file_results(files, max_files):
+            self.add_to_aggregate(aggregate, result)
+            if examples is not None:
+                examples.add(result["inversions"])
+        return aggregate
+    
+    def new_aggregate(self):
+        """Create empty corpus-wide statistics."""
+        return {
+            "total_files": 0,
+            "total_paragraphs": 0,
+            "total_sentences": 0,
+            "total_inversions": 0,
             "constituent_types": Counter(),
-            "locative_inversions": sum(r["stats"]["locative_inversions"] for r in results),
-            "non_locative_inversions": sum(r["stats"]["non_locative_inversions"] for r in results),
+            "locative_inversions": 0,
+            "non_locative_inversions": 0,
             "confidence_levels": Counter(),
             "inversion_types": Counter(),
-            "inversions_by_file": {r["file"]: r["stats"]["total_inversions"] for r in results},
+            "inversions_by_file": {},
             "complex_inversions_count": 0,
-            "all_inversions": []
+            "heavy_hitters": {
+                name: SpaceSavingCounter(self.heavy_hitter_capacity)
+                for name in self.heavy_hitter_fields
+            }
         }
-        
-        # Combine counters from individual files
-        for r in results:
-            for const_type, count in r["stats"]["constituent_types"].items():
-                aggregate["constituent_types"][const_type] += count
+    
+    def add_to_aggregate(self, aggregate, result):
+        """Add the statistics of one file's result to the corpus-wide statistics."""
+        stats = result["stats"]
+        aggregate["total_files"] += 1
+        for key in ["total_paragraphs", "total_sentences", "total_inversions",
+                    "locative_inversions", "non_locative_inversions"]:
+            aggregate[key] += stats[key]
+        aggregate["inversions_by_file"][result["file"]] = stats["total_inversions"]
+        
+        for const_type, count in stats["constituent_types"].items():
+            aggregate["constituent_types"][const_type] += count
+        
+        # Combine confidence levels
+        for level, count in stats.get("confidence_levels", {}).items():
+            aggregate["confidence_levels"][level] += count
             
-            # Combine confidence levels
-            for level, count in r["stats"].get("confidence_levels", {}).items():
-                aggregate["confidence_levels"][level] += count
-                
-            # Combine inversion types
-            for inv_type, count in r["stats"].get("inversion_types", {}).items():
-                aggregate["inversion_types"][inv_type] += count
-                # Count complex inversions specifically
-                if inv_type in ["complex_pp_inversion", "coordinated_inversion", "numeric_inversion"]:
-                    aggregate["complex_inversions_count"] += count
-        
-        # Collect all inversions
+        # Combine inversion types
+        for inv_type, count in stats.get("inversion_types", {}).items():
+            aggregate["inversion_types"][inv_type] += count
+            # Count complex inversions specifically
+            if inv_type in ExampleWriter.COMPLEX_TYPES:
+                aggregate["complex_inversions_count"] += count
+        
+        # Merge the approximate top-k counters
+        for name, sketch in stats.get("heavy_hitters", {}).items():
+            aggregate["heavy_hitters"][name].merge(sketch)
+    
+    def aggregate_results(self, results):
+        """Aggregate the statistics of results from multiple files."""
+        aggregate = self.new_aggregate()
         for r in results:
-            aggregate["all_inversions"].extend(r["inversions"])
-        
+            self.add_to_aggregate(aggregate, r)
         return aggregate
     
     def filter_by_confidence(self, all_inversions, min_confidence="low"):
@@ -586,8 +870,15 @@ class EnhancedInversionFinder:
         
         return filtered
     
-    def save_results(self, aggregate_results):
-        """Save results to various output formats with enhanced details."""
+    def example_writer(self, min_confidence="medium"):
+        """Create the ExampleWriter for this finder's output directory."""
+        return ExampleWriter(os.path.join(self.output_dir, "inversion_analysis"), min_confidence)
+    
+    def save_results(self, aggregate_results, examples):
+        """
+        Save results to various output formats with enhanced details.
+        The example CSVs were streamed by `examples` (an ExampleWriter) during the analysis.
+        """
         # Create output paths
         out_base = os.path.join(self.output_dir, "inversion_analysis")
         
@@ -596,59 +887,32 @@ class EnhancedInversionFinder:
             # Create a version of the results that can be serialized to JSON
             summary = {
                 key: value for key, value in aggregate_results.items() 
-                if key != "all_inversions" and key != "constituent_types" and 
-                key != "confidence_levels" and key != "inversion_types"
+                if key != "constituent_types" and 
+                key != "confidence_levels" and key != "inversion_types" and
+                key != "heavy_hitters"
             }
             # Convert Counters to dict
             summary["constituent_types"] = dict(aggregate_results["constituent_types"])
             summary["confidence_levels"] = dict(aggregate_results["confidence_levels"])
             summary["inversion_types"] = dict(aggregate_results["inversion_types"])
+            # Approximate top-k fronted constituents, subjects and verbs
+            summary["heavy_hitters"] = {
+                name: sketch.to_dict() for name, sketch in aggregate_results.get("heavy_hitters", {}).items()
+            }
+            summary["sentence_cache"] = self.cache_stats()
             json.dump(summary, f, indent=2)
         
-        # Filter to high/medium confidence inversions
-        filtered_inversions = self.filter_by_confidence(aggregate_results["all_inversions"], "medium")
-        
-        # Ensure validation_reasons are properly serialized
-        for inv in filtered_inversions:
-            if isinstance(inv.get("validation_reasons"), list):
-                inv["validation_reasons_str"] = "; ".join(inv["validation_reasons"])
+        # Report sentences repeated across the corpus
+        if self.track_duplicates:
+            self.save_duplicate_report(f"{out_base}_duplicates.csv")
         
-        # Save filtered inversions as CSV
-        with open(f"{out_base}_examples.csv", 'w', newline='', encoding='utf-8') as f:
-            if not filtered_inversions:
-                f.write("No inversions found\n")
-                return
-                
-            # Get field names from the first inversion
-            fieldnames = [field for field in filtered_inversions[0].keys() 
-                         if field not in ["previous_sentence", "next_sentence", "validation_reasons"]]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for inversion in filtered_inversions:
-                # Create a copy without context fields
-                inv_copy = {k: v for k, v in inversion.items() if k in fieldnames}
-                writer.writerow(inv_copy)
-        
-        # Save a separate CSV with only complex inversions for focused analysis
-        complex_inversions = [inv for inv in filtered_inversions 
-                             if inv.get("type") in ["complex_pp_inversion", "coordinated_inversion", "numeric_inversion"]]
-        with open(f"{out_base}_complex_examples.csv", 'w', newline='', encoding='utf-8') as f:
-            if not complex_inversions:
-                f.write("No complex inversions found\n")
-            else:
-                # Use the same fieldnames, plus validation reasons
-                fieldnames = [field for field in complex_inversions[0].keys() 
-                             if field not in ["previous_sentence", "next_sentence"]]
-                # Add validation_reasons_str if available
-                if "validation_reasons_str" not in fieldnames and "validation_reasons_str" in complex_inversions[0]:
-                    fieldnames.append("validation_reasons_str")
-                
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for inversion in complex_inversions:
-                    # Create a copy without context fields, but keep validation reasons
-                    inv_copy = {k: v for k, v in inversion.items() if k in fieldnames}
-                    writer.writerow(inv_copy)
+        # Finish the high/medium confidence example CSVs
+        examples.report_filtering()
+        examples.close()
+        if not examples.included:
+            return
+        filtered_inversions = examples.examples
+        complex_inversions = examples.complex_examples
         
         # Create a comprehensive human-readable report
         with open(f"{out_base}_report.txt", 'w', encoding='utf-8') as f:
@@ -746,6 +1010,25 @@ class EnhancedInversionFinder:
         
         print(f"Results saved to {self.output_dir} directory")
 
+    def save_duplicate_report(self, output_file, top_n=500):
+        """
+        Write the most frequently repeated sentences with their occurrence counts.
+        Counts come from the Space-Saving sketch and may overestimate by at most max_error,
+        so only sentences that certainly repeat (count - max_error > 1) are reported.
+        """
+        repeated = [(key, count, error) for key, count, error in self.sentence_occurrences.most_common()
+                    if count - error > 1]
+        redundant = sum(count - 1 for _, count, _ in repeated)
+        
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["occurrences", "max_error", "sentence"])
+            for key, count, error in repeated[:top_n]:
+                writer.writerow([count, error, self.duplicate_sentences[key]])
+        
+        print(f"Duplicate sentences: {len(repeated)} distinct sentences repeated, "
+              f"{redundant} redundant occurrences (report: {output_file})")
+    
     def run_validation_tests(self, test_sentences=None):
         """
         Run validation tests on complex inversion examples to verify pattern matching accuracy.
@@ -815,11 +1098,27 @@ class EnhancedInversionFinder:
         
         return results
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Find subject-verb inversions in academic texts.")
+    parser.add_argument("--cache-size", type=int, default=10000,
+                        help="Number of sentences kept in the match result cache (0 disables it)")
+    parser.add_argument("--dedup-report", action="store_true",
+                        help="Track repeated sentences across the corpus and write a duplicate report")
+    parser.add_argument("--dedup-capacity", type=int, default=50000,
+                        help="Number of distinct sentences the duplicate report tracks (default: 50000)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     # Configure the analyzer with explicit data directory
     finder = EnhancedInversionFinder(
         corpus_dir="data",  # Use data directory for corpus files
-        output_dir="inversion_results"
+        output_dir="inversion_results",
+        sentence_cache_size=args.cache_size,
+        track_duplicates=args.dedup_report,
+        duplicate_capacity=args.dedup_capacity
     )
     
     # Optional: Run validation tests on complex inversions before full analysis
@@ -831,16 +1130,20 @@ def main():
     # Load corpus files
     files = finder.load_corpus_files()
     
-    # Process files (limit to 5 for testing, remove max_files for full analysis)
+    # Process files (limit to 5 for testing, remove max_files for full analysis),
+    # aggregating statistics and streaming the high/medium confidence examples to disk
     print("\nAnalyzing corpus for subject-verb inversion...")
-    results = finder.process_files(files, max_files=5)
+    examples = finder.example_writer("medium")
+    aggregate = finder.analyze_corpus(files, max_files=5, examples=examples)
     
-    # Aggregate results
-    print("\nAggregating results...")
-    aggregate = finder.aggregate_results(results)
+    # Report how much repeated matching work the sentence cache saved
+    cache = finder.cache_stats()
+    print(f"\nSentence cache: {cache['hits']} hits, {cache['misses']} misses "
+          f"(hit rate {cache['hit_rate']*100:.1f}%)")
     
     # Filter to high/medium confidence
-    filtered_inversions = finder.filter_by_confidence(aggregate["all_inversions"], "medium")
+    examples.report_filtering()
+    filtered_inversions = examples.examples
     
     # Print summary statistics
     print("\n=== Subject-Verb Inversion Analysis ===")
@@ -910,8 +1213,7 @@ def main():
         print("\nNo high/medium confidence inversions found in the analyzed files.")
     
     # Display complex inversion examples specifically
-    complex_examples = [inv for inv in filtered_inversions 
-                      if inv.get("type") in ["complex_pp_inversion", "coordinated_inversion", "numeric_inversion"]]
+    complex_examples = examples.complex_examples
     if complex_examples:
         print("\nComplex inversion examples:")
         for i, inv in enumerate(complex_examples[:5]):
@@ -923,7 +1225,7 @@ def main():
             print(f"   Subject: '{inv['subject']}'")
     
     # Save detailed results to files
-    finder.save_results(aggregate)
+    finder.save_results(aggregate, examples)
     print("\nAnalysis complete! Detailed results saved to the 'inversion_results' directory.")
 
 if __name__ == "__main__":
@@ -0,0 +1,29 @@
+import os
+import sys
+import importlib.util
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The analysis modules import each other as top-level modules
+sys.path.insert(0, os.path.join(BASE_DIR, "analysis"))
+
+def load_script(name, path):
+    """Import one of the hyphen-named scripts as a module."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BASE_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(scope="session")
+def finder_module():
+    return load_script("inversion_finder", "subject-verb-inversion-finder.py")
+
+@pytest.fixture(scope="session")
+def corpus_module():
+    return load_script("corpus_analysis", "corpus-analysis.py")
+
+@pytest.fixture(scope="session")
+def analyser_module():
+    return load_script("inversion_analyser", os.path.join("data", "subject-verb-inversion-analysis.py"))
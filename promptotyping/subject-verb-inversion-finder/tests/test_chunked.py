@@ -0,0 +1,115 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import chunked
+from data_loading import load_inversions
+
+FILES = ["text_acad_2010.txt", "text_fic_2011.txt", "text_news_2012.txt"]
+TYPES = ["Prepositional Phrase", "Adverbial Phrase", "Adjective Phrase", "Other", None]
+FUNCTIONS = ["Scene setting", "Discourse structuring", "Emphasis", "Contrast", None]
+VERBS = ["is", "was", "came", "stood", "lay", "are"]
+WORDS = ["the", "old", "house", "on", "hill", "2010", "many", "others", "this", "garden"]
+
+@pytest.fixture(scope="module")
+def inversions_csv(tmp_path_factory):
+    """A small inversions CSV with missing categories and ties between verbs."""
+    rng = random.Random(7)
+    rows = []
+    for _ in range(157):
+        fronted = " ".join(rng.choices(WORDS, k=rng.randint(1, 6)))
+        subject = " ".join(rng.choices(WORDS, k=rng.randint(0, 5)))
+        rows.append({
+            "File": rng.choice(FILES),
+            "Sentence": f"{fronted} is {subject} .",
+            "Fronted Element": fronted,
+            "Fronted Element Type": rng.choice(TYPES),
+            "Locative": rng.choice(["Locative", "Non-locative", None]),
+            "Verb": rng.choice(VERBS),
+            "Subject": subject or None,
+            "Quotative": rng.choice(["Yes", "No"]),
+            "Discourse Function": rng.choice(FUNCTIONS),
+            "Information Structure": rng.choice(["Given->New", "Other", None]),
+        })
+    path = tmp_path_factory.mktemp("chunked") / "corpus_inversions.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+@pytest.fixture(scope="module")
+def full(inversions_csv):
+    df = load_inversions(inversions_csv)
+    df['Complexity_Ratio'] = df['Subject_Word_Count'] / df['Fronted_Word_Count'].replace(0, 1)
+    return df
+
+@pytest.fixture(scope="module")
+def aggregates(inversions_csv):
+    return chunked.aggregate_inversions(inversions_csv, chunk_size=10)
+
+def plain(data):
+    """Drop categorical dtypes and axis names, which differ between the two paths."""
+    data = data.copy()
+    data.index = data.index.astype(object)
+    data.index.name = None
+    if isinstance(data, pd.DataFrame):
+        data.columns = data.columns.astype(object)
+        data.columns.name = None
+    return data
+
+def test_rows_and_chunks(aggregates, full):
+    assert aggregates['rows'] == len(full)
+    assert aggregates['chunks'] == 16
+
+@pytest.mark.parametrize("col", chunked.VALUE_COUNT_COLUMNS)
+def test_value_counts(aggregates, full, col):
+    expected = full[col].value_counts()
+    expected = expected[expected > 0]
+    assert chunked.value_counts(aggregates, col).to_dict() == expected.to_dict()
+
+@pytest.mark.parametrize("index,columns", chunked.CROSSTAB_PAIRS)
+def test_crosstabs(aggregates, full, index, columns):
+    for normalize in (False, True):
+        expected = pd.crosstab(full[index], full[columns], normalize='index' if normalize else False)
+        result = chunked.crosstab(aggregates, index, columns, normalize=normalize)
+        pd.testing.assert_frame_equal(plain(result).sort_index().sort_index(axis=1),
+                                      plain(expected).sort_index().sort_index(axis=1),
+                                      check_dtype=False)
+
+def test_group_means(aggregates, full):
+    expected = full.groupby('Discourse Function', observed=True)[chunked.MEAN_COLUMNS].mean()
+    pd.testing.assert_frame_equal(plain(chunked.group_means(aggregates)).sort_index(),
+                                  plain(expected).sort_index())
+
+@pytest.mark.parametrize("col", chunked.HISTOGRAM_COLUMNS)
+def test_exact_medians(aggregates, full, col):
+    expected = full.groupby('Discourse Function', observed=True)[col].median()
+    pd.testing.assert_series_equal(plain(chunked.group_medians(aggregates, col)),
+                                   plain(expected).sort_index(), check_names=False)
+
+def test_sketch_medians(aggregates, full):
+    expected = full.groupby('Discourse Function', observed=True)['Complexity_Ratio'].median().sort_index()
+    result = chunked.group_medians(aggregates, 'Complexity_Ratio')
+    
+    assert list(result.index) == list(expected.index)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=chunked.SKETCH_ACCURACY)
+
+def test_sketches_merge_exactly(inversions_csv, aggregates):
+    whole = chunked.aggregate_inversions(inversions_csv, chunk_size=1000)
+    assert whole['chunks'] == 1
+    for q in (0.1, 0.5, 0.9):
+        pd.testing.assert_series_equal(chunked.sketch_quantiles(aggregates['sketches']['Complexity_Ratio'], q),
+                                       chunked.sketch_quantiles(whole['sketches']['Complexity_Ratio'], q))
+
+def test_counted_quantile_matches_pandas():
+    values = pd.Series([3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5], dtype=float)
+    counts = values.value_counts()
+    for q in (0, 0.25, 0.5, 0.8, 1):
+        assert chunked.counted_quantile(counts, q) == values.quantile(q)
+
+def test_verb_order(aggregates, full):
+    verb_counts = chunked.sorted_verb_counts(aggregates)
+    for func in full['Discourse Function'].unique():
+        expected = full[full['Discourse Function'] == func]['Verb'].value_counts()
+        result = verb_counts.xs(func, level='Discourse Function')
+        assert list(result.items()) == list(expected.items())
@@ -0,0 +1,54 @@
+import math
+import random
+
+import pytest
+
+def test_ratio_of_sums(corpus_module):
+    inversions = [0, 1, 0, 2, 1, 0]
+    sentences = [10, 12, 8, 20, 9, 11]
+    result = corpus_module.ratio_estimate(inversions, sentences)
+    
+    assert result["estimate"] == pytest.approx(4 / 70)
+    assert result["ci_low"] < result["estimate"] < result["ci_high"]
+    # With every unit sampled there is no sampling error left
+    census = corpus_module.ratio_estimate(inversions, sentences, population_size=len(sentences))
+    assert census["std_error"] == 0
+
+def test_proportion_matches_binomial(corpus_module):
+    # For single-sentence units the ratio estimator is the sample proportion
+    hits = [1] * 30 + [0] * 70
+    result = corpus_module.ratio_estimate(hits, [1] * len(hits))
+    
+    assert result["estimate"] == pytest.approx(0.3)
+    assert result["std_error"] == pytest.approx(math.sqrt(0.3 * 0.7 / 99))
+
+def test_weights(corpus_module):
+    # Weighting a unit by k counts it as k sampled units
+    weighted = corpus_module.ratio_estimate([1, 3], [4, 5], weights=[2, 1])
+    repeated = corpus_module.ratio_estimate([1, 1, 3], [4, 4, 5])
+    assert weighted["estimate"] == pytest.approx(repeated["estimate"])
+    
+    unweighted = corpus_module.ratio_estimate([1, 3], [4, 5], weights=[1, 1])
+    assert unweighted == corpus_module.ratio_estimate([1, 3], [4, 5])
+
+def test_small_samples(corpus_module):
+    assert corpus_module.ratio_estimate([], []) is None
+    assert corpus_module.ratio_estimate([0, 0], [0, 0]) is None
+    single = corpus_module.ratio_estimate([2], [5])
+    assert single["estimate"] == 0.4
+    assert single["std_error"] is None
+
+def test_clip_proportion(corpus_module):
+    result = corpus_module.clip_proportion({"estimate": 0.01, "std_error": 0.02, "ci_low": -0.03, "ci_high": 0.05})
+    assert (result["ci_low"], result["ci_high"]) == (0.0, 0.05)
+
+def test_offsets_follow_file_sizes(corpus_module):
+    sizes = {"a.txt": 1000, "b.txt": 3000, "c.txt": 0, "d.txt": 6000}
+    offsets = corpus_module.draw_offsets(sizes, 5000, random.Random(0))
+    
+    assert "c.txt" not in offsets
+    assert sum(len(file_offsets) for file_offsets in offsets.values()) == 5000
+    for path, file_offsets in offsets.items():
+        assert file_offsets == sorted(file_offsets)
+        assert 0 <= file_offsets[0] and file_offsets[-1] < sizes[path]
+        assert len(file_offsets) / 5000 == pytest.approx(sizes[path] / 10000, abs=0.03)
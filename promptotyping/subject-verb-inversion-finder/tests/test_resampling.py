@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from resampling import MAX_RESAMPLING_CELLS, permuted_tables, resample_crosstab, print_resampling
+
+def crosstab(values, rows=None, columns=None):
+    rows = rows or [f"r{i}" for i in range(len(values))]
+    columns = columns or [f"c{j}" for j in range(len(values[0]))]
+    return pd.DataFrame(values, index=rows, columns=columns)
+
+def test_permuted_tables_keep_margins():
+    table = np.array([[12, 0, 5, 3], [4, 9, 1, 0], [7, 2, 8, 6]])
+    tables = permuted_tables(table, n_resamples=300, rng=np.random.default_rng(1))
+    
+    assert tables.shape == (300, 3, 4)
+    assert (tables >= 0).all()
+    assert (tables.sum(axis=2) == table.sum(axis=1)).all()
+    assert (tables.sum(axis=1) == table.sum(axis=0)).all()
+    # Under independence the average table is close to the expected counts
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / table.sum()
+    assert np.abs(tables.mean(axis=0) - expected).max() < 1
+
+def test_p_values():
+    independent = crosstab([[10, 20, 30], [20, 40, 60]])
+    result = resample_crosstab(independent, n_resamples=200)
+    assert result['chi2'] == 0
+    assert result['p_value'] == 1
+    assert result['note'] is None
+    
+    dependent = crosstab([[40, 2], [3, 45]])
+    result = resample_crosstab(dependent, n_resamples=200)
+    assert result['p_value'] == 1 / 201
+    assert (result['cell_p_values'] < 0.05).all().all()
+
+def test_percentages_and_intervals():
+    table = crosstab([[30, 10], [5, 15]])
+    result = resample_crosstab(table, n_resamples=500)
+    
+    assert result['percentages'].loc['r0', 'c0'] == 75
+    assert (result['ci_lower'] <= result['percentages']).all().all()
+    assert (result['ci_upper'] >= result['percentages']).all().all()
+    # Seeded, so the same table gives the same result
+    again = resample_crosstab(table, n_resamples=500)
+    assert again['p_value'] == result['p_value']
+    pd.testing.assert_frame_equal(again['ci_lower'], result['ci_lower'])
+
+def test_empty_rows_and_columns_are_left_out():
+    table = crosstab([[40, 0, 2], [0, 0, 0], [3, 0, 45]])
+    result = resample_crosstab(table, n_resamples=200)
+    trimmed = resample_crosstab(table.drop(index='r1', columns='c1'), n_resamples=200)
+    
+    assert result['chi2'] == trimmed['chi2']
+    assert result['p_value'] == trimmed['p_value']
+    assert (result['cell_p_values'].loc['r1'] == 1).all()
+    assert (result['cell_p_values']['c1'] == 1).all()
+    assert result['percentages'].loc['r1'].isna().all()
+
+def test_degenerate_tables_skip_the_test(capsys):
+    tables = [
+        pd.DataFrame(),
+        crosstab([[5], [7]]),
+        crosstab([[5, 7]]),
+        crosstab([[3, 0], [4, 0]]),
+    ]
+    for table in tables:
+        result = resample_crosstab(table, n_resamples=50)
+        assert np.isnan(result['chi2'])
+        assert np.isnan(result['p_value'])
+        assert result['note'] == "fewer than two non-empty rows or columns"
+        assert result['cell_p_values'].shape == table.shape
+        print_resampling(result)
+    assert "Permutation test skipped" in capsys.readouterr().out
+
+def test_large_tables_are_not_resampled(capsys):
+    table = crosstab(np.ones((40, 30), dtype=int).tolist())
+    assert table.size > MAX_RESAMPLING_CELLS
+    result = resample_crosstab(table, n_resamples=50)
+    
+    assert np.isnan(result['p_value'])
+    assert result['note'] == f"more than {MAX_RESAMPLING_CELLS} non-empty cells"
+    assert result['ci_lower'].isna().all().all()
+    assert (result['percentages'].round(6) == round(100 / 30, 6)).all().all()
+    print_resampling(result)
+    assert "nan" not in capsys.readouterr().out.lower()
@@ -0,0 +1,88 @@
+import os
+import csv
+import json
+
+import pytest
+
+def inversion_rows(module, start, stop):
+    return [[f"{column} {i}" for column in module.INVERSION_COLUMNS] for i in range(start, stop)]
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+def crash(writer):
+    """Stop like an interrupted run: rows reach the files, but no checkpoint follows."""
+    writer._flush_rows()
+    writer.main_file.close()
+    writer.summary_file.close()
+
+@pytest.fixture
+def part_writer(analyser_module, monkeypatch):
+    """A ResultWriter that stores its columnar parts as JSON, so the test does not need pyarrow."""
+    monkeypatch.setattr(analyser_module.importlib.util, "find_spec", lambda name: True)
+    
+    class PartWriter(analyser_module.ResultWriter):
+        def _write_part(self):
+            if not self.columnar_rows:
+                return
+            with open(self._part_path(self.parquet_parts), 'w', encoding='utf-8') as f:
+                json.dump(self.columnar_rows, f)
+            self.parquet_parts += 1
+            self.parquet_rows += len(self.columnar_rows)
+            self.columnar_rows = []
+    
+    return PartWriter
+
+def test_resume_cuts_rows_after_checkpoint(analyser_module, tmp_path):
+    rows = inversion_rows(analyser_module, 0, 7)
+    writer = analyser_module.ResultWriter(str(tmp_path), "test", buffer_rows=2)
+    writer.write_inversions(rows[:3])
+    writer.write_summary(["a.txt", 10, 3])
+    writer.checkpoint({"files_done": ["a.txt"]})
+    writer.write_inversions(rows[3:5])
+    writer.write_summary(["b.txt", 8, 2])
+    crash(writer)
+    
+    checkpoint = analyser_module.load_checkpoint(str(tmp_path))
+    assert checkpoint["files_done"] == ["a.txt"]
+    writer = analyser_module.ResultWriter(str(tmp_path), "test", checkpoint=checkpoint)
+    writer.write_inversions(rows[5:7])
+    writer.write_summary(["c.txt", 5, 2])
+    writer.close()
+    
+    assert read_rows(writer.main_csv) == [analyser_module.INVERSION_COLUMNS] + rows[:3] + rows[5:7]
+    assert read_rows(writer.summary_csv) == [analyser_module.SUMMARY_COLUMNS, ["a.txt", "10", "3"], ["c.txt", "5", "2"]]
+    assert analyser_module.load_checkpoint(str(tmp_path)) is None
+
+def test_resume_rebuilds_columnar_parts(analyser_module, part_writer, tmp_path):
+    rows = inversion_rows(analyser_module, 0, 9)
+    writer = part_writer(str(tmp_path), "test", columnar=True, part_rows=2)
+    writer.write_inversions(rows[:3])
+    writer.checkpoint({"files_done": ["a.txt"]})
+    # Only durable in the CSV at the next checkpoint
+    writer.write_inversions(rows[3:4])
+    writer.checkpoint({"files_done": ["a.txt", "b.txt"]})
+    # Lost: the part and CSV rows written after the last checkpoint
+    writer.write_inversions(rows[4:7])
+    crash(writer)
+    
+    checkpoint = analyser_module.load_checkpoint(str(tmp_path))
+    assert (checkpoint["parquet_parts"], checkpoint["parquet_rows"]) == (1, 3)
+    writer = part_writer(str(tmp_path), "test", columnar=True, part_rows=2, checkpoint=checkpoint)
+    assert writer.columnar_rows == rows[3:4]
+    assert not os.path.exists(writer._part_path(1))
+    writer.write_inversions(rows[7:9])
+    writer.close()
+    
+    parts = []
+    for index in range(writer.parquet_parts):
+        with open(writer._part_path(index), encoding='utf-8') as f:
+            parts.append(json.load(f))
+    assert parts == [rows[:3], rows[3:4] + rows[7:9]]
+    assert read_rows(writer.main_csv)[1:] == rows[:4] + rows[7:9]
+
+def test_checkpoint_of_another_version_is_ignored(analyser_module, tmp_path):
+    with open(tmp_path / analyser_module.CHECKPOINT_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"version": analyser_module.CHECKPOINT_VERSION - 1, "offsets": {}}, f)
+    assert analyser_module.load_checkpoint(str(tmp_path)) is None
@@ -0,0 +1,78 @@
+import random
+from collections import Counter
+
+def zipf_stream(n, vocabulary, seed):
+    """A skewed stream of n items, like repeated sentences in a corpus."""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    return rng.choices([f"sentence {i}" for i in range(vocabulary)], weights=weights, k=n)
+
+def assert_bounds(sketch, true_counts):
+    """Every tracked count overestimates the true count by at most its error."""
+    for item, count, error in sketch.most_common():
+        assert count - error <= true_counts[item] <= count
+
+def test_exact_below_capacity(finder_module):
+    stream = zipf_stream(500, 30, seed=1)
+    sketch = finder_module.SpaceSavingCounter(capacity=50)
+    sketch.update(stream)
+    
+    assert dict(sketch.counts) == Counter(stream)
+    assert set(sketch.errors.values()) == {0}
+    assert sketch.min_count() == 0
+
+def test_error_bounds(finder_module):
+    stream = zipf_stream(5000, 400, seed=2)
+    true_counts = Counter(stream)
+    capacity = 40
+    sketch = finder_module.SpaceSavingCounter(capacity)
+    sketch.update(stream)
+    
+    assert len(sketch) == capacity
+    assert sketch.total == len(stream)
+    assert_bounds(sketch, true_counts)
+    # Untracked items occur at most as often as the least frequent tracked one,
+    # which is at most total / capacity, so no frequent item is lost
+    assert sketch.min_count() <= sketch.total / capacity
+    for item, count in true_counts.items():
+        if item not in sketch.counts:
+            assert count <= sketch.min_count()
+        if count > sketch.total / capacity:
+            assert item in sketch.counts
+
+def test_weighted_add(finder_module):
+    sketch = finder_module.SpaceSavingCounter(capacity=2)
+    sketch.add("a", 5)
+    sketch.add("b", 2)
+    sketch.add("c", 1)
+    
+    # "c" replaces "b" and inherits its count as error
+    assert sketch.most_common() == [("a", 5, 0), ("c", 3, 2)]
+    assert sketch.total == 8
+
+def test_merge_keeps_bounds(finder_module):
+    chunks = [zipf_stream(2000, 300, seed=seed) for seed in (3, 4, 5)]
+    true_counts = Counter(item for chunk in chunks for item in chunk)
+    
+    merged = finder_module.SpaceSavingCounter(capacity=40)
+    for chunk in chunks:
+        sketch = finder_module.SpaceSavingCounter(capacity=40)
+        sketch.update(chunk)
+        merged.merge(sketch)
+    
+    assert len(merged) == 40
+    assert merged.total == sum(true_counts.values())
+    assert_bounds(merged, true_counts)
+    top_item = true_counts.most_common(1)[0][0]
+    assert merged.most_common(1)[0][0] == top_item
+
+def test_merge_below_capacity_is_exact(finder_module):
+    first = finder_module.SpaceSavingCounter(capacity=100)
+    second = finder_module.SpaceSavingCounter(capacity=100)
+    first.update(["a", "b", "a"])
+    second.update(["b", "c"])
+    first.merge(second)
+    
+    assert first.counts == {"a": 2, "b": 2, "c": 1}
+    assert set(first.errors.values()) == {0}
+    assert first.total == 5
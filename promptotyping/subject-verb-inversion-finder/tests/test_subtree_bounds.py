@@ -0,0 +1,44 @@
+import random
+
+def slow_bounds(info):
+    """Collect every subtree by following the heads up, then check it is contiguous."""
+    start = info["start"]
+    heads = info["heads"]
+    subtrees = [set() for _ in heads]
+    for i in range(len(heads)):
+        position = start + i
+        while True:
+            subtrees[position - start].add(start + i)
+            if heads[position - start] == position:
+                break
+            position = heads[position - start]
+    return [(min(ids), max(ids)) if max(ids) - min(ids) + 1 == len(ids) else None for ids in subtrees]
+
+def random_sentence(rng, start):
+    """Attach the tokens in random order to a token attached before them."""
+    n = rng.randint(1, 15)
+    order = list(range(n))
+    rng.shuffle(order)
+    heads = [0] * n
+    heads[order[0]] = order[0]
+    for k, token in enumerate(order[1:], 1):
+        heads[token] = rng.choice(order[:k])
+    return {"start": start, "heads": [h + start for h in heads]}
+
+def test_projective_sentence(analyser_module):
+    # "On the hill stood a house": stood heads On and house, On heads hill, hill heads the
+    info = {"start": 20, "heads": [23, 22, 20, 23, 25, 23]}
+    assert analyser_module.subtree_bounds(info) == [(20, 22), (21, 21), (21, 22), (20, 25), (24, 24), (24, 25)]
+
+def test_non_projective_subtree(analyser_module):
+    # Token 0 and its child 2 are split by token 1, which hangs from the root
+    info = {"start": 0, "heads": [3, 3, 0, 3]}
+    bounds = analyser_module.subtree_bounds(info)
+    assert bounds[0] is None
+    assert bounds[3] == (0, 3)
+
+def test_matches_brute_force(analyser_module):
+    rng = random.Random(0)
+    for _ in range(300):
+        info = random_sentence(rng, start=rng.randint(0, 50))
+        assert analyser_module.subtree_bounds(info) == slow_bounds(info)